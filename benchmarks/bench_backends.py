@@ -0,0 +1,53 @@
+# every execution engine on the same sieve-like program: list building, nested loops, indexing and a little arithmetic
+# usage: python benchmarks/bench_backends.py [--limit N] [--repeat 5] [--backends tree,closures,tiered,vm,python]
+import argparse
+from common import best_of, prepare, run
+
+from assembler import BACKENDS
+
+def sieve_source(limit):
+    return f'''fn sieve(int limit) -> int {{
+    list flags = []
+    for (int i = 0; i <= limit; i++) {{
+        flags.append(true)
+    }}
+    for (int p = 2; p * p <= limit; p++) {{
+        if flags[p] {{
+            int m = p * p
+            while m <= limit {{
+                flags[m] = false
+                m = m + p
+            }}
+        }}
+    }}
+    int count = 0
+    for (int k = 2; k <= limit; k++) {{
+        if flags[k] {{
+            count = count + 1
+        }}
+    }}
+    -> count
+}}
+
+out(toStr(sieve({limit})))
+'''
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each execution engine on a sieve")
+    parser.add_argument("--limit", type=int, default=30000, help="sieve up to this number")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated engines to time")
+    args = parser.parse_args()
+
+    source = sieve_source(args.limit)
+    backends = args.backends.split(",")
+    baseline = None
+    print(f"{'backend':>10}{'seconds':>10}{'speedup':>10}")
+    for backend in backends:
+        program = prepare(source)
+        seconds = best_of(lambda: run(program, backend, "bench_backends.b"), args.repeat)
+        baseline = baseline or seconds
+        print(f"{backend:>10}{seconds:>10.3f}{baseline / seconds:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# cost of a boron function call as the global scope fills up with imported names
+# usage: python benchmarks/bench_calls.py [--calls N] [--names 0,100,1000,10000] [--keywords] [--backend tree|closures|tiered|vm|python]
+# imports copy every class and function out of a package into the global scope, so the names are stuffed in the same way here
+# (the real package folder isn't around on most machines). call overhead should stay flat no matter how many there are
+import argparse
+from common import best_of, prepare
+
+from assembler import BACKENDS
+
+# a loop making the given number of calls to a small function, plus one to a method so that path gets measured too. with keywords
+# the last argument of each call goes by name
+def call_source(calls, keywords=False):
+    b, by = ("b=", "by=") if keywords else ("", "")
+    return f'''class Point {{
+    int x
+
+    fn __init__ (class self, int x) -> {{
+        self.x = x
+    }}
+
+    fn shifted (class self, int by) -> int {{
+        -> self.x + by
+    }}
+}}
+
+fn add(int a, int b) -> int {{
+    -> a + b
+}}
+
+Point p = new Point(1)
+int total = 0
+for (int i = 0; i < {calls}; i++) {{
+    total = add(total, {b}i)
+    total = p.shifted({by}total)
+}}
+'''
+
+# like evaluate_import, a module's worth of callables dropped straight into the globals
+def fake_imports(interpreter, count):
+    for i in range(count):
+        interpreter.global_scope[f"imported{i}"] = lambda *args: None
+
+def run(program, names, backend):
+    interpreter = BACKENDS[backend]("bench_calls.b", [])
+    fake_imports(interpreter, names)
+    interpreter.evaluate(program)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure function call overhead against the size of the global scope")
+    parser.add_argument("--calls", type=int, default=5000, help="loop iterations, each one makes a function and a method call")
+    parser.add_argument("--names", default="0,100,1000,10000", help="comma separated counts of imported names to try")
+    parser.add_argument("--keywords", action="store_true", help="pass the last argument of each call by name")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backend", choices=BACKENDS, default="tree")
+    args = parser.parse_args()
+
+    program = prepare(call_source(args.calls, args.keywords))
+
+    print(f"{'names':>8}{'calls':>10}{'seconds':>10}{'us/call':>10}")
+    for names in (int(n) for n in args.names.split(",")):
+        seconds = best_of(lambda: run(program, names, args.backend), args.repeat)
+        calls = args.calls * 2
+        print(f"{names:>8}{calls:>10}{seconds:>10.3f}{seconds / calls * 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
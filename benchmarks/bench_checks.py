@@ -0,0 +1,42 @@
+# cost of the type checks on typed declarations and assignments: a loop full of them, run with parsing/typechecker.py's pass
+# (which drops the ones it can prove) and without it (every one checked at runtime like before)
+# usage: python benchmarks/bench_checks.py [--iterations N] [--repeat 3] [--backends tree,closures,tiered,vm,python]
+import argparse
+from common import best_of, prepare, run
+
+from assembler import BACKENDS
+
+SOURCE = '''int total = 0
+str s = ""
+dec d = 0.5
+for (int i = 0; i < {iterations}; i++) {{
+    int x = i * 2
+    int y = x + 1
+    bool even = x % 2 == 0
+    str name = "boron"
+    dec half = d * 2
+    total = total + y
+    s = name
+}}
+'''
+
+def timed(source, backend, repeat, typecheck):
+    program = prepare(source, typecheck)
+    return best_of(lambda: run(program, backend, "bench_checks.b"), repeat)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time typed declarations with and without the type checking pass")
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated engines to time")
+    args = parser.parse_args()
+
+    source = SOURCE.format(iterations=args.iterations)
+    print(f"{'backend':>10}{'checked':>10}{'proven':>10}{'speedup':>10}   (ms per run)")
+    for backend in args.backends.split(","):
+        checked = timed(source, backend, args.repeat, False)
+        proven = timed(source, backend, args.repeat, True)
+        print(f"{backend:>10}{checked * 1e3:>10.1f}{proven * 1e3:>10.1f}{checked / proven:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# filter-heavy loops: a cheap guard in front of an expensive check, or-defaults and conditional expressions. and/or only run their
+# right side when the left one doesn't decide things, so most of the expensive calls here never happen
+# usage: python benchmarks/bench_filters.py [--items N] [--repeat 5] [--backends tree,closures,tiered,vm,python]
+import argparse
+from common import best_of, prepare, run
+
+from assembler import BACKENDS
+
+# every case walks a list where three of every four items are none
+SETUP = '''fn expensive(int x) -> bool {{
+    int total = 0
+    for (int k = 0; k < 20; k++) {{
+        total = total + x % (k + 1)
+    }}
+    -> total > 5
+}}
+
+list items = []
+for (int i = 0; i < {items}; i++) {{
+    if i % 4 == 0 {{
+        items.append(i)
+    }} else {{
+        items.append(none)
+    }}
+}}
+int kept = 0
+'''
+
+CASES = {
+    "and guard": '''for (int i = 0; i < {items}; i++) {{
+    if items[i] != none and expensive(items[i]) {{
+        kept = kept + 1
+    }}
+}}
+''',
+    "or guard": '''for (int i = 0; i < {items}; i++) {{
+    if items[i] == none or expensive(items[i]) {{
+        kept = kept + 1
+    }}
+}}
+''',
+    "conditional": '''for (int i = 0; i < {items}; i++) {{
+    kept = kept + (0 if items[i] == none else 1 if expensive(items[i]) else 2)
+}}
+''',
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Time guarded filters with and/or and conditional expressions on each execution engine")
+    parser.add_argument("--items", type=int, default=2000, help="how many items each loop filters")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated engines to time")
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    print(f"{'case':>12}" + "".join(f"{backend:>10}" for backend in backends) + "   (us per item)")
+    for case, loop in CASES.items():
+        source = (SETUP + loop).format(items=args.items)
+        row = f"{case:>12}"
+        for backend in backends:
+            program = prepare(source)
+            seconds = best_of(lambda: run(program, backend, "bench_filters.b"), args.repeat)
+            row += f"{seconds / args.items * 1e6:>10.2f}"
+        print(row)
+
+if __name__ == "__main__":
+    main()
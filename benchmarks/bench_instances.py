@@ -0,0 +1,87 @@
+# cost of class instances: making a lot of them (into a vec, like examples/taskmanager.b), then reading their fields and calling a
+# method on each (PASSES times over, so making them doesn't drown it out). memory is the peak python allocated while the program ran, over the number of instances, so it counts the vec too
+# usage: python benchmarks/bench_instances.py [--count N] [--repeat 3] [--backends tree,closures,tiered,vm,python]
+import argparse, tracemalloc
+from common import best_of, prepare, run
+
+from assembler import BACKENDS
+
+CLASS = '''class Task {{
+    str name
+    str desc
+    bool done
+    int priority
+
+    fn __init__ (class self, str name, str desc, int priority) -> {{
+        self.name = name
+        self.desc = desc
+        self.done = false
+        self.priority = priority
+    }}
+
+    fn complete (class self) -> {{
+        self.done = true
+    }}
+}}
+
+vec tasks[Task] = []
+for (int i = 0; i < {count}; i++) {{
+    Task task = new Task("task", "something to do", i)
+    tasks.append(task)
+}}
+'''
+
+PASSES = 10
+
+CASES = {
+    "new": "",
+    "fields": '''int total = 0
+for (int i = 0; i < {reads}; i++) {{
+    auto task = tasks[i % {count}]
+    total = total + task.priority
+}}
+''',
+    "methods": '''for (int i = 0; i < {reads}; i++) {{
+    auto task = tasks[i % {count}]
+    task.complete()
+}}
+''',
+}
+
+# peak bytes python had allocated while the program ran
+def peak_memory(program, backend):
+    tracemalloc.start()
+    try:
+        run(program, backend, "bench_instances.b")
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and weigh class instances on each execution engine")
+    parser.add_argument("--count", type=int, default=20000, help="how many instances get made")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated engines to time")
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    print(f"{'case':>10}" + "".join(f"{backend:>10}" for backend in backends) + "   (us per instance or per read/call, bytes per instance)")
+    made = {}
+    for case, extra in CASES.items():
+        source = (CLASS + extra).format(count=args.count, reads=args.count * PASSES)
+        row = f"{case:>10}"
+        for backend in backends:
+            program = prepare(source)
+            seconds = best_of(lambda: run(program, backend, "bench_instances.b"), args.repeat)
+            # every case starts by making the instances, that isn't part of what the others measure
+            if case == "new":
+                made[backend] = seconds
+                row += f"{seconds / args.count * 1e6:>10.2f}"
+            else:
+                row += f"{(seconds - made[backend]) / (args.count * PASSES) * 1e6:>10.2f}"
+        print(row)
+        if case == "new":
+            print(f"{'bytes':>10}" + "".join(f"{peak_memory(prepare(source), backend) / args.count:>10.0f}" for backend in backends))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# lexer throughput in MB/s on large synthetic sources
+# usage: python benchmarks/bench_lexer.py [--size MB] [--against path/to/an/older/lexer.py]
+# --against loads a second lexer.py (for example out of a git worktree of an older commit) and reports it next to the current one
+import argparse, importlib.util
+from common import best_of, synthetic_source
+
+from lexer.lexer import Lexer
+
+def load_lexer(path):
+    spec = importlib.util.spec_from_file_location("baseline_lexer", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Lexer
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure lexer throughput")
+    parser.add_argument("--size", type=float, default=2.0, help="size of each synthetic source in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--against", help="path to another lexer.py to compare with")
+    args = parser.parse_args()
+
+    lexers = [("current", Lexer)]
+    if args.against:
+        lexers.insert(0, ("baseline", load_lexer(args.against)))
+
+    size = int(args.size * 1024 * 1024)
+    print(f"{'source':<10}{'lexer':<10}{'tokens':>10}{'seconds':>10}{'MB/s':>10}")
+    for shape in ("mixed", "blocks", "long"):
+        source = synthetic_source(size, shape)
+        megabytes = len(source) / (1024 * 1024)
+        for name, lexer in lexers:
+            count = len(lexer(source).tokenize())
+            seconds = best_of(lambda: lexer(source).tokenize(), args.repeat)
+            print(f"{shape:<10}{name:<10}{count:>10}{seconds:>10.3f}{megabytes / seconds:>10.2f}")
+
+if __name__ == "__main__":
+    main()
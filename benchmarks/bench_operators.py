@@ -0,0 +1,84 @@
+# per operator microbenchmarks: every binary operator and compound assignment in a loop, once on ints and once on decimals, against a
+# variable and against a constant. each one is written out UNROLL times per iteration so the loop doesn't drown it out, and the same
+# loop with a plain r = 0 in it comes first, as what an operation costs without the operator
+# usage: python benchmarks/bench_operators.py [--iterations N] [--repeat 5] [--backends tree,closures,tiered,vm,python] [--types int,dec]
+import argparse
+from common import best_of, prepare, run
+
+from assembler import BACKENDS
+
+# the operand values for each type, b is never zero so the divisions are fine
+OPERANDS = {
+    "int": ("7", "3"),
+    "dec": ("7.5", "2.5"),
+}
+
+# what goes in the loop for each case, a and b are locals and the result goes to r (or back to a for the compound ones)
+CASES = {
+    "r = 0": "r = 0",
+    "+": "r = a + b",
+    "-": "r = a - b",
+    "*": "r = a * b",
+    "/": "r = a / b",
+    "//": "r = a // b",
+    "%": "r = a % b",
+    "**": "r = a ** 2",
+    "+ const": "r = a + 1",
+    "- const": "r = a - 1",
+    "<": "t = a < b",
+    ">=": "t = a >= b",
+    "==": "t = a == b",
+    "!=": "t = a != b",
+    "< const": "t = a < 5",
+    "+=": "a += 1",
+    "-=": "a -= 1",
+    "*=": "a *= 1",
+    "/=": "a /= 1",
+    "//=": "a //= 1",
+}
+
+# copies of the statement per loop iteration
+UNROLL = 10
+
+# a function so every engine uses its locals, results go to auto variables so there's no type check on them
+PROGRAM = '''fn run() -> {{
+    {kind} a = {a}
+    {kind} b = {b}
+    auto r = a
+    auto t = false
+    for (int i = 0; i < {iterations}; i++) {{
+{statements}
+    }}
+}}
+
+run()
+'''
+
+def timed(source, backend, repeat):
+    program = prepare(source)
+    return best_of(lambda: run(program, backend, "bench_operators.b"), repeat)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every binary operator on each execution engine")
+    parser.add_argument("--iterations", type=int, default=5000, help="loop iterations per operator (each runs it UNROLL times)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated engines to time")
+    parser.add_argument("--types", default=",".join(OPERANDS), help="comma separated operand types (int, dec)")
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    for kind in args.types.split(","):
+        a, b = OPERANDS[kind]
+        source = lambda statement: PROGRAM.format(kind=kind, a=a, b=b, iterations=args.iterations,
+                                                  statements="\n".join(["        " + statement] * UNROLL))
+
+        print(f"\n{kind + ' operands':>16}" + "".join(f"{backend:>10}" for backend in backends) + "   (ns per operation)")
+        for case, statement in CASES.items():
+            row = f"{case:>16}"
+            for backend in backends:
+                seconds = timed(source(statement), backend, args.repeat)
+                row += f"{seconds / (args.iterations * UNROLL) * 1e9:>10.0f}"
+            print(row)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# parser throughput in AST nodes/s on large synthetic sources, lexing happens up front and isn't timed
+# usage: python benchmarks/bench_parser.py [--size MB] [--against path/to/an/older/parser.py]
+import argparse, importlib.util
+from common import best_of, synthetic_source
+
+from lexer.lexer import Lexer
+from parsing.parser import Parser
+from parsing.astnodes import walk
+
+def load_parser(path):
+    spec = importlib.util.spec_from_file_location("baseline_parser", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Parser
+
+# every node in the program (walk doesn't recurse, so long expression chains don't blow the stack)
+def count_nodes(program):
+    return sum(1 for _ in walk(program))
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure parser throughput")
+    parser.add_argument("--size", type=float, default=1.0, help="size of each synthetic source in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--against", help="path to another parser.py to compare with")
+    args = parser.parse_args()
+
+    parsers = [("current", Parser)]
+    if args.against:
+        parsers.insert(0, ("baseline", load_parser(args.against)))
+
+    size = int(args.size * 1024 * 1024)
+    print(f"{'source':<10}{'parser':<10}{'nodes':>10}{'seconds':>10}{'nodes/s':>12}")
+    for shape in ("mixed", "blocks", "long"):
+        tokens = Lexer(synthetic_source(size, shape)).tokenize()
+        for name, parser_class in parsers:
+            nodes = count_nodes(parser_class(tokens).parse())
+            seconds = best_of(lambda: parser_class(tokens).parse(), args.repeat)
+            print(f"{shape:<10}{name:<10}{nodes:>10}{seconds:>10.3f}{nodes / seconds:>12.0f}")
+
+if __name__ == "__main__":
+    main()
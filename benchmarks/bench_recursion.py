@@ -0,0 +1,87 @@
+# stress test for deep recursion: a million nested calls that aren't tail calls, and a million tail calls between two functions and
+# from inside an if. only the vm keeps boron calls off the python stack, the other engines are expected to stop with a RecursionError
+# usage: python benchmarks/bench_recursion.py [--depth 1000000] [--backends tree,closures,tiered,vm,python]
+import argparse, contextlib, io, time
+from common import prepare
+
+from assembler import BACKENDS
+
+# each case prints one value, and what it should be for a given depth
+CASES = {
+    "deep": ('''fn depth(int n) -> int {{
+    if n == 0 {{
+        -> 0
+    }}
+    -> 1 + depth(n - 1)
+}}
+
+out(toStr(depth({depth})))
+''', lambda depth: str(depth)),
+    "deep list": ('''fn total(list values, int i) -> int {{
+    if i == values.length() {{
+        -> 0
+    }}
+    -> values[i] + total(values, i + 1)
+}}
+
+list values = []
+for (int i = 0; i < {depth}; i++) {{
+    values.append(1)
+}}
+out(toStr(total(values, 0)))
+''', lambda depth: str(depth)),
+    "mutual tail": ('''fn isEven(int n) -> bool {{
+    if n == 0 {{
+        -> true
+    }}
+    -> isOdd(n - 1)
+}}
+
+fn isOdd(int n) -> bool {{
+    if n == 0 {{
+        -> false
+    }}
+    -> isEven(n - 1)
+}}
+
+out(toStr(isEven({depth})))
+''', lambda depth: str(depth % 2 == 0)),
+    "tail in if": ('''fn countdown(int n) -> int {{
+    if n > 0 {{
+        -> countdown(n - 1)
+    }}
+    -> n
+}}
+
+out(toStr(countdown({depth})))
+''', lambda depth: "0"),
+}
+
+# seconds and what happened: ok, a wrong answer, or the name of the error it stopped with
+def run(program, backend, expected):
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            BACKENDS[backend]("bench_recursion.b", []).evaluate(program)
+    except (RecursionError, MemoryError) as error:
+        return time.perf_counter() - start, type(error).__name__
+    seconds = time.perf_counter() - start
+    return seconds, "ok" if output.getvalue().strip() == expected else "wrong: " + output.getvalue().strip()[:20]
+
+def main():
+    parser = argparse.ArgumentParser(description="Recurse very deep on each execution engine")
+    parser.add_argument("--depth", type=int, default=1000000, help="how many calls deep each case goes")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated engines to run")
+    args = parser.parse_args()
+
+    print(f"{'case':>12}{'backend':>10}{'seconds':>10}{'us/call':>10}  result")
+    for case, (source, expected) in CASES.items():
+        source = source.format(depth=args.depth)
+        for backend in args.backends.split(","):
+            program = prepare(source)
+            seconds, result = run(program, backend, expected(args.depth))
+            print(f"{case:>12}{backend:>10}{seconds:>10.2f}{seconds / args.depth * 1e6:>10.2f}  {result}")
+
+if __name__ == "__main__":
+    main()
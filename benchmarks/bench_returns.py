@@ -0,0 +1,88 @@
+# cost of leaving things early: function returns (plain, from inside a loop, from a method) and break/continue
+# usage: python benchmarks/bench_returns.py [--calls N] [--repeat 5] [--backends tree,closures,tiered,vm,python]
+import argparse
+from common import best_of, prepare, run
+
+from assembler import BACKENDS
+
+# every shape a return, break or continue can leave from, each run the given number of times
+CASES = {
+    "return": '''fn pick(int n) -> int {{
+    if n % 2 == 0 {{
+        -> 0
+    }}
+    -> 1
+}}
+
+int total = 0
+for (int i = 0; i < {calls}; i++) {{
+    total = total + pick(i)
+}}
+''',
+    "loop return": '''fn find(int n) -> int {{
+    for (int k = 0; k < 10; k++) {{
+        if k == n {{
+            -> k
+        }}
+    }}
+    -> -1
+}}
+
+int total = 0
+for (int i = 0; i < {calls}; i++) {{
+    total = total + find(3)
+}}
+''',
+    "method return": '''class Counter {{
+    int step
+
+    fn __init__ (class self, int step) -> {{
+        self.step = step
+    }}
+
+    fn next (class self, int n) -> int {{
+        -> n + self.step
+    }}
+}}
+
+Counter c = new Counter(2)
+int total = 0
+for (int i = 0; i < {calls}; i++) {{
+    total = c.next(total)
+}}
+''',
+    "break/continue": '''int total = 0
+for (int i = 0; i < {calls}; i++) {{
+    for (int k = 0; k < 10; k++) {{
+        if k == 1 {{
+            continue
+        }}
+        if k == 3 {{
+            break
+        }}
+        total = total + k
+    }}
+}}
+''',
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Time returns, breaks and continues on each execution engine")
+    parser.add_argument("--calls", type=int, default=5000, help="how many times each case leaves early")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated engines to time")
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    print(f"{'case':>16}" + "".join(f"{backend:>10}" for backend in backends) + "   (us per call)")
+    for case, source in CASES.items():
+        source = source.format(calls=args.calls)
+        row = f"{case:>16}"
+        for backend in backends:
+            program = prepare(source)
+            seconds = best_of(lambda: run(program, backend, "bench_returns.b"), args.repeat)
+            row += f"{seconds / args.calls * 1e6:>10.2f}"
+        print(row)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# cost of field reads and method calls at one site as it sees more receiver types: TYPES classes that all have a field v and a
+# method f, instances of the first n of them in a vec, and a loop going round it reading v (UNROLL times, so the loop doesn't
+# drown it out) or calling f. 1 type is a monomorphic site, a few is polymorphic and more than interpreter/inlinecaches.py's
+# POLYMORPHIC_LIMIT is megamorphic. the list, str and dict rows are builtin methods (interpreter/builtins.py's METHODS) for comparison
+# usage: python benchmarks/bench_sites.py [--calls N] [--repeat 3] [--backends tree,closures,tiered,vm,python]
+import argparse
+from common import best_of, prepare, run
+
+from assembler import BACKENDS
+
+TYPES = 8
+
+CLASS = '''class K{index} {{
+    int v
+    fn __init__ (class self, int v) -> {{
+        self.v = v
+    }}
+    fn f (class self) -> int {{
+        -> self.v
+    }}
+}}
+K{index} k{index} = new K{index}({index})
+'''
+
+# the loop over the first {types} instances, {body} is what each case does with k, and the loop doing nothing with it comes first
+LOOP = '''str s = "boron"
+list ys = []
+dict d = {{"a": 1}}
+auto t = 0
+for (int i = 0; i < {calls}; i++) {{
+    auto k = ks[i % {types}]
+{body}
+}}
+'''
+
+# copies of a field read per loop iteration
+UNROLL = 10
+
+BODIES = {
+    "empty": ("    t = 0", 1),
+    "field": ("    t = k.v", UNROLL),
+    "method": ("    t = k.f()", 1),
+    "list": ("    ys.append(k)", 1),
+    "str": ("    t = s.upper()", 1),
+    "dict": ("    t = d.get(\"a\")", 1),
+}
+
+# (what's done, how many receiver types)
+CASES = [("field", 1), ("field", 2), ("field", 4), ("field", 8), ("method", 1), ("method", 2), ("method", 4), ("method", 8), ("list", 1), ("str", 1), ("dict", 1)]
+
+def timed(source, backend, repeat):
+    program = prepare(source)
+    return best_of(lambda: run(program, backend, "bench_sites.b"), repeat)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time field reads and method calls at sites seeing more and more receiver types")
+    parser.add_argument("--calls", type=int, default=20000, help="loop iterations per case (one field read and one call each)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated engines to time")
+    args = parser.parse_args()
+
+    setup = "".join(CLASS.format(index=index) for index in range(TYPES))
+    setup += "vec ks[auto] = []\n" + "".join(f"ks.append(k{index})\n" for index in range(TYPES))
+
+    backends = args.backends.split(",")
+    print(f"{'case':>12}" + "".join(f"{backend:>10}" for backend in backends) + "   (ns per read or call, over the empty loop)")
+    source = lambda case, types: setup + LOOP.format(calls=args.calls, types=types, body="\n".join([BODIES[case][0]] * BODIES[case][1]))
+    for case, types in CASES:
+        row = f"{case + ' x' + str(types):>12}"
+        for backend in backends:
+            empty = timed(source("empty", types), backend, args.repeat)
+            seconds = timed(source(case, types), backend, args.repeat)
+            row += f"{(seconds - empty) / (args.calls * BODIES[case][1]) * 1e9:>10.0f}"
+        print(row)
+
+if __name__ == "__main__":
+    main()
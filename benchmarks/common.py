@@ -0,0 +1,85 @@
+# shared bits for the benchmark scripts: puts boronlang on the path, gets programs ready and runs them on an engine, times things, and
+# generates big synthetic boron sources
+import contextlib, io, os, sys, time, random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "boronlang"))
+
+from lexer.lexer import Lexer
+from parsing.parser import Parser
+from parsing.optimizer import optimize
+from parsing.resolver import resolve
+from parsing import typechecker
+from assembler import BACKENDS
+
+# lexes, parses and runs the passes over a benchmark's program up front, so only running it gets timed. the passes annotate the tree
+# in place, every engine gets a copy of its own. without the type checking pass every declaration checks its type at runtime
+def prepare(source, typecheck=True):
+    program = resolve(optimize(Parser(Lexer(source).tokenize()).parse()))
+    return typechecker.typecheck(program) if typecheck else program
+
+# runs a prepared program on one engine with its output thrown away, name is the file it says it's running
+def run(program, backend, name="bench.b"):
+    with contextlib.redirect_stdout(io.StringIO()):
+        BACKENDS[backend](name, []).evaluate(program)
+
+# best wall time of a few runs, in seconds
+def best_of(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+# a function with a loop, an if chain and some arithmetic, the bread and butter of most boron files
+def function_block(i):
+    return f'''fn compute{i}(int n, int step) -> int {{
+    int total{i} = 0
+    for (int k = 0; k < n; k += step) {{
+        if k % 3 == 0 and k % 5 == 0 {{
+            total{i} += k * 2
+        }} else if k % 3 == 0 {{
+            total{i} -= 1
+        }} else {{
+            total{i} += (k ** 2) // 7
+        }}
+    }}
+    -> total{i}
+}}
+
+'''
+
+# declarations, calls and comments
+def statement_block(i):
+    return f'''#! block {i}
+int count{i} = {i} * 60 * 60 * 24
+dec ratio{i} = 3.14159 / {i + 1}.5
+str label{i} = "item number {i}"
+bool flag{i} = count{i} > 100 or ratio{i} < 2.0
+list items{i} = [{i}, {i + 1}, {i + 2}]
+out(toStr(compute{i}(count{i}, 2)) + label{i})
+
+'''
+
+# one very long generated line, like the ones our code generators spit out
+def long_line(i, terms=400):
+    return f"int wide{i} = " + " + ".join(f"value{j} * {j}" for j in range(terms)) + "\n"
+
+# a program of roughly the requested size in bytes
+def synthetic_source(size, shape="mixed", seed=0):
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    i = 0
+    while total < size:
+        if shape == "long":
+            part = long_line(i)
+        elif shape == "mixed":
+            part = rng.choice((function_block, statement_block, statement_block))(i)
+        else:
+            part = function_block(i) + statement_block(i)
+        parts.append(part)
+        total += len(part)
+        i += 1
+    return "".join(parts)
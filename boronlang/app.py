@@ -1,17 +1,41 @@
-from assembler import assemble
-import argparse, time
+from assembler import assemble, build, BACKENDS
+from parsing import optimizer, typechecker
+from codegen import generator
+from interpreter import tiered, inlinecaches
+import argparse, time, cache, sys
 timer = True
 
 def main() -> None:
+    if sys.argv[1:2] == ["compile"]:
+        return compile_main(sys.argv[2:])
+
     # parse args
     parser = argparse.ArgumentParser(description="Assemble a .b file")
     parser.add_argument("filename", help="Path to the .b file")
     parser.add_argument("extra_args", nargs="*", help="Additional arguments")
+    parser.add_argument("--no-cache", action="store_true", help="Always lex and parse, don't read or write __boroncache__")
+    parser.add_argument("--no-optimize", action="store_true", help="Skip the constant folding pass")
+    parser.add_argument("--no-typecheck", action="store_true", help="Skip the type checking pass, every declaration checks its type at runtime")
+    parser.add_argument("--type-stats", action="store_true", help="Print how many runtime type checks the type checker proved safe, and the ones it kept")
+    parser.add_argument("--backend", choices=BACKENDS, default="tree", help="Engine that runs the program (vm keeps boron calls off the python stack, so deep recursion only needs memory)")
+    parser.add_argument("--dis", action="store_true", help="Print the program's VM bytecode instead of running it")
+    parser.add_argument("--unchecked", action="store_true", help="Drop the type checks on declarations (python backend)")
+    parser.add_argument("--tier-threshold", type=int, default=tiered.threshold, help="Calls plus loop iterations before a function is compiled (tiered backend)")
+    parser.add_argument("--tier-stats", action="store_true", help="Print which functions tiered up and how often they deoptimized (tiered backend)")
+    parser.add_argument("--ic-stats", action="store_true", help="Print the inline cache hits and misses of every field access and method call site (all but the python backend)")
     args = parser.parse_args()
+    cache.cacheenabled = not args.no_cache
+    optimizer.optimizeenabled = not args.no_optimize
+    typechecker.typecheckenabled = not args.no_typecheck
+    typechecker.statsenabled = args.type_stats
+    generator.checksenabled = not args.unchecked
+    tiered.threshold = args.tier_threshold
+    tiered.statsenabled = args.tier_stats
+    inlinecaches.statsenabled = args.ic_stats
 
     # time and assemble
     if timer == True: start_time = time.perf_counter()
-    assemble(args.filename, args.extra_args if args.extra_args else None)
+    assemble(args.filename, args.extra_args if args.extra_args else None, args.backend, args.dis)
     if timer == True: end_time = time.perf_counter()
 
     # print elapsed time
@@ -19,5 +43,21 @@ def main() -> None:
         elapsed_ms = (end_time - start_time) * 1000
         print(f"Execution time: {elapsed_ms:.2f} ms")
 
+# app.py compile program.b -o program_boron.py
+def compile_main(argv) -> None:
+    parser = argparse.ArgumentParser(prog="app.py compile", description="Compile a .b file to a standalone python module")
+    parser.add_argument("filename", help="Path to the .b file")
+    parser.add_argument("-o", "--output", help="Module to write (default: the .b file's name with _boron.py on the end)")
+    parser.add_argument("--no-cache", action="store_true", help="Always lex and parse, don't read or write __boroncache__")
+    parser.add_argument("--no-optimize", action="store_true", help="Skip the constant folding pass")
+    parser.add_argument("--no-typecheck", action="store_true", help="Skip the type checking pass, every declaration checks its type at runtime")
+    parser.add_argument("--unchecked", action="store_true", help="Drop the type checks on declarations")
+    args = parser.parse_args(argv)
+    cache.cacheenabled = not args.no_cache
+    optimizer.optimizeenabled = not args.no_optimize
+    typechecker.typecheckenabled = not args.no_typecheck
+    generator.checksenabled = not args.unchecked
+    build(args.filename, args.output)
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
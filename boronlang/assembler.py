@@ -1,35 +1,94 @@
 from lexer.lexer import Lexer
 from parsing.parser import Parser
 from interpreter.interpreter import Interpreter
+from interpreter.closures import ClosureInterpreter
+from interpreter.tiered import TieredInterpreter
+from vm.machine import VirtualMachine
+from vm.disassembler import disassemble_program
+from codegen.backend import PythonBackend
+from codegen.generator import generate_module
+from codegen import runtime
+from interpreter import inlinecaches
+from cache import load_program
+from parsing.optimizer import optimize
+from parsing.resolver import resolve
+from parsing.typechecker import typecheck
 from os import _exit
+import hashlib, os
 
 global reprenabled
 reprenabled = False
 
-def assemble(filename, args) -> None:
-    try:
-        # open file
-        with open(filename, "r") as file:
-            code = file.read()
+# execution engines --backend can pick from, tree is the plain tree walking interpreter
+BACKENDS = {
+    "tree": Interpreter,
+    "closures": ClosureInterpreter,
+    "tiered": TieredInterpreter,
+    "vm": VirtualMachine,
+    "python": PythonBackend,
+}
 
-        # lexer
-        tokens = Lexer(code).tokenize()
+def assemble(filename, args, backend="tree", disassemble=False) -> None:
+    try:
         if reprenabled == True:
-            # print tokens
-            print("\nTokens:")
-            for token in tokens:
-                print(token)
+            # open file, the lexer pulls it in a line at a time as the parser asks for tokens
+            with open(filename, "r") as file:
+                # lexer, print tokens (needs all of them up front)
+                tokens = Lexer(file).tokenize()
+                print("\nTokens:")
+                for token in tokens:
+                    print(token)
 
-        # parser
-        ast = Parser(tokens).parse()
-        if reprenabled == True:
-            # print AST
-            print("\nAST:")
-            print(str(ast) + "\n")
+                # parser, print AST
+                ast = Parser(tokens).parse()
+                print("\nAST:")
+                print(str(ast) + "\n")
+        else:
+            # lex and parse it, or grab the AST out of __boroncache__ if the file hasn't changed
+            ast = load_program(filename)
+
+        # fold constants, work out where every name lives, then drop the type checks that can't fail before running
+        ast = typecheck(resolve(optimize(ast)), filename)
+
+        # print the VM code instead of running it
+        if disassemble:
+            print(disassemble_program(ast))
+            return
 
         # interpreter
-        Interpreter(filename, args).evaluate(ast)
+        engine = BACKENDS[backend](filename, args)
+        try:
+            engine.evaluate(ast)
+        finally:
+            if inlinecaches.statsenabled:
+                inlinecaches.print_stats(engine.caches)
 
     except FileNotFoundError:
         print("Error: File not found")
-        _exit(0)
\ No newline at end of file
+        _exit(0)
+
+# app.py compile: writes the program out as a python module that only needs boron_runtime.py, which gets put next to it
+def build(filename, output=None) -> None:
+    try:
+        with open(filename, "rb") as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+    except FileNotFoundError:
+        print("Error: File not found")
+        _exit(0)
+
+    ast = typecheck(resolve(optimize(load_program(filename))), filename)
+    if output is None:
+        output = os.path.splitext(filename)[0] + "_boron.py"
+    directory = os.path.dirname(os.path.abspath(output))
+    module = generate_module(ast, os.path.relpath(os.path.abspath(filename), directory), digest)
+    with open(output, "w") as file:
+        file.write(module)
+
+    # only rewritten when it's changed, so modules compiled side by side share one copy
+    with open(runtime.__file__, "r") as file:
+        support = file.read()
+    support_path = os.path.join(directory, "boron_runtime.py")
+    if not os.path.exists(support_path) or open(support_path, "r").read() != support:
+        with open(support_path, "w") as file:
+            file.write(support)
+    print(f"Compiled {filename} -> {output}")
@@ -0,0 +1,82 @@
+# on-disk cache of parsed programs, same idea as __pycache__ but for .b files. every cached ast is keyed by a hash of the
+# source it came from and a tag for the front end that built it, so changing either one just means a re-parse
+import hashlib, io, os, pickle, sys
+
+from lexer.lexer import Lexer
+from parsing.parser import Parser
+
+# disable or enable the cache
+global cacheenabled
+cacheenabled = True
+
+CACHE_DIR = "__boroncache__"
+MAGIC = b"BORONAST"
+
+# the files that make up the front end (relative to this one). if any of them change, so does the tag
+FRONTEND = ("lexer/lexer.py", "parsing/parser.py", "parsing/astnodes.py", "parsing/scope.py")
+tag = None
+
+# hash of the front end sources and the python version (the cache is a pickle), worked out once per process
+def compiler_tag():
+    global tag
+    if tag is None:
+        digest = hashlib.sha256(f"{sys.version_info[0]}.{sys.version_info[1]}".encode())
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in FRONTEND:
+            with open(os.path.join(here, name), "rb") as file:
+                digest.update(file.read())
+        tag = digest.hexdigest()[:16]
+    return tag
+
+# where the cached ast for a source file lives, ex. examples/__boroncache__/sieve.1a2b3c4d5e6f7a8b.ast
+def cache_path(filename):
+    directory, name = os.path.split(os.path.abspath(filename))
+    stem = os.path.splitext(name)[0]
+    return os.path.join(directory, CACHE_DIR, f"{stem}.{compiler_tag()}.ast")
+
+# loads a cached ast, none if there isn't one, it's for different source, or it's unreadable
+def read_cache(path, digest):
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+
+    header = MAGIC + digest
+    if not data.startswith(header):
+        return None
+    try:
+        return pickle.loads(memoryview(data)[len(header):])
+    except Exception:
+        return None
+
+# writes the ast next to the source. goes through a temp file so a half written cache never gets read,
+# and gives up quietly if the folder isn't writable or the tree is too deep to pickle
+def write_cache(path, digest, program):
+    try:
+        data = pickle.dumps(program, pickle.HIGHEST_PROTOCOL)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as file:
+            file.write(MAGIC + digest + data)
+        os.replace(temp, path)
+    except (OSError, RecursionError, pickle.PicklingError):
+        pass
+
+# gets the Program for a .b file, off the cache if it's still good, otherwise by lexing and parsing it (and caching the result)
+def load_program(filename):
+    if not cacheenabled:
+        with open(filename, "r") as file:
+            return Parser(Lexer(file).stream()).parse()
+
+    with open(filename, "rb") as file:
+        source = file.read()
+    digest = hashlib.sha256(source).digest()
+    path = cache_path(filename)
+
+    program = read_cache(path, digest)
+    if program is None:
+        # same decoding and newline handling as opening the file in text mode
+        program = Parser(Lexer(io.TextIOWrapper(io.BytesIO(source))).stream()).parse()
+        write_cache(path, digest, program)
+    return program
@@ -0,0 +1,32 @@
+# runs boron by generating python source for the whole program and handing it to python's compiler. the module it runs in is the
+# interpreter's global scope, so builtins, imported packages and imported .b files all land in the same place they always have
+import linecache
+
+from interpreter.interpreter import Interpreter
+from parsing.astnodes import Import
+from codegen.generator import generate
+from codegen.runtime import PREFIX, bindings
+
+class PythonBackend(Interpreter):
+    def __init__(self, filepath: str, args=[]):
+        super().__init__(filepath, args)
+        self.global_scope.update(bindings())
+        self.global_scope[PREFIX + "import_module"] = self.import_module
+        # no python builtins, a name boron doesn't have stays undefined instead of turning into python's
+        self.global_scope["__builtins__"] = {}
+        self.programs = 0
+
+    # imported .b files come through here too, each one gets its own tag so their hoisted constants don't collide
+    def evaluate_program(self, program):
+        tag = f"{self.programs}_" if self.programs else ""
+        self.programs += 1
+        source, objects = generate(program, tag)
+        self.global_scope.update(objects)
+
+        # so the traceback module (and debuggers) can show the generated lines
+        filename = f"<boron {self.filepath}{' #' + str(self.programs) if tag else ''}>"
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        exec(compile(source, filename, "exec"), self.global_scope)
+
+    def import_module(self, module, alias):
+        self.evaluate_import(Import(module, alias))
@@ -0,0 +1,694 @@
+# turns a resolved AST into python source. boron functions become python functions (their frame slots become python locals, globals
+# are globals of the module the source runs in), loops become python loops, and anything python can't do on its own (type checks,
+# classes, method calls) goes through codegen.runtime. the top level runs inside one function too, so globals are LOAD_GLOBALs
+import keyword, math
+from decimal import Decimal
+
+from lexer.lexer import TokenType, Token
+from parsing.astnodes import *
+from parsing.resolver import Binding, declared_name, function_name, writes, calls_out
+from codegen.runtime import PREFIX, VERSION
+
+#! disable or enable type checks on declarations. decimals still get converted either way, that changes what the program computes
+global checksenabled
+checksenabled = True
+
+P = PREFIX
+INDENT = "    "
+
+# binary operators python has itself (and/or are here for when the right side can't do anything, see binary_operation)
+BINARY_OPERATORS = {
+    TokenType.ADD: "+",
+    TokenType.SUBTRACT: "-",
+    TokenType.MULTIPLY: "*",
+    TokenType.DIVIDE: "/",
+    TokenType.POWER: "**",
+    TokenType.FLOOR_DIVIDE: "//",
+    TokenType.MODULUS: "%",
+    TokenType.LESS_THAN: "<",
+    TokenType.GREATER_THAN: ">",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.EQUAL: "==",
+    TokenType.NOT_EQUAL: "!=",
+}
+
+# compound assignments as a statement and as a runtime function for when the value is wanted (//= has always divided)
+COMPOUND = {
+    TokenType.INCREASE: ("+=", "iadd"),
+    TokenType.DECREASE: ("-=", "isub"),
+    TokenType.MULTEQ: ("*=", "imul"),
+    TokenType.DIVEQ: ("/=", "itruediv"),
+    TokenType.FLOOREQ: ("/=", "itruediv"),
+}
+
+# declared types that get checked: the name runtime.enforce knows it by, and the python type that passes as is
+CHECKED = {
+    TokenType.INTEGER: ("int", "int"),
+    TokenType.DECIMAL: ("dec", "Decimal"),
+    TokenType.BOOLEAN: ("bool", "bool"),
+    TokenType.STR: ("str", "str"),
+}
+
+# what a declaration without a value starts out as
+DEFAULTS = {
+    TokenType.INTEGER: 0,
+    TokenType.DECIMAL: Decimal(0),
+    TokenType.BOOLEAN: False,
+    TokenType.STR: "",
+}
+
+# loop conditions a for loop can become a python for over a range with: which way it counts, and whether it stops on stop itself
+RANGE_CONDITIONS = {
+    TokenType.LESS_THAN: (1, False),
+    TokenType.LESS_EQUAL: (1, True),
+    TokenType.GREATER_THAN: (-1, False),
+    TokenType.GREATER_EQUAL: (-1, True),
+}
+
+# statements that leave nothing behind, a method ending in one of these hands back None
+NO_VALUE = (IfStatement, ForLoop, WhileLoop, DoWhileLoop, TryStatement, Function, ReturnStatement, Break, Continue, Import, Imports,
+            RaiseStatement, EndOfFile)
+
+# a boron name as a python one, keywords get an underscore
+def pyname(name):
+    return name + "_" if keyword.iskeyword(name) else name
+
+# every name a function's own body uses as something other than one of its locals. nested functions and methods are their own python
+# functions, only their names count
+def outside_names(function):
+    names = set()
+    stack = list(function.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Function):
+            names.add(function_name(node))
+            continue
+        if isinstance(node, ClassLiteral):
+            stack.extend(node.body)
+            continue
+        if isinstance(node, (Identifier, FunctionCall, VariableDeclaration, ClassInstantiation)) and node.kind is not Binding.LOCAL:
+            name = declared_name(node) if isinstance(node, VariableDeclaration) else node.name
+            name = name.value if isinstance(name, Token) else name
+            if isinstance(name, str):
+                names.add(name)
+        if isinstance(node, ClassInstantiation):
+            names.add(node.typ.value)
+        elif isinstance(node, FieldAssignment) and isinstance(node.parent, Token):
+            names.add(node.parent.value)
+        if isinstance(node, ASTNode):
+            stack.extend(node.children())
+    return names
+
+# one python function being generated (the top level is one too)
+class Context:
+    __slots__ = ("function", "locals", "lines", "depth", "globals", "loops")
+
+    def __init__(self, function=None, locals=()):
+        self.function = function    # the Function node, None for the top level
+        self.locals = locals        # python name of every frame slot
+        self.lines = []
+        self.depth = 1
+        self.globals = set()        # globals it touches, they get declared global so stores land in the module
+        self.loops = []             # python loops around what's being generated, each with what a continue has to do first
+
+class Generator:
+    def __init__(self, tag=""):
+        self.tag = tag              # keeps the constants of programs sharing one module (imported .b files) apart
+        self.context = None
+        self.constants = []         # source of the constants hoisted to the top of the module
+        self.constant_names = {}
+        self.objects = {}           # values with no source form, the backend puts them in the module itself
+        self.temps = 0
+
+        self.statements = {
+            VariableDeclaration: self.variable_declaration_statement,
+            ClassInstantiation: self.class_instantiation_statement,
+            BinaryOperation: self.binary_operation_statement,
+            UnaryOperation: self.unary_operation_statement,
+            IndexAssignment: self.index_assignment_statement,
+            IfStatement: self.if_statement,
+            ForLoop: self.for_loop,
+            WhileLoop: self.while_loop,
+            DoWhileLoop: self.while_loop,
+            Function: self.function_statement,
+            ReturnStatement: self.return_statement,
+            TryStatement: self.try_statement,
+            RaiseStatement: self.raise_statement,
+            Break: lambda node: self.emit("break"),
+            Continue: self.continue_statement,
+            Import: self.import_statement,
+            Imports: lambda node: [self.import_statement(module) for module in node.modules],
+            EndOfFile: lambda node: None,
+        }
+
+        self.expressions = {
+            Constant: lambda node: self.constant(node.value),
+            IntLiteral: lambda node: self.constant(int(node.value)),
+            DecLiteral: lambda node: self.constant(Decimal(node.value)),
+            StringLiteral: lambda node: self.constant(str(node.value)),
+            BooleanLiteral: lambda node: self.constant(node.value.lower() == "true"),
+            NoneObject: lambda node: "None",
+            EndOfFile: lambda node: "None",
+            Identifier: lambda node: self.name(node, node.name),
+            ListLiteral: lambda node: "[" + ", ".join(self.expression(element) for element in node.elements) + "]",
+            DictLiteral: lambda node: "{" + ", ".join(f"{self.expression(key)}: {self.expression(value)}" for key, value in node.elements.items()) + "}",
+            RangeLiteral: lambda node: f"{P}range({self.expression(node.start)}, {self.expression(node.stop)}, {self.expression(node.increment)})",
+            ArrayLiteral: self.array_literal,
+            VectorLiteral: self.array_literal,
+            VariableDeclaration: self.variable_declaration,
+            BinaryOperation: self.binary_operation,
+            LogicalOperation: self.logical_operation,
+            ConditionalExpression: lambda node: f"({self.expression(node.if_value)} if {self.expression(node.condition)} else {self.expression(node.else_value)})",
+            UnaryOperation: self.unary_operation,
+            FunctionCall: self.function_call,
+            MethodCall: self.method_call,
+            IndexAccess: lambda node: f"{self.expression(node.container)}[{self.expression(node.index)}]",
+            IndexAssignment: self.index_assignment,
+            FieldAccess: self.field_access,
+            FieldAssignment: self.field_assignment,
+            ClassLiteral: self.class_literal,
+            ClassInstantiation: self.class_instantiation,
+        }
+        for operation in BINARY_OPERATIONS + COMPOUND_ASSIGNMENTS:
+            self.statements[operation] = self.binary_operation_statement
+            self.expressions[operation] = self.binary_operation
+
+    # output
+    def emit(self, line):
+        self.context.lines.append(INDENT * self.context.depth + line)
+
+    def block(self, statements):
+        self.context.depth += 1
+        start = len(self.context.lines)
+        for statement in statements:
+            self.statement(statement)
+        if len(self.context.lines) == start:
+            self.emit("pass")
+        self.context.depth -= 1
+
+    def temp(self, kind):
+        self.temps += 1
+        return f"{P}{kind}{self.temps}"
+
+    # a value as python source. anything without an exact source form gets hoisted to the top of the module
+    def constant(self, value):
+        if value is None or type(value) in (bool, int, str) or (type(value) is float and math.isfinite(value)):
+            text = repr(value)
+            return f"({text})" if text.startswith("-") else text
+        key = (type(value), repr(value))
+        if key not in self.constant_names:
+            name = self.constant_names[key] = f"{P}k{self.tag}{len(self.constant_names)}"
+            if type(value) is Decimal:
+                self.constants.append(f"{name} = {P}Decimal({str(value)!r})")
+            elif type(value) is float:
+                self.constants.append(f"{name} = {P}float({repr(value)!r})")
+            else:
+                self.objects[name] = value
+        return self.constant_names[key]
+
+    # names. locals are whatever the function's frame slot turned into, anything else is a module global
+    def name(self, node, name):
+        if node.kind is Binding.LOCAL and self.context.function is not None:
+            return self.context.locals[node.index]
+        name = pyname(name)
+        self.context.globals.add(name)
+        return name
+
+    def global_name(self, name):
+        name = pyname(name)
+        self.context.globals.add(name)
+        return name
+
+    # nodes nothing here knows how to run fail when they're reached, like they do in the tree walker
+    def unsupported(self, node):
+        return self.fail("NotImplementedError", f"Evaluation for {node} not implemented.")
+
+    def fail(self, exception, message):
+        return f"{P}fail({P}{exception}, {message!r})"
+
+    def expression(self, node):
+        handler = self.expressions.get(type(node))
+        if handler is None:
+            return self.unsupported(node)
+        return handler(node)
+
+    def statement(self, node):
+        handler = self.statements.get(type(node))
+        if handler is None:
+            self.emit(self.expression(node))
+        else:
+            handler(node)
+
+    # declarations and assignments. checked is False when the type checker proved the value already has the type
+    def enforced(self, value, var_type, checked=True):
+        if var_type not in CHECKED or not checked:
+            return value
+        kind, python_type = CHECKED[var_type]
+        if not checksenabled and kind != "dec":
+            return value
+        fallback = f"{P}enforce({kind!r}, {P}v)" if checksenabled else f"{P}Decimal({P}v)"
+        return f"({P}v if {P}type({P}v := {value}) is {P}{python_type} else {fallback})"
+
+    # target and value of a declaration, None if it has no usable name
+    def declaration(self, node):
+        name = declared_name(node)
+        if not isinstance(name, str):
+            return None
+        if node.value:
+            value = node.value
+            # constants that already have the declared type skip the check
+            if isinstance(value, Constant) and node.var_type in CHECKED and type(value.value).__name__ == CHECKED[node.var_type][1]:
+                return self.name(node, name), self.constant(value.value)
+            value = self.expression(value)
+        else:
+            value = self.constant(DEFAULTS.get(node.var_type))
+        return self.name(node, name), self.enforced(value, node.var_type, node.checked)
+
+    def variable_declaration(self, node):
+        declaration = self.declaration(node)
+        if declaration is None:
+            return self.fail("ValueError", "Invalid variable name type.")
+        return f"({declaration[0]} := {declaration[1]})"
+
+    def variable_declaration_statement(self, node):
+        declaration = self.declaration(node)
+        if declaration is None:
+            return self.emit(self.fail("ValueError", "Invalid variable name type."))
+        self.emit(f"{declaration[0]} = {declaration[1]}")
+
+    def array_literal(self, node):
+        elements = "[" + ", ".join(self.expression(element) for element in node.elements) + "]"
+        if not checksenabled:
+            return elements
+        kind = CHECKED[node.type][0] if node.type in CHECKED and node.checked else None
+        size = node.size if isinstance(node, ArrayLiteral) else None
+        if kind is None and size is None:
+            return elements
+        return f"{P}check_array({elements}, {kind!r}, {size!r})"
+
+    # operators
+    def binary_operation(self, node):
+        operator = node.operator
+        if not isinstance(node.left, ASTNode):
+            return self.unsupported(node.left)
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        if operator in BINARY_OPERATORS:
+            return f"({left} {BINARY_OPERATORS[operator]} {right})"
+        if operator in COMPOUND:
+            # the tree walker only knows how to write back to a plain variable
+            if not isinstance(node.left, Identifier):
+                message = f"'{type(node.left).__name__}' object has no attribute 'name'"
+                return f"({left}, {right}, {self.fail('AttributeError', message)})[2]"
+            return f"({left} := {P}{COMPOUND[operator][1]}({left}, {right}))"
+        # x++ and x-- in binary position, the right side still runs
+        if operator in (TokenType.INCREMENT, TokenType.DECREMENT):
+            return f"(({left}, {right})[0] {'+' if operator is TokenType.INCREMENT else '-'} 1)"
+        return f"({left}, {right}, {self.fail('NotImplementedError', f'Binary operator {operator} not implemented.')})[2]"
+
+    # python's and/or short circuit and hand back the deciding side, same as boron's
+    def logical_operation(self, node):
+        return f"({self.expression(node.left)} {'and' if node.operator is TokenType.AND else 'or'} {self.expression(node.right)})"
+
+    def binary_operation_statement(self, node):
+        if node.operator in COMPOUND and isinstance(node.left, Identifier):
+            target = self.name(node.left, node.left.name)
+            self.emit(f"{target} {COMPOUND[node.operator][0]} {self.expression(node.right)}")
+        else:
+            self.emit(self.binary_operation(node))
+
+    def unary_operation(self, node):
+        operator, operand = node.operator, node.operand
+        value = self.expression(operand)
+        if operator is TokenType.NOT:
+            # !x on a variable flips it in place
+            if isinstance(operand, Identifier):
+                return f"({value} := {P}negate({value}, {operand.name!r}))"
+            return f"(not {value})"
+        if operator in (TokenType.INCREMENT, TokenType.DECREMENT):
+            sign = "+" if operator is TokenType.INCREMENT else "-"
+            # x++ hands back the old value
+            if isinstance(operand, Identifier):
+                return f"({value}, {value} := {value} {sign} 1)[0]"
+            return f"({value} {sign} 1)"
+        return f"({value}, {self.fail('NotImplementedError', f'Unary operator {operator} not implemented.')})[1]"
+
+    def unary_operation_statement(self, node):
+        operator, operand = node.operator, node.operand
+        if not isinstance(operand, Identifier):
+            return self.emit(self.unary_operation(node))
+        target = self.name(operand, operand.name)
+        if operator is TokenType.NOT:
+            self.emit(f"{target} = {P}negate({target}, {operand.name!r})")
+        elif operator is TokenType.INCREMENT:
+            self.emit(f"{target} += 1")
+        elif operator is TokenType.DECREMENT:
+            self.emit(f"{target} -= 1")
+        else:
+            self.emit(self.unary_operation(node))
+
+    # containers and classes
+    def index_assignment(self, node):
+        container, index, value = (self.expression(child) for child in (node.container, node.index, node.value))
+        if not isinstance(node.container, Identifier):
+            return f"{P}set_index({container}, {index}, {value})"
+        # strings are immutable, so assigning into one writes a new string back to the variable
+        return f"(({container} := {P}set_char({container}, {index}, {value})) if {P}type({container}) is {P}str else {P}set_index({container}, {index}, {value}))"
+
+    def index_assignment_statement(self, node):
+        if not isinstance(node.container, Identifier):
+            return self.emit(self.index_assignment(node))
+        container, index, value = (self.expression(child) for child in (node.container, node.index, node.value))
+        self.emit(f"if {P}type({container}) is {P}str:")
+        self.emit(f"{INDENT}{container} = {P}set_char({container}, {index}, {value})")
+        self.emit("else:")
+        self.emit(f"{INDENT}{container}[{index}] = {value}")
+
+    def field_access(self, node):
+        field_name = node.field.name if hasattr(node.field, 'name') else node.field
+        return f"{P}get_field({self.expression(node.parent)}, {field_name!r})"
+
+    def field_assignment(self, node):
+        parent = self.global_name(node.parent.value) if isinstance(node.parent, Token) else self.expression(node.parent)
+        field_name = node.field.value if hasattr(node.field, "value") else node.field
+        return f"{P}set_field({parent}, {field_name!r}, {self.expression(node.value)})"
+
+    # the class gets built where it's defined (methods first, then its env, then the statements in its body), the name of the
+    # temporary holding it is what the expression comes out as
+    def class_literal(self, node):
+        if node.parent:
+            return self.unsupported(node.parent)
+        class_name = node.name.value if hasattr(node.name, "value") else node.name
+        methods = {}
+        for method in node.methods:
+            name = f"{P}{class_name}_{function_name(method)}"
+            self.function(method, name, method=True)
+            methods[function_name(method)] = name
+        temp = self.temp("c")
+        fields = tuple(field.name for field in node.fields)
+        env = "{" + ", ".join(f"{key!r}: {value}" for key, value in methods.items()) + "}"
+        texts = {function_name(method): repr(method) for method in node.methods}
+        self.emit(f"{temp} = {P}define_class({class_name!r}, {fields!r}, {env}, {repr(node)!r}, {texts!r})")
+        for statement in node.body:
+            self.statement(statement)
+        return temp
+
+    def class_instantiation(self, node):
+        return f"({self.name(node, node.name.value)} := {self.new(node)})"
+
+    def class_instantiation_statement(self, node):
+        self.emit(f"{self.name(node, node.name.value)} = {self.new(node)}")
+
+    def new(self, node):
+        typ = node.typ.value
+        arguments = self.arguments(node.arguments, node.kwargs)
+        return f"{P}new({self.global_name(typ)}, {typ!r}{', ' + arguments if arguments else ''})"
+
+    # calls
+    def arguments(self, parameters, kwargs):
+        arguments = [self.expression(argument) for argument in parameters]
+        for key, value in kwargs.items():
+            if key.isidentifier() and not keyword.iskeyword(key):
+                arguments.append(f"{key}={self.expression(value)}")
+            else:
+                arguments.append(f"**{{{key!r}: {self.expression(value)}}}")
+        return ", ".join(arguments)
+
+    # keyword arguments get bound by the runtime, the python function only takes positional ones
+    def function_call(self, node):
+        function = self.name(node, node.name)
+        if node.kwargs:
+            arguments = "".join(f"{self.expression(argument)}, " for argument in node.parameters)
+            kwargs = ", ".join(f"{key!r}: {self.expression(value)}" for key, value in node.kwargs.items())
+            return f"{P}call({function}, ({arguments}), {{{kwargs}}})"
+        return f"{function}({self.arguments(node.parameters, node.kwargs)})"
+
+    def method_call(self, node):
+        method_name = node.name.value if hasattr(node.name, "value") else node.name
+        arguments = self.arguments(node.parameters, node.kwargs)
+        return f"{P}call_method({self.expression(node.parent)}, {method_name!r}{', ' + arguments if arguments else ''})"
+
+    # control flow
+    def if_statement(self, node):
+        self.emit(f"if {self.expression(node.condition)}:")
+        self.block(node.if_body)
+        while isinstance(node.else_body, IfStatement):
+            node = node.else_body
+            self.emit(f"elif {self.expression(node.condition)}:")
+            self.block(node.if_body)
+        if node.else_body:
+            self.emit("else:")
+            self.block(node.else_body)
+
+    def for_loop(self, node):
+        self.statement(node.initializer)
+        if self.range_loop(node):
+            return
+        self.emit(f"while {self.expression(node.condition)}:")
+        self.loop_body(node.body + [node.increment], node.increment)
+
+    # for (int i = start; i < stop; i++) where nothing in the loop can touch i or stop is a python for over a range. i ends up
+    # where the boron loop would have left it (the first value that failed the condition) unless it was broken out of
+    def range_loop(self, node):
+        initializer, condition, increment = node.initializer, node.condition, node.increment
+        if not (isinstance(initializer, VariableDeclaration) and initializer.var_type is TokenType.INTEGER):
+            return False
+        name = declared_name(initializer)
+        if not (isinstance(condition, BinaryOperation) and condition.operator in RANGE_CONDITIONS):
+            return False
+        if not (isinstance(condition.left, Identifier) and condition.left.name == name and condition.left.kind is initializer.kind):
+            return False
+        direction, inclusive = RANGE_CONDITIONS[condition.operator]
+
+        # i++, i--, i += n, i -= n with a constant n
+        step = None
+        if isinstance(increment, UnaryOperation) and isinstance(increment.operand, Identifier) and increment.operand.name == name:
+            step = {TokenType.INCREMENT: 1, TokenType.DECREMENT: -1}.get(increment.operator)
+        elif (isinstance(increment, BinaryOperation) and increment.operator in (TokenType.INCREASE, TokenType.DECREASE) and
+                isinstance(increment.left, Identifier) and increment.left.name == name and isinstance(increment.right, Constant) and
+                type(increment.right.value) is int and increment.right.value > 0):
+            step = increment.right.value if increment.operator is TokenType.INCREASE else -increment.right.value
+        if step is None or (step > 0) != (direction > 0):
+            return False
+
+        stop = condition.right
+        names = {name}
+        if isinstance(stop, Identifier):
+            names.add(stop.name)
+        elif not isinstance(stop, Constant):
+            return False
+        if writes(node.body, names):
+            return False
+        # a global could still get written by whatever the body calls
+        if any(getattr(child, "kind", None) is not Binding.LOCAL for child in (initializer, stop) if not isinstance(child, Constant)):
+            if calls_out(node.body):
+                return False
+
+        target = self.name(initializer, name)
+        start, values = self.temp("a"), self.temp("s")
+        self.emit(f"{start} = {target}")
+        self.emit(f"{values} = {P}span({target}, {self.expression(stop)}, {step}, {inclusive})")
+        self.emit(f"for {target} in {values}:")
+        self.loop_body(node.body, None)
+        self.emit("else:")
+        self.emit(f"{INDENT}{target} = {start} + {P}len({values}) * {self.constant(step)}")
+        return True
+
+    # both kinds of while run the body before checking, same as the tree walker
+    def while_loop(self, node):
+        self.emit("while True:")
+        self.loop_body(node.body, node)
+        self.emit(f"{INDENT}if not {self.expression(node.condition)}:")
+        self.emit(f"{INDENT * 2}break")
+
+    # before is what a continue runs on the way back to the top: a for loop's increment, the check of a while loop (a node with a
+    # condition), or None for loops python steps itself
+    def loop_body(self, statements, before):
+        self.context.loops.append(before)
+        self.block(statements)
+        self.context.loops.pop()
+
+    def continue_statement(self, node):
+        before = self.context.loops[-1]
+        if isinstance(before, (WhileLoop, DoWhileLoop)):
+            self.emit(f"if not {self.expression(before.condition)}:")
+            self.emit(f"{INDENT}break")
+        elif before is not None:
+            self.statement(before)
+        self.emit("continue")
+
+    def return_statement(self, node):
+        value = self.expression(node.values[0]) if node.values else "None"
+        if self.context.function is None:
+            self.emit(f"raise {P}ReturnException({value})")
+        else:
+            self.emit(f"return {value}")
+
+    # catches are picked by the exception's class name, anything else goes on up
+    def try_statement(self, node):
+        error = self.temp("e")
+        self.emit("try:")
+        self.block(node.body)
+        self.emit(f"except {P}Exception as {error}:")
+        self.context.depth += 1
+        keyword = "if"
+        for name, catch in node.catches.items():
+            self.emit(f"{keyword} {P}type({error}).__name__ == {name!r}:")
+            self.block(catch.body)
+            keyword = "elif"
+        if keyword == "elif":
+            self.emit("else:")
+            self.emit(f"{INDENT}raise")
+        else:
+            self.emit("raise")
+        self.context.depth -= 1
+
+    def raise_statement(self, node):
+        if not isinstance(node.error, str):
+            return self.emit(self.fail("TypeError", f"Invalid exception specifier: {node.error!r}"))
+        message = str(node.message) if node.message is not None else None
+        self.emit(f"{P}raise_error({node.error!r}, {message!r})")
+
+    def import_statement(self, node):
+        self.emit(f"{P}import_module({node.module!r}, {node.alias!r})")
+
+    # functions
+    def function_statement(self, node):
+        self.function(node, self.global_name(function_name(node)))
+
+    # generates a python def for a boron function or method, where the current function is. it binds arguments like
+    # interpreter.Binder: extra positional ones go in a tuple nothing reads, and a parameter that didn't get one is UNBOUND, which
+    # only has to be checked on the last one. self is always passed. keyword arguments go through runtime.call with the names
+    def function(self, node, python_name, method=False):
+        outside = outside_names(node)
+        locals = []
+        for slot, name in enumerate(node.locals or ()):
+            local = pyname(name)
+            # a name the function also reads as a global before declaring it gets its own python name
+            if slot >= len(node.parameters) and (name in outside or local.startswith(P)):
+                local = f"{P}l{slot}_{name}"
+            locals.append(local)
+
+        outer, self.context = self.context, Context(node, tuple(locals))
+        if method:
+            self.method_body(node)
+        else:
+            self.function_body(node)
+        context, self.context = self.context, outer
+
+        parameters = list(context.locals[:len(node.parameters)])
+        first = 1 if method else 0
+        signature = parameters[:first] + [f"{parameter}={P}UNBOUND" for parameter in parameters[first:]] + [f"*{P}extra"]
+        names = tuple(param.name for param in node.parameters)
+        if not method:
+            where = ""
+        elif function_name(node) == "__init__":
+            where = " in __init__"
+        else:
+            where = f" in method '{function_name(node)}'"
+
+        self.emit(f"def {python_name}({', '.join(signature)}):")
+        if context.globals:
+            self.emit(f"{INDENT}global {', '.join(sorted(context.globals))}")
+        if len(parameters) > first:
+            self.emit(f"{INDENT}if {parameters[-1]} is {P}UNBOUND:")
+            self.emit(f"{INDENT * 2}{P}missing(({', '.join(parameters)},), {names!r}, {where!r})")
+        if not context.lines:
+            self.emit(f"{INDENT}pass")
+        prefix = INDENT * self.context.depth
+        self.context.lines.extend(prefix + line for line in context.lines)
+        self.emit(f"{python_name}.{P}binding = ({names!r}, {where!r})")
+
+    # a self call returned by the last statement rebinds the parameters and goes around again instead of recursing
+    def function_body(self, function):
+        statements = function.body
+        last = statements[-1] if statements else None
+        if isinstance(last, ReturnStatement) and last.values and isinstance(last.values[0], FunctionCall):
+            call = last.values[0]
+            called_name = call.name if isinstance(call.name, str) else getattr(call.name, "value", None)
+            if called_name == function_name(function):
+                self.emit("while True:")
+                self.context.depth += 1
+                for statement in statements[:-1]:
+                    self.statement(statement)
+                self.tail_call(function, call)
+                self.context.depth -= 1
+                return
+
+        for statement in statements:
+            self.statement(statement)
+
+    # arguments are worked out in order before any parameter changes, keyword arguments that don't match a parameter still run
+    def tail_call(self, function, call):
+        parameters = function.parameters
+        targets, values = [], []
+        for i, argument in enumerate(call.parameters):
+            targets.append(self.context.locals[i] if i < len(parameters) else f"{P}x")
+            values.append(self.expression(argument))
+        names = [param.name for param in parameters]
+        for key, argument in call.kwargs.items():
+            index = names.index(key) if key in names else -1
+            targets.append(self.context.locals[index] if index >= len(call.parameters) else f"{P}x")
+            values.append(self.expression(argument))
+        if values:
+            self.emit(f"{', '.join(targets)} = {', '.join(values)}")
+        for i, param in enumerate(parameters[len(call.parameters):], len(call.parameters)):
+            if param.name not in call.kwargs:
+                message = f"Missing argument for parameter '{param.name}'"
+                self.emit(f"raise {P}TypeError({message!r})")
+                return
+
+    # a method hands back the last statement's value when it doesn't return
+    def method_body(self, method):
+        for statement in method.body[:-1]:
+            self.statement(statement)
+        if method.body:
+            last = method.body[-1]
+            if isinstance(last, NO_VALUE):
+                self.statement(last)
+            else:
+                self.emit(f"return {self.expression(last)}")
+
+    # the whole program as lines of a module: hoisted constants, then a function holding the top level, then a call to it. every top
+    # level statement shrugs off a ctrl+c and the program carries on, like in the tree walker
+    def program(self, program):
+        self.context = Context()
+        for statement in program.statements:
+            if isinstance(statement, EndOfFile):
+                continue
+            self.emit("try:")
+            self.block([statement])
+            self.emit(f"except {P}KeyboardInterrupt:")
+            self.emit(f"{INDENT}{P}interrupted()")
+        context = self.context
+
+        lines = list(self.constants)
+        lines.append(f"def {P}main():")
+        if context.globals:
+            lines.append(f"{INDENT}global {', '.join(sorted(context.globals))}")
+        lines.extend(context.lines or [f"{INDENT}pass"])
+        lines.append(f"{P}main()")
+        return lines
+
+# python source for a resolved program, and the values it needs that couldn't be written out as source
+def generate(program, tag=""):
+    generator = Generator(tag)
+    lines = generator.program(program)
+    return "\n".join(lines) + "\n", generator.objects
+
+# a module that runs on its own with just the runtime (app.py compile). source is the .b file relative to where the module goes,
+# digest the sha256 of what was compiled, so loading it can tell when the .b file has moved on
+def generate_module(program, source, digest):
+    generator = Generator()
+    lines = generator.program(program)
+    if generator.objects:
+        raise ValueError(f"Can't write the constant {next(iter(generator.objects.values()))!r} into a compiled module.")
+
+    header = [
+        f"# compiled from {source} by boron, edit that and recompile instead of changing this file",
+        "# runs with nothing but boron_runtime.py next to it, importing it runs the program's top level",
+        f"from boron_runtime import load as {P}load",
+        f"{P}load(globals(), {source!r}, {digest!r}, {VERSION})",
+    ]
+    return "\n".join(header + lines) + "\n"
@@ -0,0 +1,471 @@
+# support code for boron compiled to python. the generated code calls these through names starting with PREFIX (its globals have no
+# python builtins in them, so a boron name can never turn into a python one by accident). only needs the standard library, app.py compile
+# copies this file next to the modules it writes as boron_runtime.py
+from datetime import datetime
+from decimal import Decimal
+from operator import iadd, isub, imul, itruediv
+import builtins, hashlib, importlib, os, re, sys
+
+# every name the generated code uses starts with this, boron programs shouldn't
+PREFIX = "_boron_"
+
+# bumped whenever compiled modules need something this file didn't have before
+VERSION = 3
+
+# what a parameter starts out as when nothing got passed for it
+UNBOUND = object()
+
+# return at the top level, same as the tree walker's
+class ReturnException(Exception):
+    def __init__(self, value):
+        self.value = value
+
+# a class defined in boron. layout gives each field its slot in an instance, methods holds the python functions and texts what they
+# print as. text is what the tree walker's class node prints as, so printing the class looks the same
+class BoronClass:
+    __slots__ = ("name", "layout", "methods", "texts", "text")
+
+    def __init__(self, name, layout, methods, texts, text):
+        self.name = name
+        self.layout = layout
+        self.methods = methods
+        self.texts = texts
+        self.text = text
+
+    def __repr__(self):
+        return self.text
+
+# stands in for a method's node in env
+class Text:
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return self.text
+
+# an instance, laid out the same way as the interpreter's (interpreter/instances.py): field values in a list in layout order, fields
+# the class doesn't declare in extra, and what it prints as put together from its arguments when it's printed
+class Instance:
+    __slots__ = ("cls", "values", "args", "kwargs", "extra")
+
+    def __init__(self, cls, args, kwargs):
+        self.cls = cls
+        self.values = [None] * len(cls.layout)
+        self.args = args
+        self.kwargs = kwargs or None
+        self.extra = None
+
+    def get(self, name):
+        index = self.cls.layout.get(name)
+        if index is not None:
+            return self.values[index]
+        if self.extra is not None and name in self.extra:
+            return self.extra[name]
+        return self.cls.texts.get(name)
+
+    def set(self, name, value):
+        index = self.cls.layout.get(name)
+        if index is not None:
+            self.values[index] = value
+        elif self.extra is None:
+            self.extra = {name: value}
+        else:
+            self.extra[name] = value
+
+    def __str__(self):
+        args_str = ", ".join(str(arg) for arg in self.args)
+        kwargs_str = ", ".join(f"{key}={value}" for key, value in self.kwargs.items()) if self.kwargs else ""
+        sep = ", " if args_str and kwargs_str else ""
+        return f"{self.cls.name}({args_str}{sep}{kwargs_str})"
+
+    __repr__ = __str__
+
+# same checks (and conversions) as Interpreter.enforce_type, kind is the declared type's name
+def enforce(kind, value):
+    # ensure integers are whole numbers
+    if kind == "int":
+        if isinstance(value, Decimal):
+            if value % 1 != 0:
+                raise ValueError("Cannot assign non-integer value {} to an integer.".format(value))
+            return int(value)
+        if isinstance(value, int):
+            return value
+        raise ValueError("Expected integer, got {} with value {}.".format(type(value), value))
+
+    # ensure decimals are stored as Decimal
+    elif kind == "dec":
+        if isinstance(value, (Decimal, int)):
+            return Decimal(value)
+        raise ValueError("Expected decimal, got {} with value {}.".format(type(value), value))
+
+    # ensure booleans are actual booleans
+    elif kind == "bool":
+        if isinstance(value, bool):
+            return value
+        raise ValueError("Expected boolean, got {} with value {}.".format(type(value), value))
+
+    # ensure strings are proper string literals
+    elif kind == "str":
+        if isinstance(value, str):
+            return value
+        raise ValueError("Expected string, got {} with value {}.".format(type(value), value))
+
+    return value
+
+# arrays check their size, both arrays and vectors check their elements (but keep them as they are)
+def check_array(elements, kind, size=None):
+    if size is not None and len(elements) > int(size):
+        raise ValueError(f"Array size mismatch: expected {size}, got {len(elements)}")
+    for element in elements:
+        enforce(kind, element)
+    return elements
+
+# !x on a variable, the generated code stores what comes back
+def negate(value, name):
+    if isinstance(value, bool):
+        return not value
+    raise TypeError(f"'{name}' is not a boolean and cannot be negated.")
+
+# raising from the middle of an expression
+def fail(exception, message):
+    raise exception(message)
+
+def raise_error(error, message):
+    exception = getattr(builtins, error, None)
+    if not (isinstance(exception, type) and issubclass(exception, BaseException)):
+        raise NameError(f"Exception {exception} not a defined Exception. Please create it to use it.")
+    if message is not None:
+        raise exception(str(message))
+    raise exception()
+
+# s[i] = c on a string makes a new one, the generated code writes it back to the variable
+def set_char(text, index, value):
+    try:
+        return text[:index] + value + text[index + 1:]
+    except IndexError:
+        raise IndexError("Index out of range.")
+
+# container[index] = value anywhere else, hands back what the tree walker would
+def set_index(container, index, value):
+    if not isinstance(container, (list, str, dict)):
+        raise TypeError("Index access is only supported on lists or arrays.")
+    if isinstance(container, str):
+        return set_char(container, index, value)
+    try:
+        container[index] = value
+    except IndexError:
+        raise IndexError("Index out of range.")
+    return value
+
+# what for (int i = start; i < stop; i += step) walks through when nothing in the loop writes to i or stop. a range when both ends
+# are ints, otherwise the values worked out up front
+def span(start, stop, step, inclusive):
+    if type(start) is int and type(stop) is int:
+        return range(start, stop + (1 if step > 0 else -1) if inclusive else stop, step)
+    values = []
+    if step > 0:
+        while (start <= stop) if inclusive else (start < stop):
+            values.append(start)
+            start += step
+    else:
+        while (start >= stop) if inclusive else (start > stop):
+            values.append(start)
+            start += step
+    return values
+
+# classes and instances
+def define_class(name, fields, methods, text, method_texts):
+    layout = {}
+    for field in fields:
+        layout.setdefault(field, len(layout))
+    texts = {method: Text(method_text) for method, method_text in method_texts.items()}
+    return BoronClass(name, layout, methods, texts, text)
+
+def new(cls, typ, /, *args, **kwargs):
+    # native python classes just get called
+    if isinstance(cls, type):
+        return cls(*args, **kwargs)
+
+    instance = Instance(cls, args, kwargs)
+    init = cls.methods.get('__init__')
+    if init is not None and kwargs:
+        call(init, (instance, *args), kwargs)
+    elif init is not None:
+        init(instance, *args)
+    return instance
+
+def get_field(instance, name):
+    if not isinstance(instance, Instance):
+        raise TypeError("Field access target is not a valid instance.")
+    return instance.get(name)
+
+def set_field(instance, name, value):
+    if not isinstance(instance, Instance):
+        raise TypeError("Field assignment target is not a valid instance.")
+    instance.set(name, value)
+    return value
+
+# the builtin types' methods, same table as interpreter/builtins.py's METHODS
+METHODS = {
+    list: {
+        "length": len,
+        "append": list.append,
+        "extend": list.extend,
+        "insert": list.insert,
+        "pop": list.pop,
+        "remove": list.remove,
+        "index": list.index,
+        "count": list.count,
+        "reverse": list.reverse,
+        "sort": list.sort,
+        "clear": list.clear,
+        "copy": list.copy,
+    },
+    str: {
+        "length": len,
+        "split": str.split,
+        "join": str.join,
+        "find": str.find,
+        "rfind": str.rfind,
+        "index": str.index,
+        "count": str.count,
+        "replace": str.replace,
+        "upper": str.upper,
+        "lower": str.lower,
+        "strip": str.strip,
+        "lstrip": str.lstrip,
+        "rstrip": str.rstrip,
+        "startswith": str.startswith,
+        "endswith": str.endswith,
+    },
+    dict: {
+        "length": len,
+        "keys": dict.keys,
+        "values": dict.values,
+        "items": dict.items,
+        "get": dict.get,
+        "pop": dict.pop,
+        "update": dict.update,
+        "setdefault": dict.setdefault,
+        "clear": dict.clear,
+        "copy": dict.copy,
+    },
+}
+
+# calls with keyword arguments. a boron function carries its parameter names and what its errors say after them (see
+# generator.function), and gets bound the way interpreter.Binder binds: positional arguments first (extra ones get dropped), then
+# keyword arguments fill in the rest. one for a parameter that was already passed (self too) is ignored. python functions just get called
+def call(function, args, kwargs):
+    binding = getattr(function, PREFIX + "binding", None)
+    if binding is None:
+        return function(*args, **kwargs)
+    names, where = binding
+    given = min(len(args), len(names))
+    values = list(args[:given]) + [UNBOUND] * (len(names) - given)
+    unexpected = None
+    for key, value in kwargs.items():
+        if key not in names:
+            if unexpected is None:
+                unexpected = key
+        elif names.index(key) >= given:
+            values[names.index(key)] = value
+    missing(values, names, where)
+    if unexpected is not None:
+        raise TypeError(f"Unexpected keyword argument '{unexpected}'{where}")
+    return function(*values)
+
+# the first parameter nothing got passed for, a boron function checks its last one on the way in and ends up here when it's unbound
+def missing(values, names, where=""):
+    for value, name in zip(values, names):
+        if value is UNBOUND:
+            raise TypeError(f"Missing argument for parameter '{name}'{where}")
+
+# obj.method(...): the builtin types' methods, .length() on anything else list or str, methods of boron classes, and attributes of
+# anything else (packages, python objects)
+def call_method(obj, method, /, *args, **kwargs):
+    methods = METHODS.get(type(obj))
+    if methods is not None and method in methods:
+        return methods[method](obj, *args, **kwargs)
+    if method == "length" and isinstance(obj, (list, str)):
+        return len(obj)
+    if isinstance(obj, Instance):
+        methods = obj.cls.methods
+        if method not in methods:
+            raise AttributeError(f"Class '{obj.cls}' does not have a method '{method}'.")
+        if kwargs:
+            return call(methods[method], (obj, *args), kwargs)
+        return methods[method](obj, *args)
+    function = getattr(obj, method, None)
+    if function is None:
+        raise AttributeError(f"Package '{obj}' does not have a method '{method}'.")
+    return function(*args, **kwargs)
+
+def interrupted():
+    show("[red]KeyboardInterrupt[/red]")
+
+# output goes through rich when it's installed, imported the first time something gets printed. without it the markup just gets dropped
+MARKUP = re.compile(r"\\?\[[a-z#/@][^\[\]]*\]")
+rich = None
+
+def console():
+    global rich
+    if rich is None:
+        try:
+            import rich.prompt
+        except ImportError:
+            rich = False
+    return rich
+
+def show(text):
+    if console():
+        rich.print(text)
+    else:
+        print(MARKUP.sub("", text))
+
+def ask(text):
+    if console():
+        return rich.prompt.Prompt.ask(text)
+    return input(MARKUP.sub("", text) + ": ")
+
+# the builtin functions, same as interpreter/builtins.py but without needing rich
+def length(value):
+    try:
+        if type(value) == int:
+            return len(str(value))
+        return len(value)
+    except TypeError:
+        raise ValueError("Object has no length.")
+
+def out(data):
+    # instances print as what they were made with, in a list too
+    if isinstance(data, Instance):
+        show(f"[white]{data}[/white]")
+    elif isinstance(data, list):
+        for index, item in enumerate(data):
+            if isinstance(item, Instance):
+                data[index] = str(item)
+        show(f"[white]{data}[/white]")
+    else:
+        show(f"[white]{data}[/white]")
+
+def log(category, message):
+    show(f"[blue][{category}, {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}][/blue] {message}")
+
+def inp(data):
+    try:
+        return ask(data)
+    except KeyboardInterrupt:
+        show("[bold red]KeyboardInterrupt[/bold red]")
+        sys.exit(0)
+
+def err(typ, data):
+    show(f"[bold red]{typ}Error: {data}[/bold red]")
+
+def toInt(string):
+    try:
+        return int(string)
+    except ValueError:
+        show(f"[red]StringError: The string: '{string}' cannot validly be converted to an integer. Possibly not an int value, or contains characters?'[/red]")
+        sys.exit(0)
+
+def toDec(string):
+    try:
+        return Decimal(string)
+    except ValueError:
+        show(f"[red]StringError: The string: '{string}' cannot validly be converted to an decimal. Possibly not an decimal/int value, or contains characters?'[/red]")
+        sys.exit(0)
+
+BUILTINS = {
+    "inp": inp,
+    "out": out,
+    "err": err,
+    "log": log,
+
+    "length": length,
+
+    "toInt": toInt,
+    "toStr": str,
+    "toDec": toDec,
+    "toBool": bool,
+
+    "exit": sys.exit,
+    "isinstance": lambda obj, info: bool(isinstance(obj, info)),
+    "type": lambda obj: type(obj).__name__,
+
+    "sort": sorted,
+    "contains": lambda text, substring: substring in text,
+}
+
+# import inside a compiled module: a python module off the path, or another compiled boron file (name_boron). like the interpreter,
+# the module and everything callable in it end up as globals
+def import_module(namespace, module_name, alias):
+    try:
+        module = importlib.import_module(module_name)
+    except ModuleNotFoundError as error:
+        if error.name != module_name:
+            raise
+        try:
+            module = importlib.import_module(f"{module_name}_boron")
+        except ModuleNotFoundError:
+            raise ImportError(f"Package '{module_name}' not found, and there's no compiled {module_name}_boron module either.")
+    namespace[alias or module_name] = module
+    for attr_name in dir(module):
+        attr = getattr(module, attr_name)
+        if isinstance(attr, type) or callable(attr):
+            namespace[attr_name] = attr
+
+# first thing a compiled module does: checks it was built against this runtime and (when the .b file is around) from the source
+# that's there now, then fills its globals with the builtins and everything the generated code calls
+def load(namespace, source, digest, version):
+    if version != VERSION:
+        raise ImportError(f"{namespace.get('__file__', source)} was compiled for boron runtime {version}, this is runtime {VERSION}. Recompile it.")
+
+    path = os.path.join(os.path.dirname(os.path.abspath(namespace.get("__file__", source))), source)
+    try:
+        with open(path, "rb") as file:
+            current = hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        current = digest
+    if current != digest:
+        print(f"Warning: {namespace.get('__file__')} is out of date, {source} has changed since it was compiled.", file=sys.stderr)
+
+    namespace.update(BUILTINS)
+    cliargs = sys.argv[1:] or None
+    namespace["args"] = lambda: cliargs
+    namespace.update(bindings())
+    namespace[PREFIX + "import_module"] = lambda module_name, alias: import_module(namespace, module_name, alias)
+    namespace["__builtins__"] = {}
+
+# everything above (and the few python builtins the generated code needs) under the names the generated code uses
+def bindings():
+    names = {
+        "ReturnException": ReturnException,
+        "enforce": enforce,
+        "check_array": check_array,
+        "negate": negate,
+        "fail": fail,
+        "raise_error": raise_error,
+        "set_char": set_char,
+        "set_index": set_index,
+        "span": span,
+        "define_class": define_class,
+        "new": new,
+        "get_field": get_field,
+        "set_field": set_field,
+        "call_method": call_method,
+        "call": call,
+        "missing": missing,
+        "UNBOUND": UNBOUND,
+        "interrupted": interrupted,
+        "iadd": iadd,
+        "isub": isub,
+        "imul": imul,
+        "itruediv": itruediv,
+        "Decimal": Decimal,
+    }
+    for name in ("type", "int", "bool", "str", "float", "len", "range", "Exception", "KeyboardInterrupt", "NotImplementedError",
+                 "AttributeError", "TypeError", "ValueError", "NameError"):
+        names[name] = getattr(builtins, name)
+    return {PREFIX + name: value for name, value in names.items()}
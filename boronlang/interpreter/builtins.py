@@ -4,6 +4,12 @@ from decimal import Decimal
 from typing import Union
 from rich import print
 
+from interpreter.instances import Instance
+from codegen.runtime import Instance as CompiledInstance
+
+# instances of boron classes, from the engines and from the python backend's runtime
+INSTANCES = (Instance, CompiledInstance)
+
 # length
 def length(value):
     try:
@@ -16,14 +22,14 @@ def length(value):
 # print
 def out(data) -> None:
     # if class
-    if isinstance(data, dict) and '__class__' in data and '__str__' in data:
-        print(f"[white]{data['__str__']}[/white]")
+    if isinstance(data, INSTANCES):
+        print(f"[white]{data}[/white]")
 
     # if class in list
     elif isinstance(data, list):
         for index, item in enumerate(data):
-            if isinstance(item, dict) and '__class__' in item and '__str__' in item:
-                data[index] = item['__str__']
+            if isinstance(item, INSTANCES):
+                data[index] = str(item)
         print(f"[white]{data}[/white]")
 
     else:
@@ -106,4 +112,52 @@ BUILTINS = {
 
     "sort": sort,
     "contains": contains,
+}
+
+# methods on the builtin types, {type: {name: function}}. the functions come straight off the type (or are len), so they take the
+# receiver first and run in C. the engines' inline caches look a receiver's exact type up in here before anything else
+METHODS = {
+    list: {
+        "length": len,
+        "append": list.append,
+        "extend": list.extend,
+        "insert": list.insert,
+        "pop": list.pop,
+        "remove": list.remove,
+        "index": list.index,
+        "count": list.count,
+        "reverse": list.reverse,
+        "sort": list.sort,
+        "clear": list.clear,
+        "copy": list.copy,
+    },
+    str: {
+        "length": len,
+        "split": str.split,
+        "join": str.join,
+        "find": str.find,
+        "rfind": str.rfind,
+        "index": str.index,
+        "count": str.count,
+        "replace": str.replace,
+        "upper": str.upper,
+        "lower": str.lower,
+        "strip": str.strip,
+        "lstrip": str.lstrip,
+        "rstrip": str.rstrip,
+        "startswith": str.startswith,
+        "endswith": str.endswith,
+    },
+    dict: {
+        "length": len,
+        "keys": dict.keys,
+        "values": dict.values,
+        "items": dict.items,
+        "get": dict.get,
+        "pop": dict.pop,
+        "update": dict.update,
+        "setdefault": dict.setdefault,
+        "clear": dict.clear,
+        "copy": dict.copy,
+    },
 }
\ No newline at end of file
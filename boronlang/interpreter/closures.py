@@ -0,0 +1,784 @@
+# closure compiled engine. instead of pushing every node through evaluate() and the dispatch dict each time it runs, the AST is
+# compiled once into nested python closures (one per node, already specialized for its operator and shape) and those just call
+# each other. every closure takes the running frame (None at the top level) and returns what the tree walker would have returned
+# for the same node, so the two engines can be swapped with --backend. a statement that returns, breaks or continues hands back its
+# Signal instead, and the blocks around it stop there
+from decimal import Decimal
+from operator import add, sub, mul, truediv, pow, floordiv, mod, gt, lt, ge, le, eq, ne, iadd, isub, imul, itruediv
+from rich import print
+
+from lexer.lexer import TokenType, Token
+from parsing.astnodes import *
+from parsing.resolver import Binding
+from interpreter.interpreter import Interpreter, Signal, UNBOUND, binder_of
+from interpreter.instances import Instance, lay_out
+from interpreter.inlinecaches import Target
+
+# binary operators that are a plain function of both sides
+OPERATORS = {
+    TokenType.ADD: add,
+    TokenType.SUBTRACT: sub,
+    TokenType.MULTIPLY: mul,
+    TokenType.DIVIDE: truediv,
+    TokenType.POWER: pow,
+    TokenType.FLOOR_DIVIDE: floordiv,
+    TokenType.GREATER_THAN: gt,
+    TokenType.LESS_THAN: lt,
+    TokenType.GREATER_EQUAL: ge,
+    TokenType.LESS_EQUAL: le,
+    TokenType.EQUAL: eq,
+    TokenType.NOT_EQUAL: ne,
+    TokenType.MODULUS: mod,
+}
+
+# the same operators written out in closures of their own, by node type: one for a constant right side (n - 1, i < 10, the most
+# common shape by far, skips calling a closure for it) and one for anything else. left(frame) + c is a call less than add(left(frame), c),
+# and cpython specializes each of these sites on its own for ints (a Decimal goes straight to its C type either way). checking for
+# int or Decimal first and calling int.__add__ and such was measured and costs more than it saves, so there's no typed path
+INLINE = {
+    Add: (lambda left, c: lambda frame: left(frame) + c, lambda left, right: lambda frame: left(frame) + right(frame)),
+    Subtract: (lambda left, c: lambda frame: left(frame) - c, lambda left, right: lambda frame: left(frame) - right(frame)),
+    Multiply: (lambda left, c: lambda frame: left(frame) * c, lambda left, right: lambda frame: left(frame) * right(frame)),
+    Divide: (lambda left, c: lambda frame: left(frame) / c, lambda left, right: lambda frame: left(frame) / right(frame)),
+    Power: (lambda left, c: lambda frame: left(frame) ** c, lambda left, right: lambda frame: left(frame) ** right(frame)),
+    FloorDivide: (lambda left, c: lambda frame: left(frame) // c, lambda left, right: lambda frame: left(frame) // right(frame)),
+    Modulus: (lambda left, c: lambda frame: left(frame) % c, lambda left, right: lambda frame: left(frame) % right(frame)),
+    GreaterThan: (lambda left, c: lambda frame: left(frame) > c, lambda left, right: lambda frame: left(frame) > right(frame)),
+    LessThan: (lambda left, c: lambda frame: left(frame) < c, lambda left, right: lambda frame: left(frame) < right(frame)),
+    GreaterEqual: (lambda left, c: lambda frame: left(frame) >= c, lambda left, right: lambda frame: left(frame) >= right(frame)),
+    LessEqual: (lambda left, c: lambda frame: left(frame) <= c, lambda left, right: lambda frame: left(frame) <= right(frame)),
+    Equal: (lambda left, c: lambda frame: left(frame) == c, lambda left, right: lambda frame: left(frame) == right(frame)),
+    NotEqual: (lambda left, c: lambda frame: left(frame) != c, lambda left, right: lambda frame: left(frame) != right(frame)),
+}
+
+# compound assignments and the in place operator they run (//= has always divided, same as the tree walker)
+COMPOUND = {
+    TokenType.INCREASE: iadd,
+    TokenType.DECREASE: isub,
+    TokenType.MULTEQ: imul,
+    TokenType.DIVEQ: itruediv,
+    TokenType.FLOOREQ: itruediv,
+}
+
+# what a declaration without a value starts out as
+DEFAULTS = {
+    TokenType.INTEGER: lambda: 0,
+    TokenType.DECIMAL: lambda: Decimal(0),
+    TokenType.BOOLEAN: lambda: False,
+    TokenType.STR: lambda: "",
+}
+
+RETURN, BREAK = Signal.RETURN, Signal.BREAK
+
+# whether running statement can end in a return, break or continue, so the block it's in has to look at what it hands back. only
+# statements that can say yes ever hand back a Signal, and they hand back None otherwise. functions and classes inside don't count
+def can_signal(statement):
+    stack = [statement]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ReturnStatement, Break, Continue)):
+            return True
+        if not isinstance(node, (Function, ClassLiteral)):
+            stack.extend(node.children())
+    return False
+
+# the call to itself a function's last statement returns, if it does. compiled bodies run it as a loop in the same frame
+def tail_call(function):
+    last = function.body[-1] if function.body else None
+    if isinstance(last, ReturnStatement) and last.values and isinstance(last.values[0], FunctionCall):
+        call = last.values[0]
+        called_name = call.name if isinstance(call.name, str) else getattr(call.name, "value", None)
+        func_def_name = function.name.value if hasattr(function.name, "value") else function.name
+        if called_name == func_def_name:
+            return call
+    return None
+
+class ClosureInterpreter(Interpreter):
+    def __init__(self, filepath: str, args=[]):
+        super().__init__(filepath, args)
+
+        # compiled function and method bodies, keyed by their Function node
+        self.bodies = {}
+
+        self.compilers = {
+            Program: self.compile_program,
+            Import: self.compile_import,
+            Imports: self.compile_import,
+            VariableDeclaration: self.compile_variable_declaration,
+            BinaryOperation: self.compile_binary_operation,
+            LogicalOperation: self.compile_logical_operation,
+            ConditionalExpression: self.compile_conditional_expression,
+            UnaryOperation: self.compile_unary_operation,
+            IfStatement: self.compile_if_statement,
+            ForLoop: self.compile_for_loop,
+            WhileLoop: self.compile_while_loop,
+            DoWhileLoop: self.compile_while_loop,
+            Function: self.compile_function,
+            FunctionCall: self.compile_function_call,
+            ReturnStatement: self.compile_return_statement,
+            Identifier: self.compile_identifier,
+            IntLiteral: lambda node: self.compile_literal(node, int),
+            DecLiteral: lambda node: self.compile_literal(node, Decimal),
+            StringLiteral: lambda node: self.compile_literal(node, str),
+            BooleanLiteral: lambda node: self.compile_literal(node, lambda value: value.lower() == "true"),
+            ListLiteral: self.compile_list_literal,
+            ArrayLiteral: self.compile_array_literal,
+            VectorLiteral: self.compile_array_literal,
+            DictLiteral: self.compile_dict_literal,
+            RangeLiteral: self.compile_range_literal,
+            ClassLiteral: self.compile_class_literal,
+            ClassInstantiation: self.compile_class_instantiation,
+            FieldAssignment: self.compile_field_assignment,
+            FieldAccess: self.compile_field_access,
+            MethodCall: self.compile_method_call,
+            IndexAccess: self.compile_index_access,
+            IndexAssignment: self.compile_index_assignment,
+            TryStatement: self.compile_try_statement,
+            RaiseStatement: self.compile_raise_statement,
+            Break: lambda node: lambda frame: BREAK,
+            Continue: lambda node: lambda frame: Signal.CONTINUE,
+            NoneObject: lambda node: lambda frame: None,
+            Constant: self.compile_constant,
+            EndOfFile: lambda node: lambda frame: None,
+        }
+        for operation in BINARY_OPERATIONS + COMPOUND_ASSIGNMENTS:
+            self.compilers[operation] = self.compile_binary_operation
+
+    # anything still calling evaluate (imported .b files, the tree walker's helpers) gets compiled on the spot
+    def evaluate(self, node):
+        return self.compile(node)(self.frame)
+
+    def evaluate_program(self, program):
+        self.compile_program(program)(None)
+
+    def compile(self, node):
+        compiler = self.compilers.get(type(node))
+        # same error as the tree walker, and just like there it only goes off if the node actually runs
+        if compiler is None:
+            def unknown(frame):
+                raise NotImplementedError(f"Evaluation for {node} not implemented.")
+            return unknown
+        return compiler(node)
+
+    def compile_block(self, statements):
+        return tuple(self.compile(statement) for statement in statements)
+
+    # one closure for a block, handing back the Signal of the statement that stopped it (None if none did)
+    def compile_body(self, statements):
+        body = self.compile_block(statements)
+        checks = [can_signal(statement) for statement in statements]
+        if not any(checks):
+            def run(frame):
+                for statement in body:
+                    statement(frame)
+            return run
+
+        # most often it's only the last statement (a function ending in a return)
+        if not any(checks[:-1]):
+            head, last = body[:-1], body[-1]
+            def run_last(frame):
+                for statement in head:
+                    statement(frame)
+                return last(frame)
+            return run_last
+
+        pairs = tuple(zip(body, checks))
+        def run_checked(frame):
+            for statement, check in pairs:
+                signal = statement(frame)
+                if check and signal is not None:
+                    return signal
+        return run_checked
+
+    def compile_program(self, node):
+        statements = tuple(zip(self.compile_block(node.statements), map(can_signal, node.statements)))
+        def run(frame):
+            for statement, check in statements:
+                try:
+                    signal = statement(frame)
+                except KeyboardInterrupt:
+                    print("[red]KeyboardInterrupt[/red]")
+                    continue
+                # a return at the top level
+                if check and signal is not None:
+                    raise ReturnException(self.returned)
+        return run
+
+    def compile_import(self, node):
+        handler = self.evaluate_import if isinstance(node, Import) else self.evaluate_imports
+        return lambda frame: handler(node)
+
+    # literals get built once, if that fails (it shouldn't) they fail when they run like before
+    def compile_literal(self, node, convert):
+        try:
+            value = convert(node.value)
+        except Exception:
+            return lambda frame: convert(node.value)
+        return lambda frame: value
+
+    def compile_constant(self, node):
+        value = node.value
+        return lambda frame: value
+
+    def compile_list_literal(self, node):
+        elements = self.compile_block(node.elements)
+        return lambda frame: [element(frame) for element in elements]
+
+    # arrays check their size, both check every element's type (unless the type checker proved them)
+    def compile_array_literal(self, node):
+        elements = self.compile_block(node.elements)
+        enforce_type, element_type = self.enforce_type, node.type
+        sized, checked = isinstance(node, ArrayLiteral), node.checked
+        def run(frame):
+            values = [element(frame) for element in elements]
+            if sized and len(values) > int(node.size):
+                raise ValueError(f"Array size mismatch: expected {node.size}, got {len(values)}")
+            if checked:
+                for value in values:
+                    enforce_type(element_type, value)
+            return values
+        return run
+
+    def compile_dict_literal(self, node):
+        items = tuple((self.compile(key), self.compile(value)) for key, value in node.elements.items())
+        return lambda frame: {key(frame): value(frame) for key, value in items}
+
+    def compile_range_literal(self, node):
+        start, stop, increment = self.compile(node.start), self.compile(node.stop), self.compile(node.increment)
+        return lambda frame: range(start(frame), stop(frame), increment(frame))
+
+    # reads and writes go straight to the frame slot or the global dict, whichever the resolver picked
+    def compile_identifier(self, node):
+        name = node.name
+        missing = f"'{name}' is not defined or has not been imported. Did you forget to import a library or create a class?"
+        if node.kind is Binding.LOCAL:
+            index = node.index
+            def local(frame):
+                value = frame[index]
+                if value is UNBOUND:
+                    raise ValueError(missing)
+                return value
+            return local
+
+        global_scope = self.global_scope
+        def name_lookup(frame):
+            if name not in global_scope:
+                raise ValueError(missing)
+            return global_scope[name]
+        return name_lookup
+
+    # a function that writes value into the variable node points at
+    def compile_store(self, node, name):
+        if node.kind is Binding.LOCAL:
+            index = node.index
+            def store_local(frame, value):
+                frame[index] = value
+            return store_local
+
+        global_scope = self.global_scope
+        def store_global(frame, value):
+            global_scope[name] = value
+        return store_global
+
+    def compile_variable_declaration(self, node):
+        if isinstance(node.name, str):
+            var_name = node.name
+        elif hasattr(node.name, 'name'):
+            var_name = node.name.name
+        elif hasattr(node.name, 'value'):
+            var_name = node.name.value
+        else:
+            def invalid(frame):
+                raise ValueError("Invalid variable name type.")
+            return invalid
+
+        store = self.compile_store(node, var_name)
+        var_type = node.var_type
+        enforce_type = self.enforce_type
+        checked = self.needs_check(node)
+
+        if node.value:
+            value_of = self.compile(node.value)
+        else:
+            value_of = lambda frame, default=DEFAULTS.get(var_type, lambda: None): default()
+
+        if not checked:
+            def declare(frame):
+                value = value_of(frame)
+                store(frame, value)
+                return value
+            return declare
+
+        def declare_checked(frame):
+            value = enforce_type(var_type, value_of(frame))
+            store(frame, value)
+            return value
+        return declare_checked
+
+    # whether a declaration has to run its value through enforce_type. the type checker clears checked on the ones it proved,
+    # and the tiered engine skips more using the argument types it guards on
+    def needs_check(self, node):
+        return node.checked and node.var_type != TokenType.AUTO
+
+    def compile_binary_operation(self, node):
+        left, right = self.compile(node.left), self.compile(node.right)
+        operator = node.operator
+
+        if type(node) in INLINE:
+            with_constant, general = INLINE[type(node)]
+            if isinstance(node.right, Constant):
+                return with_constant(left, node.right.value)
+            return general(left, right)
+
+        if operator in COMPOUND:
+            return self.compile_compound_assignment(node, left, right, COMPOUND[operator])
+
+        # x++ and x-- in binary position, the right side still runs first
+        if operator == TokenType.INCREMENT:
+            return lambda frame: self.run_in_order(left, right, frame) + 1
+        if operator == TokenType.DECREMENT:
+            return lambda frame: self.run_in_order(left, right, frame) - 1
+
+        def unsupported(frame):
+            left(frame), right(frame)
+            raise NotImplementedError(f"Binary operator {operator} not implemented.")
+        return unsupported
+
+    # the right side only runs when the left one doesn't decide it
+    def compile_logical_operation(self, node):
+        left, right = self.compile(node.left), self.compile(node.right)
+        if node.operator == TokenType.AND:
+            return lambda frame: left(frame) and right(frame)
+        return lambda frame: left(frame) or right(frame)
+
+    def compile_conditional_expression(self, node):
+        condition, if_value, else_value = self.compile(node.condition), self.compile(node.if_value), self.compile(node.else_value)
+        return lambda frame: if_value(frame) if condition(frame) else else_value(frame)
+
+    # runs both sides, left first, and hands back the left
+    @staticmethod
+    def run_in_order(left, right, frame):
+        value = left(frame)
+        right(frame)
+        return value
+
+    # +=, -=, etc. the target still gets read first, so an undefined one fails the same way
+    def compile_compound_assignment(self, node, left, right, function):
+        target = node.left
+        if getattr(target, "kind", None) is Binding.LOCAL:
+            index = target.index
+            def update_local(frame):
+                left(frame)
+                value = right(frame)
+                value = frame[index] = function(frame[index], value)
+                return value
+            return update_local
+
+        if isinstance(target, Identifier):
+            name, global_scope = target.name, self.global_scope
+            def update_global(frame):
+                left(frame)
+                value = right(frame)
+                if name in global_scope:
+                    global_scope[name] = function(global_scope[name], value)
+                return global_scope[name]
+            return update_global
+
+        def update(frame):
+            left(frame)
+            return self.update_variable(target, function, right(frame))
+        return update
+
+    def compile_unary_operation(self, node):
+        operand_of = self.compile(node.operand)
+        operator, target = node.operator, node.operand
+        is_variable = isinstance(target, Identifier)
+        store = self.compile_store(target, target.name) if is_variable else None
+
+        if operator == TokenType.NOT:
+            if not is_variable:
+                return lambda frame: not operand_of(frame)
+            name = target.name
+            # !x on a variable flips it in place
+            def toggle(frame):
+                operand = operand_of(frame)
+                if not isinstance(operand, bool):
+                    raise TypeError(f"'{name}' is not a boolean and cannot be negated.")
+                store(frame, not operand)
+                return not operand
+            return toggle
+
+        if operator in (TokenType.INCREMENT, TokenType.DECREMENT):
+            step = 1 if operator == TokenType.INCREMENT else -1
+            if not is_variable:
+                return lambda frame: operand_of(frame) + step
+            # x++ hands back the old value
+            def bump(frame):
+                operand = operand_of(frame)
+                store(frame, operand + step)
+                return operand
+            return bump
+
+        def unsupported(frame):
+            operand_of(frame)
+            raise NotImplementedError(f"Unary operator {operator} not implemented.")
+        return unsupported
+
+    def compile_if_statement(self, node):
+        condition = self.compile(node.condition)
+        if_body = self.compile_body(node.if_body)
+        if isinstance(node.else_body, IfStatement):
+            else_body = self.compile_if_statement(node.else_body)
+        else:
+            else_body = self.compile_body(node.else_body or ())
+
+        def run(frame):
+            return if_body(frame) if condition(frame) else else_body(frame)
+        return run
+
+    # a loop uses up breaks and continues, and stops to hand a return on
+    def compile_for_loop(self, node):
+        initializer, condition, increment = self.compile(node.initializer), self.compile(node.condition), self.compile(node.increment)
+        if not any(map(can_signal, node.body)):
+            body = self.compile_block(node.body)
+            def run(frame):
+                initializer(frame)
+                while condition(frame):
+                    for statement in body:
+                        statement(frame)
+                    increment(frame)
+            return run
+
+        body = self.compile_body(node.body)
+        def run_checked(frame):
+            initializer(frame)
+            while condition(frame):
+                signal = body(frame)
+                if signal is not None:
+                    if signal is BREAK:
+                        break
+                    if signal is RETURN:
+                        return signal
+                increment(frame)
+        return run_checked
+
+    # both kinds of while run the body before checking, same as the tree walker. continue goes to the check
+    def compile_while_loop(self, node):
+        condition = self.compile(node.condition)
+        if not any(map(can_signal, node.body)):
+            body = self.compile_block(node.body)
+            def run(frame):
+                while True:
+                    for statement in body:
+                        statement(frame)
+                    if not condition(frame):
+                        break
+            return run
+
+        body = self.compile_body(node.body)
+        def run_checked(frame):
+            while True:
+                signal = body(frame)
+                if signal is not None:
+                    if signal is BREAK:
+                        break
+                    if signal is RETURN:
+                        return signal
+                if not condition(frame):
+                    break
+        return run_checked
+
+    def compile_return_statement(self, node):
+        value_of = self.compile(node.values[0]) if node.values else (lambda frame: None)
+        def run(frame):
+            self.returned = value_of(frame)
+            return RETURN
+        return run
+
+    # defining a function compiles its body right away, the value stored is still the Function node
+    def compile_function(self, node):
+        binder_of(node)
+        self.bodies[node] = self.compile_function_body(node)
+        name, global_scope = node.name.value, self.global_scope
+        def define(frame):
+            global_scope[name] = node
+        return define
+
+    # a function body. a self call returned by the last statement restarts the body in the same frame instead of recursing
+    def compile_function_body(self, function):
+        statements = function.body
+        tail = tail_call(function)
+        if tail is not None:
+            statements = statements[:-1]
+
+        body = self.compile_body(statements)
+        if tail is None:
+            return body
+
+        args = self.compile_block(tail.parameters)
+        kwargs = {key: self.compile(value) for key, value in tail.kwargs.items()} if hasattr(tail, "kwargs") else {}
+        bind = binder_of(function).bind
+        def run_tail(frame):
+            while True:
+                if body(frame) is not None:
+                    return RETURN
+                new_args = [arg(frame) for arg in args]
+                new_kwargs = {key: value(frame) for key, value in kwargs.items()}
+                # rebind parameters in the frame, the rest of the locals start over unset
+                frame[:] = bind(new_args, new_kwargs, False)
+        return run_tail
+
+    # methods hand back the last statement's value when they don't return, and don't get the tail call treatment
+    def compile_method_body(self, method):
+        pairs = tuple(zip(self.compile_block(method.body), map(can_signal, method.body)))
+        def run(frame):
+            result = None
+            for statement, check in pairs:
+                result = statement(frame)
+                if check and result is not None:
+                    return self.returned
+            return result
+        return run
+
+    def body_of(self, function, compile_body):
+        body = self.bodies.get(function)
+        if body is None:
+            body = self.bodies[function] = compile_body(function)
+        return body
+
+    # argument closures for a call, and a function that runs them and wraps any function nodes for python
+    def compile_arguments(self, node, parameters):
+        args = self.compile_block(parameters)
+        kwargs = tuple((key, self.compile(value)) for key, value in node.kwargs.items()) if hasattr(node, 'kwargs') else ()
+        wrap_callbacks = self.wrap_callbacks
+
+        def evaluate_arguments(frame):
+            return wrap_callbacks([arg(frame) for arg in args], {key: value(frame) for key, value in kwargs})
+        return evaluate_arguments
+
+    def call_function(self, function, evaluated_args, evaluated_kwargs):
+        body = self.body_of(function, self.compile_function_body)
+        frame = (function.binder or binder_of(function)).bind(evaluated_args, evaluated_kwargs)
+        if body(frame) is not None:
+            return self.returned
+        return None
+
+    def compile_function_call(self, node):
+        func_name = node.name
+        evaluate_arguments = self.compile_arguments(node, node.parameters)
+        global_scope, call_function = self.global_scope, self.call_function
+        local = node.kind is Binding.LOCAL
+        index = node.index
+
+        def call(frame):
+            if local and frame[index] is not UNBOUND:
+                function = frame[index]
+            elif func_name in global_scope:
+                function = global_scope[func_name]
+            else:
+                raise NameError(f"Function '{func_name}' is not defined.")
+            evaluated_args, evaluated_kwargs = evaluate_arguments(frame)
+
+            # native python functions get args and kwargs as is
+            if not hasattr(function, "parameters"):
+                return function(*evaluated_args, **evaluated_kwargs)
+            return call_function(function, evaluated_args, evaluated_kwargs)
+        return call
+
+    def create_callback(self, func_node):
+        def callback():
+            func_name = func_node.name.value if hasattr(func_node.name, "value") else func_node.name
+            function = self.global_scope.get(func_name)
+            if function is None:
+                raise NameError(f"Function '{func_name}' is not defined.")
+            if not hasattr(function, "parameters"):
+                function()
+            else:
+                self.call_function(function, [], {})
+        return callback
+
+    # lays the class out each time the definition runs, methods are compiled once up front
+    def compile_class_literal(self, node):
+        parent = self.compile(node.parent) if node.parent else None
+        for method in node.methods:
+            binder_of(method, method=True)
+            self.bodies[method] = self.compile_method_body(method)
+        body = self.compile_block(node.body)
+
+        def define(frame):
+            lay_out(node, parent(frame) if parent is not None else None)
+            for statement in body:
+                statement(frame)
+            return node
+        return define
+
+    def compile_class_instantiation(self, node):
+        typ, name = node.typ.value, node.name.value
+        evaluate_arguments = self.compile_arguments(node, node.arguments)
+        store = self.compile_store(node, name)
+        global_scope = self.global_scope
+
+        def instantiate(frame):
+            if typ not in global_scope:
+                raise NameError(f"Class '{typ}' not defined.")
+            class_literal = global_scope[typ]
+            evaluated_args, evaluated_kwargs = evaluate_arguments(frame)
+
+            # native python classes get args and kwargs as is
+            if isinstance(class_literal, type):
+                instance = class_literal(*evaluated_args, **evaluated_kwargs)
+                store(frame, instance)
+                return instance
+
+            instance = Instance(class_literal, evaluated_args, evaluated_kwargs)
+
+            if '__init__' in class_literal.table:
+                init_method = class_literal.table['__init__']
+                body = self.body_of(init_method, self.compile_method_body)
+                init_frame = (init_method.binder or binder_of(init_method, method=True)).bind(evaluated_args, evaluated_kwargs)
+                init_frame[0] = instance
+                body(init_frame)
+
+            store(frame, instance)
+            return instance
+        return instantiate
+
+    def compile_field_assignment(self, node):
+        field_name = node.field.value if hasattr(node.field, "value") else node.field
+        value_of = self.compile(node.value)
+        if isinstance(node.parent, Token):
+            key, global_scope = node.parent.value, self.global_scope
+            def parent_of(frame):
+                if key not in global_scope:
+                    raise ValueError(f"'{key}' is not defined.")
+                return global_scope[key]
+        else:
+            parent_of = self.compile(node.parent)
+        cache = self.inline_cache(node, "set field", field_name)
+
+        def assign(frame):
+            instance = parent_of(frame)
+            new_value = value_of(frame)
+            if not isinstance(instance, Instance):
+                raise TypeError("Field assignment target is not a valid instance.")
+            if instance.cls is cache.key:
+                cache.hits += 1
+                instance.values[cache.value] = new_value
+            else:
+                cache.set(instance, new_value)
+            return new_value
+        return assign
+
+    def compile_field_access(self, node):
+        parent_of = self.compile(node.parent)
+        field_name = node.field.name if hasattr(node.field, 'name') else node.field
+        cache = self.inline_cache(node, "field", field_name)
+        def access(frame):
+            instance = parent_of(frame)
+            if not isinstance(instance, Instance):
+                raise TypeError("Field access target is not a valid instance.")
+            if instance.cls is cache.key:
+                cache.hits += 1
+                return instance.values[cache.value]
+            return cache.get(instance)
+        return access
+
+    def compile_method_call(self, node):
+        parent_of = self.compile(node.parent)
+        method_name = node.name.value if hasattr(node.name, "value") else node.name
+        evaluate_arguments = self.compile_arguments(node, node.parameters)
+        # python objects and packages don't get callbacks wrapped, their arguments go through as is
+        args = self.compile_block(node.parameters)
+        kwargs = tuple((key, self.compile(value)) for key, value in node.kwargs.items()) if hasattr(node, 'kwargs') else ()
+        global_scope = self.global_scope
+        parent_is_local = getattr(node.parent, "kind", None) is Binding.LOCAL
+        cache = self.inline_cache(node, "method", method_name, isinstance(node.parent, Identifier))
+
+        if hasattr(node.parent, "value"):
+            package_name = node.parent.value
+        elif hasattr(node.parent, "name"):
+            package_name = node.parent.name
+        else:
+            package_name = None
+
+        def call(frame):
+            parent_obj = parent_of(frame)
+            target, method_node = cache.method(parent_obj)
+
+            if target is Target.LENGTH:
+                return len(parent_obj)
+
+            if target is Target.METHOD:
+                evaluated_args, evaluated_kwargs = evaluate_arguments(frame)
+
+                # same frame layout as __init__, self first
+                method_frame = (method_node.binder or binder_of(method_node, method=True)).bind(evaluated_args, evaluated_kwargs)
+                method_frame[0] = parent_obj
+                return self.body_of(method_node, self.compile_method_body)(method_frame)
+
+            if target is Target.NATIVE:
+                return method_node(parent_obj, *[arg(frame) for arg in args], **{key: value(frame) for key, value in kwargs})
+
+            if package_name is None:
+                raise ValueError(f"Invalid package identifier in MethodCall.")
+            try:
+                package_obj = parent_obj if parent_is_local else global_scope[package_name]
+            except KeyError:
+                raise KeyError(f"Package: {package_name} not found in global scope")
+
+            method_func = getattr(package_obj, method_name, None)
+            if method_func is None:
+                raise AttributeError(f"Package '{package_name}' does not have a method '{method_name}'.")
+            return method_func(*[arg(frame) for arg in args], **{key: value(frame) for key, value in kwargs})
+        return call
+
+    def compile_index_access(self, node):
+        container_of, index_of = self.compile(node.container), self.compile(node.index)
+        def access(frame):
+            container = container_of(frame)
+            index = index_of(frame)
+            if not isinstance(container, (list, str, dict)):
+                raise TypeError("Index access is only supported on lists or arrays.")
+            try:
+                return container[index]
+            except IndexError:
+                raise IndexError("Index out of range.")
+        return access
+
+    def compile_index_assignment(self, node):
+        container_of, index_of, value_of = self.compile(node.container), self.compile(node.index), self.compile(node.value)
+        # strings are immutable, so assigning into one writes a new string back to the variable
+        store = self.compile_store(node.container, node.container.name) if isinstance(node.container, Identifier) else None
+        def assign(frame):
+            container = container_of(frame)
+            index = index_of(frame)
+            value = value_of(frame)
+            if not isinstance(container, (list, str, dict)):
+                raise TypeError("Index access is only supported on lists or arrays.")
+            try:
+                if isinstance(container, (list, dict)):
+                    container[index] = value
+                    return value
+                container = container[:index] + value + container[index + 1:]
+                store(frame, container)
+                return container
+            except IndexError:
+                raise IndexError("Index out of range.")
+        return assign
+
+    def compile_try_statement(self, node):
+        body = self.compile_body(node.body)
+        catches = {name: self.compile_body(catch.body) for name, catch in node.catches.items()}
+        def run(frame):
+            try:
+                return body(frame)
+            except Exception as e:
+                name = type(e).__name__
+                if name not in catches:
+                    raise e
+                return catches[name](frame)
+        return run
+
+    # nothing in a raise gets evaluated, so the tree walker's version does the job
+    def compile_raise_statement(self, node):
+        return lambda frame: self.evaluate_raise_statement(node)
@@ -0,0 +1,149 @@
+# inline caches for field access and method calls, shared by the tree walker, closures, tiered and the vm. every site (one
+# FieldAccess, FieldAssignment or MethodCall) gets a cache of its own, keyed on what it was handed: the class of an instance of a
+# boron class, the python type of anything else. the first key a site sees is kept on its own (monomorphic, one identity check),
+# the next few in a dict (polymorphic), and past POLYMORPHIC_LIMIT the site is megamorphic: new keys get worked out every time
+from enum import Enum
+from inspect import getattr_static
+from types import FunctionType, MethodDescriptorType, WrapperDescriptorType
+from rich import print
+
+from interpreter.instances import Instance
+from interpreter.builtins import METHODS
+
+#! whether to print every site's hits and misses once the program is done
+global statsenabled
+statsenabled = False
+
+# receiver types one site remembers
+POLYMORPHIC_LIMIT = 4
+
+# what a method call comes down to for one kind of receiver
+class Target(Enum):
+    LENGTH = "length"   # .length() on a list or a string
+    METHOD = "method"   # a method of a boron class, comes with its Function node
+    NATIVE = "native"   # a builtin method (interpreter/builtins.py's METHODS) or a function on a python type, called with the receiver first
+    LOOKUP = "lookup"   # anything else (packages, objects with attributes of their own), looked up on the object every call
+
+# what an entries lookup gives back for a key that isn't in there (None is a field's value when the class doesn't declare it)
+MISSING = object()
+
+# python functions that take the receiver as their first argument when they're pulled off the type
+UNBOUND = (FunctionType, MethodDescriptorType, WrapperDescriptorType)
+
+class InlineCache:
+    __slots__ = ("site", "name", "line", "direct", "key", "value", "entries", "hits", "misses", "megamorphic")
+
+    # site is "field", "set field" or "method", line is where it is in the source. direct is for method calls, whether the receiver
+    # is the object a python method is looked up on (the engines look a global parent up by name again, which isn't always the receiver)
+    def __init__(self, site, name, line=0, direct=True):
+        self.site = site
+        self.name = name
+        self.line = line
+        self.direct = direct
+        self.key = None
+        self.value = None
+        self.entries = None
+        self.hits = 0
+        self.misses = 0
+        self.megamorphic = False
+
+    def __repr__(self):
+        return f"<{self.site} {self.name}>"
+
+    # fields: the value is the slot the field has in instances of the class, None when the class doesn't declare it. those never
+    # go in key, so an instance whose class is key always has the field at value (closures and the vm check that themselves first)
+    def get(self, instance):
+        if instance.cls is self.key:
+            self.hits += 1
+            return instance.values[self.value]
+        index = self.lookup(instance.cls)
+        if index is None:
+            return instance.get(self.name)
+        return instance.values[index]
+
+    def set(self, instance, value):
+        if instance.cls is self.key:
+            self.hits += 1
+            instance.values[self.value] = value
+            return
+        index = self.lookup(instance.cls)
+        if index is None:
+            instance.set(self.name, value)
+        else:
+            instance.values[index] = value
+
+    # (Target, what goes with it) for calling this site's method on receiver
+    def method(self, receiver):
+        key = receiver.cls if type(receiver) is Instance else type(receiver)
+        if key is self.key:
+            self.hits += 1
+            return self.value
+        return self.lookup(key)
+
+    # the polymorphic entries, then working it out and remembering it while there's room
+    def lookup(self, key):
+        entries = self.entries
+        if entries is not None:
+            value = entries.get(key, MISSING)
+            if value is not MISSING:
+                self.hits += 1
+                return value
+        self.misses += 1
+        value = self.resolve(key)
+        if self.key is None and value is not None:
+            self.key, self.value = key, value
+        elif entries is None:
+            self.entries = {key: value}
+        elif len(entries) < POLYMORPHIC_LIMIT - 1:
+            entries[key] = value
+        else:
+            self.megamorphic = True
+        return value
+
+    def resolve(self, key):
+        if self.site != "method":
+            return key.layout.get(self.name)
+
+        # a boron class, a method it doesn't have isn't remembered so it fails the same way every time
+        if not isinstance(key, type):
+            method = key.table.get(self.name)
+            if method is None:
+                raise AttributeError(f"Class '{key}' does not have a method '{self.name}'.")
+            return Target.METHOD, method
+
+        # the builtin types' own table, where length is len
+        methods = METHODS.get(key)
+        if methods is not None and self.name in methods:
+            function = methods[self.name]
+            return (Target.LENGTH, None) if function is len else (Target.NATIVE, function)
+        if self.name == "length" and issubclass(key, (list, str)):
+            return Target.LENGTH, None
+        # only when the receiver can't have attributes of its own and the type doesn't change how they're looked up, so the
+        # function found on the type is the one getattr would have bound
+        if self.direct and key.__dictoffset__ == 0 and not isinstance(getattr_static(key, "__getattribute__"), FunctionType):
+            function = getattr_static(key, self.name, None)
+            if isinstance(function, UNBOUND):
+                return Target.NATIVE, function
+        return Target.LOOKUP, None
+
+    def receivers(self):
+        return (self.key is not None) + len(self.entries or ())
+
+    def state(self):
+        receivers = self.receivers()
+        if self.megamorphic:
+            return "megamorphic"
+        return "unused" if receivers == 0 else "monomorphic" if receivers == 1 else "polymorphic"
+
+def print_stats(caches):
+    # the python backend's code is plain python, CPython caches it on its own
+    if not caches:
+        print("\nNo inline caches, this engine doesn't use them.")
+        return
+    print(f"\nInline caches (up to {POLYMORPHIC_LIMIT} receiver types per site):")
+    print(f"{'line':>5}  {'site':<10}{'name':<16}{'hits':>10}{'misses':>9}{'types':>7}  state")
+    for cache in sorted(caches, key=lambda cache: (-cache.misses, -cache.hits, cache.line)):
+        print(f"{cache.line:>5}  {cache.site:<10}{str(cache.name):<16}{cache.hits:>10}{cache.misses:>9}{cache.receivers():>7}  {cache.state()}")
+    hits, misses = sum(cache.hits for cache in caches), sum(cache.misses for cache in caches)
+    rate = f"{hits / (hits + misses):.1%}" if hits + misses else "-"
+    print(f"{len(caches)} sites, {rate} hits, {sum(cache.megamorphic for cache in caches)} megamorphic")
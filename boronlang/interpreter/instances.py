@@ -0,0 +1,52 @@
+# instances of boron classes, shared by every engine. when a class gets defined it works out a layout (the slot each field goes in,
+# the parent's fields first) and a table of its methods, so an instance only has to hold its field values, in a list in layout
+# order. what an instance prints as only gets put together when something prints it, from the arguments it was made with
+
+class Instance:
+    __slots__ = ("cls", "values", "args", "kwargs", "extra")
+
+    def __init__(self, cls, args, kwargs):
+        self.cls = cls
+        self.values = [None] * len(cls.layout)
+        self.args = args
+        self.kwargs = kwargs or None
+        # fields the class doesn't declare, set on this instance alone (most never have any)
+        self.extra = None
+
+    # a field the instance doesn't have is None, and a method's name hands back the method (both like they always have)
+    def get(self, name):
+        index = self.cls.layout.get(name)
+        if index is not None:
+            return self.values[index]
+        if self.extra is not None and name in self.extra:
+            return self.extra[name]
+        return self.cls.table.get(name)
+
+    def set(self, name, value):
+        index = self.cls.layout.get(name)
+        if index is not None:
+            self.values[index] = value
+        elif self.extra is None:
+            self.extra = {name: value}
+        else:
+            self.extra[name] = value
+
+    # Task(name, desc), whatever it was made with
+    def __str__(self):
+        args_str = ", ".join(str(arg) for arg in self.args)
+        kwargs_str = ", ".join(f"{key}={value}" for key, value in self.kwargs.items()) if self.kwargs else ""
+        sep = ", " if args_str and kwargs_str else ""
+        return f"{getattr(self.cls.name, 'value', self.cls.name)}({args_str}{sep}{kwargs_str})"
+
+    __repr__ = __str__
+
+# fills in a ClassLiteral's layout and method table when its definition runs. parent is whatever it extends, a python class has
+# neither so it adds nothing
+def lay_out(node, parent=None):
+    node.layout = dict(getattr(parent, "layout", {}))
+    node.table = dict(getattr(parent, "table", {}))
+    for field in node.fields:
+        node.layout.setdefault(field.name, len(node.layout))
+    for method in node.methods:
+        node.table[method.name.value] = method
+    return node
@@ -1,14 +1,27 @@
 # tokentype from my lexer and all ASTNodes from parser
-from lexer.lexer import TokenType, Token, Lexer
-from parsing.parser import Parser
+from lexer.lexer import TokenType, Token
 from parsing.astnodes import *
 
 # decimal import for better precision, fuck floats no floats in my language
 from decimal import Decimal, getcontext
+from enum import Enum
 # importlib and os for package support
 import importlib.util, os, sys
 from rich import print  # colored prints
 
+# parsed program cache, the constant folding pass and the resolver
+from cache import load_program
+from parsing.optimizer import optimize
+from parsing.resolver import resolve, Binding
+from parsing.typechecker import typecheck
+
+# in place operators for compound assignments
+from operator import iadd, isub, imul, itruediv
+
+# instances of boron classes, and the caches their fields and methods get looked up through
+from interpreter.instances import Instance, lay_out
+from interpreter.inlinecaches import InlineCache, Target
+
 # builtin functions
 from interpreter.builtins import BUILTINS
 import builtins
@@ -17,6 +30,81 @@ import builtins
 global reprenabled
 reprenabled = False
 
+# what a frame slot holds before its local has been declared
+UNBOUND = object()
+
+# what each compound assignment writes back with, //= divides the same as /= does
+IN_PLACE = {
+    InPlaceAdd: iadd,
+    InPlaceSubtract: isub,
+    InPlaceMultiply: imul,
+    InPlaceDivide: itruediv,
+    InPlaceFloorDivide: itruediv,
+}
+
+# how a statement finished when it didn't just run off the end. the tree walker leaves it in self.signal (and a returned value in
+# self.returned) for the block, loop or call around it to deal with, the closure engine's statements hand it back
+class Signal(Enum):
+    RETURN = "return"
+    BREAK = "break"
+    CONTINUE = "continue"
+
+# how a call's arguments land in a function's frame, worked out once per Function (when it or its class gets defined) and shared by
+# every engine. offset is 1 for methods and __init__ (self sits in slot 0), where goes on the end of the error messages
+class Binder:
+    __slots__ = ("size", "offset", "count", "parameters", "slots", "where")
+
+    def __init__(self, function, method=False):
+        self.size = len(function.locals)
+        self.offset = 1 if method else 0
+        self.parameters = tuple(param.name for param in function.parameters[self.offset:])
+        self.count = len(self.parameters)
+        # frame slot of every parameter by name (self included, so passing it by name is ignored rather than unexpected)
+        self.slots = {param.name: i for i, param in enumerate(function.parameters)}
+        name = function.name.value if hasattr(function.name, "value") else function.name
+        if not method:
+            self.where = ""
+        elif name == "__init__":
+            self.where = " in __init__"
+        else:
+            self.where = f" in method '{name}'"
+
+    # a fresh frame with the arguments bound. tail calls aren't strict, they've never complained about unexpected keyword arguments
+    def bind(self, args, kwargs, strict=True):
+        frame = [UNBOUND] * self.size
+        offset, count = self.offset, self.count
+        # every parameter given in order and nothing by name, which is nearly every call
+        if not kwargs and len(args) == count:
+            frame[offset:offset + count] = args
+            return frame
+
+        # positional arguments first (extra ones get dropped), then keyword arguments fill in the rest
+        given = min(len(args), count)
+        frame[offset:offset + given] = args[:given]
+        unexpected = None
+        for key, value in kwargs.items():
+            slot = self.slots.get(key)
+            if slot is None:
+                if unexpected is None:
+                    unexpected = key
+            elif slot >= offset + given:
+                frame[slot] = value
+        for i in range(given, count):
+            if frame[offset + i] is UNBOUND:
+                raise TypeError(f"Missing argument for parameter '{self.parameters[i]}'{self.where}")
+        if strict and unexpected is not None:
+            raise TypeError(f"Unexpected keyword argument '{unexpected}'{self.where}")
+        return frame
+
+def binder_of(function, method=False):
+    binder = function.binder
+    if binder is None:
+        binder = function.binder = Binder(function, method)
+    return binder
+
+# boron functions passed as arguments (tkinter commands and such) get wrapped so python can call them
+FUNCTION_NODES = (Function, NativeFunction)
+
 class Interpreter:
     def __init__(self, filepath: str, args=[]):
         # initialize a global scope and the package folder (locally for right now)
@@ -29,12 +117,46 @@ class Interpreter:
         self.global_scope["args"] = lambda: self.cliargs
         self.filepath = filepath
 
+        # locals of the function that's running, one slot per name the resolver found (none at the top level).
+        # the callers' frames sit under it in frames, anything that isn't a local falls through to the global scope
+        self.frame = None
+        self.frames = []
+
+        # every inline cache made so far, for --ic-stats
+        self.caches = []
+
+        # set by return, break and continue until whatever they're leaving picks it up
+        self.signal = None
+        self.returned = None
+
         self.dispatch = {
             Program: self.evaluate_program,
             Import: self.evaluate_import,
             Imports: self.evaluate_imports,
             VariableDeclaration: self.evaluate_variable_declaration,
             BinaryOperation: self.evaluate_binary_operation,
+            # every operator has its own handler, left side first. no int/Decimal fast path in front of the operator, cpython already
+            # specializes int + int on its own and Decimal goes straight to its C type, so a type check here only slowed them down
+            Add: lambda node: self.evaluate(node.left) + self.evaluate(node.right),
+            Subtract: lambda node: self.evaluate(node.left) - self.evaluate(node.right),
+            Multiply: lambda node: self.evaluate(node.left) * self.evaluate(node.right),
+            Divide: lambda node: self.evaluate(node.left) / self.evaluate(node.right),
+            Power: lambda node: self.evaluate(node.left) ** self.evaluate(node.right),
+            FloorDivide: lambda node: self.evaluate(node.left) // self.evaluate(node.right),
+            Modulus: lambda node: self.evaluate(node.left) % self.evaluate(node.right),
+            GreaterThan: lambda node: self.evaluate(node.left) > self.evaluate(node.right),
+            LessThan: lambda node: self.evaluate(node.left) < self.evaluate(node.right),
+            GreaterEqual: lambda node: self.evaluate(node.left) >= self.evaluate(node.right),
+            LessEqual: lambda node: self.evaluate(node.left) <= self.evaluate(node.right),
+            Equal: lambda node: self.evaluate(node.left) == self.evaluate(node.right),
+            NotEqual: lambda node: self.evaluate(node.left) != self.evaluate(node.right),
+            InPlaceAdd: self.evaluate_compound_assignment,
+            InPlaceSubtract: self.evaluate_compound_assignment,
+            InPlaceMultiply: self.evaluate_compound_assignment,
+            InPlaceDivide: self.evaluate_compound_assignment,
+            InPlaceFloorDivide: self.evaluate_compound_assignment,
+            LogicalOperation: self.evaluate_logical_operation,
+            ConditionalExpression: self.evaluate_conditional_expression,
             UnaryOperation: self.evaluate_unary_operation,
             IfStatement: self.evaluate_if_statement,
             ForLoop: self.evaluate_for_loop,
@@ -68,7 +190,9 @@ class Interpreter:
             RaiseStatement: self.evaluate_raise_statement,
             # CatchStatement: self.evaluate_catch_statement,
             Break: self.evaluate_break,
+            Continue: self.evaluate_continue,
             NoneObject: lambda node: None,
+            Constant: lambda node: node.value,
             EndOfFile: lambda node: None,
         }
 
@@ -86,6 +210,32 @@ class Interpreter:
                 self.evaluate(statement)
             except KeyboardInterrupt:
                 print("[red]KeyboardInterrupt[/red]")
+            # a return at the top level (break and continue can't get here, the parser only takes them inside loops)
+            if self.signal is not None:
+                raise ReturnException(self.take_return())
+
+    # runs statements until one of them returns, breaks or continues
+    def evaluate_block(self, statements):
+        for statement in statements:
+            self.evaluate(statement)
+            if self.signal is not None:
+                return
+
+    # after a loop body left a signal: whether the loop is done. a break or continue is used up, a return keeps going
+    def leaves_loop(self):
+        signal = self.signal
+        if signal is Signal.RETURN:
+            return True
+        self.signal = None
+        return signal is Signal.BREAK
+
+    # what a function hands back once its body is done, clearing the return on the way
+    def take_return(self):
+        if self.signal is None:
+            return None
+        value = self.returned
+        self.signal = self.returned = None
+        return value
 
     # enforces type against the following for right now: integer, decimal, boolean, string, array (WIP)
     def enforce_type(self, expected_type, value):
@@ -119,6 +269,17 @@ class Interpreter:
 
         return value
 
+    # any argument (and a command= keyword) that's a function node becomes a callback. most calls have none, so the argument list
+    # only gets copied when one turns up
+    def wrap_callbacks(self, args, kwargs):
+        for arg in args:
+            if type(arg) in FUNCTION_NODES:
+                args = [self.create_callback(arg) if type(arg) in FUNCTION_NODES else arg for arg in args]
+                break
+        if kwargs and type(kwargs.get("command")) in FUNCTION_NODES:
+            kwargs["command"] = self.create_callback(kwargs["command"])
+        return args, kwargs
+
     def create_callback(self, func_node):
         def callback():
             func_name = func_node.name.value if hasattr(func_node.name, "value") else func_node.name
@@ -147,11 +308,7 @@ class Interpreter:
             spec = importlib.util.spec_from_file_location(module_name, single_file_path)
         elif os.path.exists(boron_file_path):
             spec = None
-            with open(boron_file_path, "r") as file:
-                code = file.read()
-
-            tokens = Lexer(code).tokenize()
-            ast = Parser(tokens).parse()
+            ast = typecheck(resolve(optimize(load_program(boron_file_path))), boron_file_path, module=True)
             module = self.evaluate_program(ast)
         else:
             raise ImportError(f"Package '{module_name}' not found in '{self.package_folder}'.")
@@ -202,9 +359,9 @@ class Interpreter:
             else:
                 value = None
 
-        # finally enforce type
+        # finally enforce type, unless the type checker proved it's already right
         if reprenabled == True: print(f"Enforcing type for {node.var_type}, {node.name}: {value}")
-        if node.var_type != TokenType.AUTO: value = self.enforce_type(node.var_type, value)
+        if node.checked and node.var_type != TokenType.AUTO: value = self.enforce_type(node.var_type, value)
 
         # and add to global scope (this is just for logging purposes)
         if reprenabled == True:
@@ -213,9 +370,32 @@ class Interpreter:
             else:
                 print(f"Declared {node.var_type} {var_name} = {value}")
 
-        self.global_scope[var_name] = value
+        self.store(node, var_name, value)
         return value
 
+    # writes a variable wherever the resolver said it lives
+    def store(self, node, name, value):
+        if node.kind is Binding.LOCAL:
+            self.frame[node.index] = value
+        else:
+            self.global_scope[name] = value
+
+    # +=, -=, etc. function is the in place operator, so += on a list still extends that same list
+    def update_variable(self, target, function, right):
+        if target.kind is Binding.LOCAL:
+            value = self.frame[target.index] = function(self.frame[target.index], right)
+            return value
+        if isinstance(target, Identifier) and target.name in self.global_scope:
+            self.global_scope[target.name] = function(self.global_scope[target.name], right)
+        return self.global_scope[target.name]
+
+    # x += y and friends, the variable gets read first so one that isn't defined fails the same way
+    def evaluate_compound_assignment(self, node):
+        self.evaluate(node.left)
+        right = self.evaluate(node.right)
+        return self.update_variable(node.left, IN_PLACE[type(node)], right)
+
+    # what's left over once the parser has picked a node for every operator (++, -- and **=)
     def evaluate_binary_operation(self, node):
         # evaluate left and right before operating
         left = self.evaluate(node.left)
@@ -226,60 +406,22 @@ class Interpreter:
             return left + 1
         elif node.operator == TokenType.DECREMENT:
             return left - 1
-        elif node.operator == TokenType.INCREASE:
-            if isinstance(node.left, Identifier) and node.left.name in self.global_scope:
-                self.global_scope[node.left.name] += right
-            return self.global_scope[node.left.name]
-        elif node.operator == TokenType.DECREASE:
-            if isinstance(node.left, Identifier) and node.left.name in self.global_scope:
-                self.global_scope[node.left.name] -= right
-            return self.global_scope[node.left.name]
-        elif node.operator == TokenType.MULTEQ:
-            if isinstance(node.left, Identifier) and node.left.name in self.global_scope:
-                self.global_scope[node.left.name] *= right
-            return self.global_scope[node.left.name]
-        elif node.operator == TokenType.DIVEQ:
-            if isinstance(node.left, Identifier) and node.left.name in self.global_scope:
-                self.global_scope[node.left.name] /= right
-            return self.global_scope[node.left.name]
-        if node.operator == TokenType.FLOOREQ:
-            if isinstance(node.left, Identifier) and node.left.name in self.global_scope:
-                self.global_scope[node.left.name] /= right
-            return self.global_scope[node.left.name]
-        elif node.operator == TokenType.ADD:
-            return left + right
-        elif node.operator == TokenType.SUBTRACT:
-            return left - right
-        elif node.operator == TokenType.MULTIPLY:
-            return left * right
-        elif node.operator == TokenType.DIVIDE:
-            return left / right
-        elif node.operator == TokenType.POWER:
-            return left ** right
-        elif node.operator == TokenType.FLOOR_DIVIDE:
-            return left // right
-        elif node.operator == TokenType.GREATER_THAN:
-            return left > right
-        elif node.operator == TokenType.LESS_THAN:
-            return left < right
-        elif node.operator == TokenType.GREATER_EQUAL:
-            return left >= right
-        elif node.operator == TokenType.LESS_EQUAL:
-            return left <= right
-        elif node.operator == TokenType.EQUAL:
-            return left == right
-        elif node.operator == TokenType.NOT_EQUAL:
-            return left != right
-        elif node.operator == TokenType.MODULUS:
-            return left % right
-        elif node.operator == TokenType.AND:
-            return left and right
-        elif node.operator == TokenType.OR:
-            return left or right
         else:
             # if operator not above, throw NotImplementedError (which will be changed to custom error logging soon)
             raise NotImplementedError(f"Binary operator {node.operator} not implemented.")
 
+    # the right side only gets evaluated when the left doesn't decide it, and the result is whichever side did (like python's)
+    def evaluate_logical_operation(self, node):
+        left = self.evaluate(node.left)
+        if node.operator == TokenType.AND:
+            return self.evaluate(node.right) if left else left
+        return left if left else self.evaluate(node.right)
+
+    def evaluate_conditional_expression(self, node):
+        if self.evaluate(node.condition):
+            return self.evaluate(node.if_value)
+        return self.evaluate(node.else_value)
+
     # fix nots. this is just for unary operations, ones that only require an operator and a single operand
     def evaluate_unary_operation(self, node):
         # get said operand
@@ -290,30 +432,27 @@ class Interpreter:
             if isinstance(node.operand, Identifier):
                 identifier_name = node.operand.name
 
-                if identifier_name in self.global_scope:
-                    value = self.global_scope[identifier_name]
-                    if isinstance(value, bool):
-                        # negate the boolean value in the global scope
-                        self.global_scope[identifier_name] = not value
-                        if reprenabled == True: print(f"Negated {identifier_name}: {not value}")
-                        return not value
-                    else:
-                        raise TypeError(f"'{identifier_name}' is not a boolean and cannot be negated.")
+                # operand already came out of the variable (evaluate_identifier raises if it isn't defined)
+                if isinstance(operand, bool):
+                    # negate the boolean value in place
+                    self.store(node.operand, identifier_name, not operand)
+                    if reprenabled == True: print(f"Negated {identifier_name}: {not operand}")
+                    return not operand
                 else:
-                    raise ValueError(f"'{identifier_name}' is not defined.")
+                    raise TypeError(f"'{identifier_name}' is not a boolean and cannot be negated.")
             else:
                 return not operand
 
         # else for increments and decrements
         elif node.operator == TokenType.INCREMENT:
             if isinstance(node.operand, Identifier):
-                self.global_scope[node.operand.name] += 1
+                self.store(node.operand, node.operand.name, operand + 1)
                 if reprenabled == True: print(f"Incremented {node.operand.name} +1")
                 return operand
             return operand + 1
         elif node.operator == TokenType.DECREMENT:
             if isinstance(node.operand, Identifier):
-                self.global_scope[node.operand.name] -= 1
+                self.store(node.operand, node.operand.name, operand - 1)
                 if reprenabled == True: print(f"Decremented {node.operand.name} -1")
                 return operand
             return operand - 1
@@ -325,138 +464,133 @@ class Interpreter:
     def evaluate_if_statement(self, node):
         condition = self.evaluate(node.condition)
         if condition:
-            for statement in node.if_body:
-                self.evaluate(statement)
+            self.evaluate_block(node.if_body)
 
         elif node.else_body:
             if isinstance(node.else_body, IfStatement):
                 self.evaluate_if_statement(node.else_body)
 
             else:
-                for statement in node.else_body:
-                    self.evaluate(statement)
+                self.evaluate_block(node.else_body)
 
+    # continue goes on to the increment (the body is evaluate_block written out, it runs the most)
     def evaluate_for_loop(self, node):
         self.evaluate(node.initializer)
         while self.evaluate(node.condition):
-            try:
-                for statement in node.body:
-                    self.evaluate(statement)
-            except BreakException:
+            for statement in node.body:
+                self.evaluate(statement)
+                if self.signal is not None:
+                    break
+            if self.signal is not None and self.leaves_loop():
                 break
             self.evaluate(node.increment)
 
+    # continue goes on to the condition
     def evaluate_while_loop(self, node):
         while True:
-            try:
-                for statement in node.body:
-                    self.evaluate(statement)
-            except BreakException:
+            for statement in node.body:
+                self.evaluate(statement)
+                if self.signal is not None:
+                    break
+            if self.signal is not None and self.leaves_loop():
                 break
             if not self.evaluate(node.condition):
                 break
 
     def evaluate_function(self, node):
+        binder_of(node)
         self.global_scope[node.name.value] = node
         if reprenabled == True: print(f"Defined function: {node.name.value}")
 
     def evaluate_function_call(self, node):
         func_name = node.name
-        if func_name not in self.global_scope:
+        if node.kind is Binding.LOCAL and self.frame[node.index] is not UNBOUND:
+            function = self.frame[node.index]
+        elif func_name in self.global_scope:
+            function = self.global_scope[func_name]
+        else:
             raise NameError(f"Function '{func_name}' is not defined.")
-
-        function = self.global_scope[func_name]
         evaluated_args = [self.evaluate(arg) for arg in node.parameters]
         evaluated_kwargs = {key: self.evaluate(value) for key, value in node.kwargs.items()} if hasattr(node, 'kwargs') else {}
-
-        evaluated_args = [
-                self.create_callback(arg) if hasattr(arg, "parameters") and hasattr(arg, "body") else arg
-                for arg in evaluated_args
-            ]
-
-        for key, value in evaluated_kwargs.items():
-            if key == "command" and hasattr(value, "parameters") and hasattr(value, "body"):
-                evaluated_kwargs[key] = self.create_callback(value)
+        evaluated_args, evaluated_kwargs = self.wrap_callbacks(evaluated_args, evaluated_kwargs)
 
         # If it's a native Python function, call it with both args and kwargs.
         if not hasattr(function, "parameters"):
             return function(*evaluated_args, **evaluated_kwargs)
 
-        # Otherwise, assume it's a user-defined function.
-        local_scope = {}
-        param_names = [param.name for param in function.parameters]
-        # Bind positional arguments first, then keyword arguments.
-        for i, param in enumerate(function.parameters):
-            if i < len(evaluated_args):
-                local_scope[param.name] = evaluated_args[i]
-            elif param.name in evaluated_kwargs:
-                local_scope[param.name] = evaluated_kwargs[param.name]
-            else:
-                raise TypeError(f"Missing argument for parameter '{param.name}'")
-        # Check for any unexpected keyword arguments.
-        for key in evaluated_kwargs:
-            if key not in param_names:
-                raise TypeError(f"Unexpected keyword argument '{key}'")
-
-        previous_scope = self.global_scope.copy()
-        combined_scope = {**self.global_scope, **local_scope}
-        self.global_scope = combined_scope
-
-        result = None
-
+        # Otherwise, assume it's a user-defined function. its parameters are the first slots of a fresh frame
+        frame = (function.binder or binder_of(function)).bind(evaluated_args, evaluated_kwargs)
+        self.push_frame(frame)
+        try:
+            self.run_function_body(function, frame)
+        finally:
+            self.pop_frame()
+        return self.take_return()
+
+    # a new inline cache for a field access or method call site
+    def inline_cache(self, node, site, name, direct=True):
+        cache = InlineCache(site, name, node.line, direct)
+        self.caches.append(cache)
+        return cache
+
+    # calls only ever set up their own frame, the global scope is shared and never copied
+    def push_frame(self, frame):
+        self.frames.append(self.frame)
+        self.frame = frame
+
+    def pop_frame(self):
+        self.frame = self.frames.pop()
+
+    # runs a function's body in the current frame, restarting it in place for self tail calls
+    def run_function_body(self, function, frame):
         while True:
             tail_restarted = False
-            try:
-                # run thru each statement in the body
-                for idx, statement in enumerate(function.body):
-                    # tail call conditions: last statement == ReturnStatement, returns FunctionCall to the SAME FUNCTION
-                    if (isinstance(statement, ReturnStatement) and idx == len(function.body) - 1):
-                        val_node = statement.values[0] if statement.values else None
-
-                        if isinstance(val_node, FunctionCall):
-                            # normalize names
-                            called_name = val_node.name if isinstance(val_node.name, str) else getattr(val_node.name, "value", None)
-                            func_def_name = function.name.value if hasattr(function.name, "value") else function.name
-
-                            # make sure the tail call is true self recursion
-                            if called_name == func_def_name:
-                                # evaluate the new args/kwargs (no call yet)
-                                new_args = [self.evaluate(a) for a in val_node.parameters]
-                                new_kwargs = {k: self.evaluate(v) for k, v in val_node.kwargs.items()} if hasattr(val_node, "kwargs") else {}
-
-                                # rebind parameters to global scope (a must for tail call)
-                                for i, param in enumerate(function.parameters):
-                                    if i < len(new_args): self.global_scope[param.name] = new_args[i]
-                                    elif param.name in new_kwargs: self.global_scope[param.name] = new_kwargs[param.name]
-                                    else: raise TypeError(f"Missing argument for parameter '{param.name}'")
-
-                                # restart function body with new param bindings
-                                tail_restarted = True
-                                break
-
-                    # otherwise just deal with it normally
-                    self.evaluate(statement)
-
-                # where the restart happens
-                if tail_restarted:
-                    continue
-
-                # no tail call == stop
-                break
+            # run thru each statement in the body
+            for idx, statement in enumerate(function.body):
+                # tail call conditions: last statement == ReturnStatement, returns FunctionCall to the SAME FUNCTION
+                if (isinstance(statement, ReturnStatement) and idx == len(function.body) - 1):
+                    val_node = statement.values[0] if statement.values else None
+
+                    if isinstance(val_node, FunctionCall):
+                        # normalize names
+                        called_name = val_node.name if isinstance(val_node.name, str) else getattr(val_node.name, "value", None)
+                        func_def_name = function.name.value if hasattr(function.name, "value") else function.name
+
+                        # make sure the tail call is true self recursion
+                        if called_name == func_def_name:
+                            # evaluate the new args/kwargs (no call yet)
+                            new_args = [self.evaluate(a) for a in val_node.parameters]
+                            new_kwargs = {k: self.evaluate(v) for k, v in val_node.kwargs.items()} if hasattr(val_node, "kwargs") else {}
+
+                            # rebind parameters in the frame (a must for tail call), the rest of the locals start over unset
+                            frame[:] = (function.binder or binder_of(function)).bind(new_args, new_kwargs, strict=False)
+
+                            # restart function body with new param bindings
+                            tail_restarted = True
+                            break
+
+                # otherwise just deal with it normally, a return stops the body
+                self.evaluate(statement)
+                if self.signal is not None:
+                    return
 
-            # handle returns
-            except ReturnException as ret:
-                result = ret.value
-                break
+            # where the restart happens
+            if tail_restarted:
+                continue
 
-        self.global_scope = previous_scope
-        return result
+            # no tail call == stop
+            break
 
     def evaluate_return_statement(self, node):
-        value = self.evaluate(node.values[0]) if node.values else None
-        raise ReturnException(value)
+        self.returned = self.evaluate(node.values[0]) if node.values else None
+        self.signal = Signal.RETURN
 
     def evaluate_identifier(self, node):
+        if node.kind is Binding.LOCAL:
+            value = self.frame[node.index]
+            if value is UNBOUND:
+                raise ValueError(f"'{node.name}' is not defined or has not been imported. Did you forget to import a library or create a class?")
+            return value
         if node.name not in self.global_scope:
             raise ValueError(f"'{node.name}' is not defined or has not been imported. Did you forget to import a library or create a class?")
         return self.global_scope[node.name]
@@ -471,8 +605,9 @@ class Interpreter:
 
         # afterwards, enforce type
         if reprenabled == True: print(f"Enforcing type for array: {elements}")
-        for element in elements:
-            self.enforce_type(node.type, element)
+        if node.checked:
+            for element in elements:
+                self.enforce_type(node.type, element)
 
         return elements
 
@@ -482,26 +617,18 @@ class Interpreter:
 
         # enforce type, dwb size
         if reprenabled == True: print(f"Enforcing type for array: {elements}")
-        for element in elements:
-            self.enforce_type(node.type, element)
+        if node.checked:
+            for element in elements:
+                self.enforce_type(node.type, element)
 
         return elements
 
     def evaluate_class_literal(self, node):
-        if node.parent:
-            parent_class = self.evaluate(node.parent)
-            node.env = dict(getattr(parent_class, 'env', {}))
-        else:
-            node.env = {}
-
-        for field in node.fields:
-            node.env[field.name] = None
-
+        lay_out(node, self.evaluate(node.parent) if node.parent else None)
         for method in node.methods:
-            node.env[method.name.value] = method
+            binder_of(method, method=True)
 
-        for stmt in node.body:
-            self.evaluate(stmt)
+        self.evaluate_block(node.body)
 
         return node
 
@@ -514,63 +641,32 @@ class Interpreter:
         class_literal = self.global_scope[typ]
         evaluated_args = [self.evaluate(arg) for arg in node.arguments]
         evaluated_kwargs = {key: self.evaluate(value) for key, value in node.kwargs.items()} if hasattr(node, 'kwargs') else {}
-
-        evaluated_args = [
-            self.create_callback(arg) if hasattr(arg, "parameters") and hasattr(arg, "body") else arg
-            for arg in evaluated_args
-        ]
-
-        for key, value in evaluated_kwargs.items():
-            if key == "command" and hasattr(value, "parameters") and hasattr(value, "body"):
-                evaluated_kwargs[key] = self.create_callback(value)
+        evaluated_args, evaluated_kwargs = self.wrap_callbacks(evaluated_args, evaluated_kwargs)
 
         # for native Python classes, instantiate with both args and kwargs
         if isinstance(class_literal, type):
             instance = class_literal(*evaluated_args, **evaluated_kwargs)
-            self.global_scope[name] = instance
+            self.store(node, name, instance)
             return instance
 
-        # otherwise, assume it's a language-defined class. get its args
-        args_str = ", ".join(str(arg) for arg in evaluated_args)
-        kwargs_str = ", ".join(f"{key}={value}" for key, value in evaluated_kwargs.items())
-        sep = ", " if args_str and kwargs_str else ""
-
-        instance = {
-            '__class__': class_literal,
-            'fields': dict(class_literal.env),
-            '__str__': f"{typ}({args_str}{sep}{kwargs_str})"
-        }
+        # otherwise, assume it's a language-defined class
+        instance = Instance(class_literal, evaluated_args, evaluated_kwargs)
 
         # call __init__ (initializer) if defined
-        if '__init__' in class_literal.env:
-            init_method = class_literal.env['__init__']
-            local_scope = {}
-            local_scope[init_method.parameters[0].name] = instance
-
-            param_names = [param.name for param in init_method.parameters]
-            # Bind positional and keyword arguments for __init__ (skip the first parameter, typically self).
-            for i, param in enumerate(init_method.parameters[1:]):
-                if i < len(evaluated_args):
-                    local_scope[param.name] = evaluated_args[i]
-                elif param.name in evaluated_kwargs:
-                    local_scope[param.name] = evaluated_kwargs[param.name]
-                else:
-                    raise TypeError(f"Missing argument for parameter '{param.name}' in __init__")
-            for key in evaluated_kwargs:
-                if key not in param_names:
-                    raise TypeError(f"Unexpected keyword argument '{key}' in __init__")
-
-            previous_scope = self.global_scope.copy()
-            self.global_scope.update(local_scope)
+        if '__init__' in class_literal.table:
+            init_method = class_literal.table['__init__']
+            # self goes in slot 0, the rest of the parameters after it
+            frame = (init_method.binder or binder_of(init_method, method=True)).bind(evaluated_args, evaluated_kwargs)
+            frame[0] = instance
 
+            self.push_frame(frame)
             try:
-                for stmt in init_method.body:
-                    self.evaluate(stmt)
-            except ReturnException as ret:
-                pass
-            self.global_scope = previous_scope
+                self.evaluate_block(init_method.body)
+            finally:
+                self.pop_frame()
+            self.take_return()
 
-        self.global_scope[name] = instance
+        self.store(node, name, instance)
         return instance
 
     def evaluate_field_assignment(self, node):
@@ -588,18 +684,21 @@ class Interpreter:
         # extract the field name from the assignment
         field_name = node.field.value if hasattr(node.field, "value") else node.field
 
-        # ensure the instance is a valid object (dict with a 'fields' key).
-        if not (isinstance(instance, dict) and "fields" in instance):
+        # ensure the instance is a valid object
+        if not isinstance(instance, Instance):
             raise TypeError("Field assignment target is not a valid instance.")
 
-        instance["fields"][field_name] = new_value
+        cache = node.cache
+        if cache is None:
+            cache = node.cache = self.inline_cache(node, "set field", field_name)
+        cache.set(instance, new_value)
         return new_value
 
     def evaluate_field_access(self, node):
         # Evaluate the parent node to get the instance.
         instance = self.evaluate(node.parent)
-        # Ensure the instance is a valid object (in our design, a dict with a 'fields' key).
-        if not (isinstance(instance, dict) and 'fields' in instance):
+        # Ensure the instance is a valid object.
+        if not isinstance(instance, Instance):
             raise TypeError("Field access target is not a valid instance.")
 
         # Determine the field name.
@@ -609,69 +708,54 @@ class Interpreter:
             field_name = node.field  # For tokens.
 
         # Return the field's value, or None if not found.
-        return instance['fields'].get(field_name, None)
+        cache = node.cache
+        if cache is None:
+            cache = node.cache = self.inline_cache(node, "field", field_name)
+        return cache.get(instance)
 
     def evaluate_method_call(self, node):
         parent_obj = self.evaluate(node.parent)
         method_name = node.name.value if hasattr(node.name, "value") else node.name
 
-        # add native methods for types, this is an example. but i want to make it so:
-        # native methods = {type: method, ...}
-        # do an o(1) lookup based on method name, check if that exists for that type
-        # for right now i just wanna do a length for str
-        if isinstance(parent_obj, list):
-            if method_name == "length":
-                return len(parent_obj)
-
-        if isinstance(parent_obj, str):
-            if method_name == "length":
-                return len(parent_obj)
-
-        if isinstance(parent_obj, dict) and '__class__' in parent_obj:
-            class_obj = parent_obj['__class__']
-            if method_name not in class_obj.env:
-                raise AttributeError(f"Class '{class_obj}' does not have a method '{method_name}'.")
-            method_node = class_obj.env[method_name]
-            evaluated_args = [self.evaluate(arg) for arg in node.parameters]
-            evaluated_kwargs = {key: self.evaluate(value) for key, value in node.kwargs.items()} if hasattr(node, 'kwargs') else {}
-
-            evaluated_args = [
-                self.create_callback(arg) if hasattr(arg, "parameters") and hasattr(arg, "body") else arg
-                for arg in evaluated_args
-            ]
+        # what the method is for this kind of receiver comes out of the site's cache. an identifier's value is the object a python
+        # method gets looked up on, anything else still goes through the package lookup below
+        cache = node.cache
+        if cache is None:
+            cache = node.cache = self.inline_cache(node, "method", method_name, isinstance(node.parent, Identifier))
+        target, method_node = cache.method(parent_obj)
 
-            for key, value in evaluated_kwargs.items():
-                if key == "command" and hasattr(value, "parameters") and hasattr(value, "body"):
-                    evaluated_kwargs[key] = self.create_callback(value)
+        # .length() on lists, strings and dicts
+        if target is Target.LENGTH:
+            return len(parent_obj)
 
-            local_scope = {}
-            local_scope[method_node.parameters[0].name] = parent_obj
-            param_names = [param.name for param in method_node.parameters]
-
-            for i, param in enumerate(method_node.parameters[1:]):
-                if i < len(evaluated_args):
-                    local_scope[param.name] = evaluated_args[i]
-                elif param.name in evaluated_kwargs:
-                    local_scope[param.name] = evaluated_kwargs[param.name]
-                else:
-                    raise TypeError(f"Missing argument for parameter '{param.name}' in method '{method_name}'")
-            for key in evaluated_kwargs:
-                if key not in param_names:
-                    raise TypeError(f"Unexpected keyword argument '{key}' in method '{method_name}'")
+        if target is Target.METHOD:
+            evaluated_args = [self.evaluate(arg) for arg in node.parameters]
+            evaluated_kwargs = {key: self.evaluate(value) for key, value in node.kwargs.items()} if hasattr(node, 'kwargs') else {}
+            evaluated_args, evaluated_kwargs = self.wrap_callbacks(evaluated_args, evaluated_kwargs)
 
-            previous_scope = self.global_scope.copy()
-            self.global_scope.update(local_scope)
+            # same frame layout as __init__, self first
+            frame = (method_node.binder or binder_of(method_node, method=True)).bind(evaluated_args, evaluated_kwargs)
+            frame[0] = parent_obj
 
+            # hands back the last statement's value when it doesn't return
             result = None
+            self.push_frame(frame)
             try:
                 for stmt in method_node.body:
                     result = self.evaluate(stmt)
-            except ReturnException as ret:
-                result = ret.value
-
-            self.global_scope = previous_scope
+                    if self.signal is not None:
+                        result = self.take_return()
+                        break
+            finally:
+                self.pop_frame()
             return result
 
+        # a builtin method (builtins.py's METHODS, append, split, get...) or a function found on the receiver's type, no need to bind it
+        elif target is Target.NATIVE:
+            args = [self.evaluate(arg) for arg in node.parameters]
+            kwargs = {key: self.evaluate(value) for key, value in node.kwargs.items()} if hasattr(node, 'kwargs') else {}
+            return method_node(parent_obj, *args, **kwargs)
+
         else:
             if hasattr(node.parent, "value"):
                 package_name = node.parent.value
@@ -681,7 +765,8 @@ class Interpreter:
                 raise ValueError(f"Invalid package identifier in MethodCall.")
 
             try:
-                package_obj = self.global_scope[package_name]
+                # a local (say a widget made inside a function) isn't in the global scope, but we already have it
+                package_obj = parent_obj if getattr(node.parent, "kind", None) is Binding.LOCAL else self.global_scope[package_name]
             except KeyError:
                 raise KeyError(f"Package: {package_name} not found in global scope")
 
@@ -716,7 +801,7 @@ class Interpreter:
                 return value
             elif isinstance(container, str):
                 container = container[:index] + value + container[index + 1:]
-                self.global_scope[node.container.name] = container
+                self.store(node.container, node.container.name, container)
                 return container
         except IndexError:
             raise IndexError("Index out of range.")
@@ -725,13 +810,11 @@ class Interpreter:
         body = node.body
 
         try:
-            for statement in body:
-                self.evaluate(statement)
+            self.evaluate_block(body)
         except Exception as e:
             name = type(e).__name__
             if name in node.catches:
-                for statement in node.catches[name].body:
-                    self.evaluate(statement)
+                self.evaluate_block(node.catches[name].body)
             else:
                 raise e
 
@@ -756,4 +839,7 @@ class Interpreter:
             raise exception()
 
     def evaluate_break(self, node):
-        raise BreakException()
\ No newline at end of file
+        self.signal = Signal.BREAK
+
+    def evaluate_continue(self, node):
+        self.signal = Signal.CONTINUE
\ No newline at end of file
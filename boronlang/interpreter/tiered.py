@@ -0,0 +1,298 @@
+# tiered engine. everything starts out on the tree walker, which counts calls and loop back edges for each Function node. once a
+# function's count passes the threshold its body gets compiled to closures, specialized for the argument types it has been called
+# with so far, and behind a guard on those types. a call whose arguments don't match falls back to the tree walker (a deopt), and a
+# function that keeps deopting gets recompiled without the guard. a function only moves up a tier the next time it gets called, but a
+# single loop that runs long enough switches over to a compiled copy of itself partway through
+from decimal import Decimal
+from operator import itemgetter
+from rich import print
+
+from lexer.lexer import TokenType
+from parsing.astnodes import *
+from parsing.resolver import Binding, writes
+from interpreter.interpreter import Interpreter, Signal, UNBOUND, binder_of
+from interpreter.closures import ClosureInterpreter, OPERATORS, tail_call
+
+#! calls plus loop back edges before a function gets compiled, and whether to print what happened once the program is done
+global threshold, statsenabled
+threshold = 500
+statsenabled = False
+
+# guard failures a specialized body puts up with before it's thrown out for a generic one
+DEOPT_LIMIT = 5
+
+# declared types and the python type a value needs to be to pass enforce_type untouched
+EXACT = {
+    TokenType.INTEGER: int,
+    TokenType.DECIMAL: Decimal,
+    TokenType.BOOLEAN: bool,
+    TokenType.STR: str,
+}
+
+LITERALS = {
+    IntLiteral: int,
+    DecLiteral: Decimal,
+    StringLiteral: str,
+    BooleanLiteral: bool,
+}
+
+COMPARISONS = (TokenType.GREATER_THAN, TokenType.LESS_THAN, TokenType.GREATER_EQUAL, TokenType.LESS_EQUAL, TokenType.EQUAL,
+               TokenType.NOT_EQUAL)
+ARITHMETIC = (TokenType.ADD, TokenType.SUBTRACT, TokenType.MULTIPLY)
+
+# what the engine knows about one function
+class Profile:
+    __slots__ = ("calls", "backedges", "signature", "polymorphic", "tier", "guard", "body", "deopts")
+
+    def __init__(self):
+        self.calls = 0
+        self.backedges = 0
+        # argument types of the first call, and whether any call since has had different ones
+        self.signature = None
+        self.polymorphic = False
+        # "tree", "specialized" or "generic", the body that goes with it and the types it needs (None for no guard)
+        self.tier = "tree"
+        self.guard = None
+        self.body = None
+        self.deopts = 0
+
+class TieredInterpreter(ClosureInterpreter):
+    # tier 0 is the plain tree walker, the closure compiler only gets used for hot function bodies
+    evaluate = Interpreter.evaluate
+
+    def __init__(self, filepath: str, args=[]):
+        super().__init__(filepath, args)
+        self.profiles = {}
+        # the profile of the function the tree walker is running, its loops count against it
+        self.profile = None
+        self.programs = 0
+
+        # compiled loops, for when one runs long enough to switch over partway through, and how many times that has happened
+        self.loops = {}
+        self.hot_loops = 0
+
+        # while a body is being specialized: the slots of its parameters (always bound) and the types of the ones it never writes
+        self.bound = ()
+        self.known = {}
+
+    def evaluate_program(self, program):
+        self.programs += 1
+        try:
+            Interpreter.evaluate_program(self, program)
+        finally:
+            self.programs -= 1
+            if statsenabled and self.programs == 0:
+                self.print_stats()
+
+    def evaluate_function_call(self, node):
+        func_name = node.name
+        if node.kind is Binding.LOCAL and self.frame[node.index] is not UNBOUND:
+            function = self.frame[node.index]
+        elif func_name in self.global_scope:
+            function = self.global_scope[func_name]
+        else:
+            raise NameError(f"Function '{func_name}' is not defined.")
+        evaluated_args = [self.evaluate(arg) for arg in node.parameters]
+        evaluated_kwargs = {key: self.evaluate(value) for key, value in node.kwargs.items()} if hasattr(node, 'kwargs') else {}
+        evaluated_args, evaluated_kwargs = self.wrap_callbacks(evaluated_args, evaluated_kwargs)
+
+        if not hasattr(function, "parameters"):
+            return function(*evaluated_args, **evaluated_kwargs)
+        return self.call_function(function, evaluated_args, evaluated_kwargs)
+
+    # every call to a boron function comes through here, from the tree walker and from compiled bodies alike
+    def call_function(self, function, evaluated_args, evaluated_kwargs):
+        profile = self.profiles.get(function)
+        if profile is None:
+            profile = self.profiles[function] = Profile()
+        profile.calls += 1
+
+        binder = function.binder or binder_of(function)
+        frame = binder.bind(evaluated_args, evaluated_kwargs)
+        signature = tuple([type(value) for value in frame[:binder.count]])
+
+        body = profile.body
+        if body is not None:
+            if profile.guard is not None and signature != profile.guard:
+                body = self.deoptimize(function, profile)
+        else:
+            if profile.signature is None:
+                profile.signature = signature
+            elif signature != profile.signature:
+                profile.polymorphic = True
+            if profile.calls + profile.backedges >= threshold:
+                body = self.tier_up(function, profile)
+
+        # a compiled body hands back its signal, the tree walker leaves it in self.signal. the value is in self.returned either way
+        previous, self.profile = self.profile, profile
+        self.push_frame(frame)
+        try:
+            if body is not None:
+                self.signal = body(frame)
+            else:
+                self.run_function_body(function, frame)
+        finally:
+            self.pop_frame()
+            self.profile = previous
+        return self.take_return()
+
+    # one guard on the types every call so far has had, or none when they haven't all agreed
+    def tier_up(self, function, profile):
+        if profile.polymorphic:
+            profile.tier, profile.guard = "generic", None
+        else:
+            profile.tier, profile.guard = "specialized", profile.signature
+        profile.body = self.specialize(function, profile.guard)
+        return profile.body
+
+    # this call runs on the tree walker, and after enough of them the body is compiled again with nothing to guard
+    def deoptimize(self, function, profile):
+        profile.deopts += 1
+        if profile.deopts >= DEOPT_LIMIT:
+            profile.tier, profile.guard = "generic", None
+            profile.body = self.specialize(function, None)
+            return profile.body
+        return None
+
+    def specialize(self, function, guard):
+        parameters = [param.name for param in function.parameters]
+        self.bound = range(len(parameters))
+        self.known = {}
+        # a tail call to itself rebinds the parameters without going back through the guard, so their types aren't known then
+        if guard is not None and tail_call(function) is None:
+            self.known = {i: typ for i, (name, typ) in enumerate(zip(parameters, guard)) if not writes(function.body, {name})}
+        try:
+            return self.compile_function_body(function)
+        finally:
+            self.bound, self.known = (), {}
+
+    # anything defined inside a body being specialized has slots of its own
+    def compile_function(self, node):
+        return self.unspecialized(super().compile_function, node)
+
+    def compile_method_body(self, method):
+        return self.unspecialized(super().compile_method_body, method)
+
+    def unspecialized(self, compiler, node):
+        saved, self.bound, self.known = (self.bound, self.known), (), {}
+        try:
+            return compiler(node)
+        finally:
+            self.bound, self.known = saved
+
+    # a parameter is never unbound, so reading it is just the slot
+    def compile_identifier(self, node):
+        if node.kind is Binding.LOCAL and node.index in self.bound:
+            return itemgetter(node.index)
+        return super().compile_identifier(node)
+
+    def compile_binary_operation(self, node):
+        left = node.left
+        if (node.operator in OPERATORS and isinstance(node.right, Constant) and isinstance(left, Identifier)
+                and left.kind is Binding.LOCAL and left.index in self.bound):
+            function, index, constant = OPERATORS[node.operator], left.index, node.right.value
+            return lambda frame: function(frame[index], constant)
+        return super().compile_binary_operation(node)
+
+    def needs_check(self, node):
+        expected = EXACT.get(node.var_type)
+        if expected is not None and node.value is not None and self.static_type(node.value) is expected:
+            return False
+        return super().needs_check(node)
+
+    # the exact type node always evaluates to, given the guarded parameter types, or None when that isn't certain
+    def static_type(self, node):
+        if isinstance(node, Constant):
+            return type(node.value)
+        if type(node) in LITERALS:
+            return LITERALS[type(node)]
+        if isinstance(node, Identifier):
+            return self.known.get(node.index) if node.kind is Binding.LOCAL else None
+        if isinstance(node, BinaryOperation):
+            left, right = self.static_type(node.left), self.static_type(node.right)
+            if left is None or right is None:
+                return None
+            if node.operator in COMPARISONS and left in (int, Decimal) and right in (int, Decimal):
+                return bool
+            if node.operator in ARITHMETIC and left is int and right is int:
+                return int
+            if node.operator in (TokenType.FLOOR_DIVIDE, TokenType.MODULUS) and left is int and right is int:
+                return int
+            if node.operator is TokenType.ADD and left is str and right is str:
+                return str
+        # and/or and conditionals hand back one of their two sides as it is
+        if isinstance(node, LogicalOperation):
+            left = self.static_type(node.left)
+            return left if left is not None and left is self.static_type(node.right) else None
+        if isinstance(node, ConditionalExpression):
+            if_type = self.static_type(node.if_value)
+            return if_type if if_type is not None and if_type is self.static_type(node.else_value) else None
+        return None
+
+    # loops the tree walker runs count toward tiering up the function they're in. a loop that keeps going past the threshold
+    # finishes compiled (closures work on the same frame), so one long loop doesn't have to wait for another call to speed up
+    def evaluate_for_loop(self, node):
+        profile = self.profile
+        iterations = 0
+        self.evaluate(node.initializer)
+        while self.evaluate(node.condition):
+            if profile is not None:
+                profile.backedges += 1
+            iterations += 1
+            if iterations >= threshold:
+                self.signal = self.finish_for_loop(node)
+                return
+            self.evaluate_block(node.body)
+            if self.signal is not None and self.leaves_loop():
+                break
+            self.evaluate(node.increment)
+
+    def evaluate_while_loop(self, node):
+        profile = self.profile
+        iterations = 0
+        while True:
+            if profile is not None:
+                profile.backedges += 1
+            iterations += 1
+            if iterations >= threshold:
+                self.signal = self.compiled_loop(node, self.compile_while_loop)(self.frame)
+                return
+            self.evaluate_block(node.body)
+            if self.signal is not None and self.leaves_loop():
+                break
+            if not self.evaluate(node.condition):
+                break
+
+    # picks up right after the condition came back true, hands back a return's signal like the compiled loop would
+    def finish_for_loop(self, node):
+        condition, body, increment = self.compiled_loop(node, self.compile_for_rest)
+        frame = self.frame
+        while True:
+            signal = body(frame)
+            if signal is not None:
+                if signal is Signal.BREAK:
+                    return None
+                if signal is Signal.RETURN:
+                    return signal
+            increment(frame)
+            if not condition(frame):
+                return None
+
+    def compile_for_rest(self, node):
+        return self.compile(node.condition), self.compile_body(node.body), self.compile(node.increment)
+
+    def compiled_loop(self, node, compiler):
+        self.hot_loops += 1
+        compiled = self.loops.get(node)
+        if compiled is None:
+            compiled = self.loops[node] = compiler(node)
+        return compiled
+
+    def print_stats(self):
+        print(f"\nTiering (threshold {threshold}):")
+        print(f"{'function':<16}{'calls':>9}{'loops':>9}  {'tier':<13}{'guard':<16}{'deopts':>6}")
+        for function, profile in sorted(self.profiles.items(), key=lambda item: -item[1].calls):
+            guard = ", ".join(typ.__name__ for typ in profile.guard) if profile.guard is not None else "-"
+            print(f"{function.name.value:<16}{profile.calls:>9}{profile.backedges:>9}  {profile.tier:<13}{guard:<16}{profile.deopts:>6}")
+        print(f"{sum(profile.tier != 'tree' for profile in self.profiles.values())} tiered up, "
+              f"{sum(profile.deopts for profile in self.profiles.values())} deopts, {self.hot_loops} loops finished compiled")
@@ -4,6 +4,12 @@ import re
 # enum to hold the token enum
 from enum import Enum
 
+# deque for the token stream's lookahead window
+from collections import deque
+
+# bisect for finding lines and tokens when re-lexing after an edit
+from bisect import bisect_left, bisect_right
+
 class TokenType(Enum):
     # numbers
     NUMBER = ("number", r'-?\b\d+?\b')
@@ -44,6 +50,7 @@ class TokenType(Enum):
     OR = ("or", r'\bor\b')
     AS = ("as", r'\bas\b')
     BREAK = ("break", r'\bbreak\b')
+    CONTINUE = ("continue", r'\bcontinue\b')
 
     # planned keywords/features
     AUTO = ("auto", r'\bauto\b')
@@ -132,169 +139,319 @@ class Token:
     def __repr__(self):
         return f"Token({self.type.name}, {repr(self.value)})"
 
+# lookahead buffer over a token iterator (Lexer.stream or a plain list). the parser only ever looks a token or two ahead,
+# so this is all that has to sit in memory instead of every token in the file
+class TokenStream:
+    def __init__(self, tokens):
+        self.source = iter(tokens)
+        self.window = deque()
+        self.current = next(self.source, None)
+
+    # type of the current token
+    def kind(self):
+        return self.current.type
+
+    # line and column of the current token, (0, 0) past the end
+    def position(self):
+        token = self.current
+        return (token.line, token.position) if token is not None else (0, 0)
+
+    # gets the token offset places ahead of the current one without consuming anything, none once the stream runs dry
+    def peek(self, offset=1):
+        if offset == 0:
+            return self.current
+        window = self.window
+        while len(window) < offset:
+            token = next(self.source, None)
+            if token is None:
+                return None
+            window.append(token)
+        return window[offset - 1]
+
+    # type of the token offset places ahead, none past the end
+    def peek_type(self, offset=1):
+        token = self.peek(offset)
+        return token.type if token is not None else None
+
+    # consumes the current token and returns the next one
+    def advance(self):
+        self.current = self.window.popleft() if self.window else next(self.source, None)
+        return self.current
+
+# every match in the old line-slicing lexer started at the front of a fresh slice, where a leading \b only looks at the next char.
+# matching at an offset makes \b look behind as well, so anchor those with a lookahead to keep the exact same tokens
+def anchor(pattern):
+    return re.sub(r'^(-\?)?\\b', r'\1(?=\\w)', pattern)
+
+# keywords (anything whose pattern is just \bword\b) aren't alternatives in the master regex. identifier shaped text only matches
+# IDENTIFIER, then gets looked up here, instead of re trying every keyword in order before it reaches IDENTIFIER
+KEYWORDS = {
+    token_type.label: token_type
+    for token_type in TokenType
+    if token_type.pattern == rf'\b{token_type.label}\b' and token_type.label.isidentifier()
+}
+
+# else if is two words, so it can't be a table entry. checked right after an else is found instead
+ELSE_IF_TAIL = re.compile(r' if\b')
+
+# the master regex, built and compiled once per process instead of on every tokenize call
+TOKEN_REGEX = re.compile('|'.join(
+    f'(?P<{token_type.name}>{anchor(token_type.pattern)})'
+    for token_type in TokenType
+    if token_type.pattern is not None and token_type.label not in KEYWORDS and token_type is not TokenType.ELSE_IF
+))
+
+# the same thing with the whitespace in front of a token folded in, so the main loop only runs one match per token
+SCAN_REGEX = re.compile(rf'\s*(?:{TOKEN_REGEX.pattern})')
+
+# regex group name -> token type, quicker than TokenType[name]
+GROUP_TYPES = {token_type.name: token_type for token_type in TokenType}
+
+# whitespace never starts a token, so runs of it get skipped in one go
+WHITESPACE = re.compile(r'\s*')
+
+# same line boundaries str.splitlines uses
+LINE_BREAK = re.compile(r'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+# tokens that grab the identifier after them (static type definitions, fn, imports, etc.)
+DECLARATION_TYPES = frozenset({
+    TokenType.FUNCTION, TokenType.INTEGER, TokenType.DEC, TokenType.BOOLEAN, TokenType.STR, TokenType.IMPORT, TokenType.AS, TokenType.TUPLE, TokenType.AUTO,
+    TokenType.SET, TokenType.ARRAY, TokenType.LIST, TokenType.VECTOR, TokenType.DICT, TokenType.RANGE, TokenType.CLASS, TokenType.EXTENDS,
+})
+
+# what can follow a return: a type (for function signatures) or a literal
+RETURN_TYPES = frozenset({"INTEGER", "DEC", "BOOLEAN", "STR", "TUPLE", "SET", "ARRAY", "LIST", "VECTOR", "RANGE"})
+RETURN_LITERALS = frozenset({"STRING", "IDENTIFIER", "NUMBER", "TRUE", "FALSE", "NONE"})
+
+# yields the (start, end) offsets of every line, same as splitlines but without copying anything
+# (optionally only between pos and endpos, which should both sit on line starts)
+def line_spans(text, pos=0, endpos=None):
+    endpos = len(text) if endpos is None else endpos
+    start = pos
+    for brk in LINE_BREAK.finditer(text, pos, endpos):
+        yield start, brk.start()
+        start = brk.end()
+    if start < endpos:
+        yield start, endpos
+
 # the actual lexer, the guts of this shit
 class Lexer:
-    # initialize it with the text to lex, start the position at 0, and the line and column at 1
-    # also initialize a list of all the tokens that will be added to as we go
+    # initialize it with the text to lex (a string or an open file, which gets read line by line), start the position at 0,
+    # and the line and column at 1. also initialize a list of all the tokens that tokenize will fill
     def __init__(self, text):
         self.text = text
         self.pos = 0
         self.line = 1
         self.column = 1
         self.tokens = []
-    
-    # the function to turn the text into tokens. i want to just put this inside the enum without breaking anything
+
+    # turns the whole source into a list of tokens
     def tokenize(self):
-        token_specification = [
-            (token_type, token_type.pattern)
-            for token_type in TokenType
-            if token_type.pattern is not None
-        ]
-        
-        # make a regex matcher for each token type and compile it
-        token_regex = '|'.join(f'(?P<{tok_type.name}>{pattern})' for tok_type, pattern in token_specification)
-        get_token = re.compile(token_regex).match
-
-        # split text by lines
-        lines = self.text.splitlines()
-        
-        # start line count at 1 and iterate through each line
-        linenum = 1
-        linepos = 0
-        for line in lines:
-            # whitespace flag, if no content we just skip it. also initialize line position
-            content = False
-            linepos = 0
-            
-            # while text in a line
-            while line:
-                # get the current token, if there is none continue
-                mo = get_token(line)
-                if not mo:
-                    line = line[1:]
-                    continue
-
-                # add length of the character to the position
-                linepos += (mo.end() - mo.start())
-                
-                # get type of token from that, and check it against the regex matcher. get the actual token value as well
-                typ = mo.lastgroup
-                tok_type = TokenType[typ]
-                value = mo.group(typ)
-                
-                # if comment, skip over it
-                if tok_type == TokenType.COMMENT:
-                    line = line[mo.end():]
-                    continue
-                
-                # if number
-                if tok_type == TokenType.NUMBER:
-                    # get next character
-                    line = line[mo.end():]
-                    mo_next = get_token(line)
-
-                    # if next character is a period
-                    if mo_next and mo_next.lastgroup == "PERIOD":
-                        # check if there is a token after the period
-                        line = line[mo_next.end():]
-                        mo_decimal = get_token(line)
-
-                        # check if that token is another number
-                        if mo_decimal and mo_decimal.lastgroup == "NUMBER":
-                            # if it is assume it's a decimal
-                            value += '.' + mo_decimal.group("NUMBER")
-                            self.tokens.append(Token(TokenType.DECIMAL, value, linenum, linepos))
-                            line = line[mo_decimal.end():]
-                            continue
-                        else:
-                            # else just append a number and a period. we don't enforce errors in the lexer
-                            self.tokens.append(Token(TokenType.NUMBER, value, linenum, linepos))
-                            self.tokens.append(Token(TokenType.PERIOD, ".", linenum, linepos))
-                            continue
-                    else:
-                        # if there isn't anything just append a number and continue
-                        self.tokens.append(Token(TokenType.NUMBER, value, linenum, linepos))
-                        continue
-                
-                # if static type definition
-                if tok_type in [TokenType.FUNCTION, TokenType.INTEGER, TokenType.DEC, TokenType.BOOLEAN, TokenType.STR, TokenType.IMPORT, TokenType.AS, TokenType.TUPLE, TokenType.AUTO, 
-                                TokenType.SET, TokenType.ARRAY, TokenType.LIST, TokenType.VECTOR, TokenType.DICT, TokenType.RANGE, TokenType.CLASS, TokenType.EXTENDS, TokenType.AS]:
-                    # get token after that
-                    line = line[mo.end():].lstrip()
-                    mo_identifier = get_token(line)
-                    
-                    # if it's an identifier, get it's name, mark content as true, and continue
-                    if mo_identifier and mo_identifier.lastgroup == "IDENTIFIER":
-                        name = mo_identifier.group("IDENTIFIER")
-                        self.tokens.append(Token(tok_type, Token(TokenType.IDENTIFIER, name, linenum, linepos), linenum, linepos))
-                        line = line[mo_identifier.end():]
-                        content = True
-                        continue
-                    else:
-                        # else append none because we don't enforce shit here
-                        self.tokens.append(Token(tok_type, Token(TokenType.NONE, "none", linenum, linepos), linenum, linepos))
-                        continue
-                
-                # if token is return
-                if tok_type == TokenType.RETURN:
-                    # get value after that token
-                    line = line[mo.end():].lstrip()
-                    mo_return_value = get_token(line)
-                    
-                    # if it's a type return, get and append the value and mark content as true
-                    if mo_return_value and mo_return_value.lastgroup in ["INTEGER", "DEC", "BOOLEAN", "STR", "TUPLE", "SET", "ARRAY", "LIST", "VECTOR", "RANGE"]:
-                        return_value = mo_return_value.group(mo_return_value.lastgroup)
-                        self.tokens.append(Token(tok_type, return_value, linenum, linepos))
-                        line = line[mo_return_value.end():]
-                        content = True
-                        continue
-
-                    # else if it's a literal, do the same but append the actual token and then the value, allowing us to use return nodes for 2 things
-                    elif mo_return_value and mo_return_value.lastgroup in ["STRING", "IDENTIFIER", "NUMBER", "TRUE", "FALSE", "NONE"]:
-                        return_value = Token(TokenType[mo_return_value.lastgroup], mo_return_value.group(mo_return_value.lastgroup), linenum, linepos)
-                        self.tokens.append(Token(tok_type, Token(TokenType.NONE, "none", linenum, linepos), linenum, linepos))
-                        self.tokens.append(return_value)
-                        line = line[mo_return_value.end():]
-                        content = True
-                        continue
+        self.tokens.extend(self.stream())
+        return self.tokens
+
+    # re-lexes after an edit, replacing text[start:end] with replacement, and splices the result into tokens (what tokenize gave back).
+    # nothing carries over from one line to the next (strings and ##! comments can't run past the end of their line, the patterns
+    # only ever match up to endpos), so the first untouched line is always back in sync and only the edited lines get lexed again.
+    # the old tokens after the edit are reused, with their line numbers shifted in place
+    def relex(self, tokens, start, end, replacement):
+        if not isinstance(self.text, str):
+            raise TypeError("Only string sources can be re-lexed.")
+
+        old = self.text
+        spans = list(line_spans(old))
+        starts = [span[0] for span in spans]
+
+        # the lines the edit touches, as indexes into spans
+        first = max(bisect_right(starts, start) - 1, 0)
+        last = max(bisect_right(starts, end) - 1, 0)
+
+        # a lone \r right before the edit could turn into \r\n, which changes where that line ends, so take it in too
+        if first > 0 and old[starts[first] - 1] == "\r":
+            first -= 1
+
+        # the old region runs from the start of the first line to the start of the line after the last one
+        region_start = starts[first] if spans else 0
+        region_end = starts[last + 1] if last + 1 < len(starts) else len(old)
+
+        # apply the edit and lex just the new version of the region
+        text = old[:start] + replacement + old[end:]
+        shift = len(replacement) - (end - start)
+        new_spans = list(line_spans(text, region_start, region_end + shift))
+        relexed = []
+        for linenum, (line_start, line_end) in enumerate(new_spans, first + 1):
+            relexed.extend(self.lex_line(text, line_start, line_end, linenum))
+
+        # old tokens of the touched lines (tokens are in line order, the eof gets rebuilt)
+        old_lines = len(spans[first:last + 1])
+        lo = bisect_left(tokens, first + 1, 0, len(tokens) - 1, key=lambda token: token.line)
+        hi = bisect_right(tokens, first + old_lines, lo, len(tokens) - 1, key=lambda token: token.line)
+
+        # everything after the edit moves by however many lines it added or removed
+        delta = len(new_spans) - old_lines
+        tail = tokens[hi:-1]
+        if delta:
+            for token in tail:
+                token.line += delta
+                if isinstance(token.value, Token):
+                    token.value.line += delta
+
+        # the eof goes at the end of whatever the last line is now
+        if last + 1 < len(spans):
+            eof_start, eof_end = spans[-1][0] + shift, spans[-1][1] + shift
+        elif new_spans:
+            eof_start, eof_end = new_spans[-1]
+        elif first > 0:
+            eof_start, eof_end = spans[first - 1]
+        else:
+            eof_start, eof_end = 0, 0
+        self.line = max(len(spans) + delta, 1)
+        self.column = eof_end - eof_start + 1
+        self.pos = len(text)
+
+        self.text = text
+        self.tokens = tokens[:lo] + relexed + tail + [Token(TokenType.EOF, "EOF", self.line, self.column)]
+        return self.tokens
+
+    # yields tokens on demand, one source line at a time, so the parser can start before the lexer is done reading.
+    # strings are walked with a position cursor (never sliced), files are pulled a line at a time
+    def stream(self):
+        chunks = (self.text,) if isinstance(self.text, str) else self.text
+        linenum = 0
+        for chunk in chunks:
+            for start, end in line_spans(chunk):
+                linenum += 1
+                self.line = linenum
+                self.column = end - start + 1
+                yield from self.lex_line(chunk, start, end, linenum)
+            self.pos += len(chunk)
+
+        # end it with an eof
+        yield Token(TokenType.EOF, "EOF", self.line, self.column)
+
+    # token type for a match off the master regex, identifier shaped ones get checked against the keyword table
+    @staticmethod
+    def classify(mo):
+        tok_type = GROUP_TYPES[mo.lastgroup]
+        if tok_type is TokenType.IDENTIFIER:
+            return KEYWORDS.get(mo.group(), tok_type)
+        return tok_type
+
+    # lexes a single line of text (start to end), matching with endpos set to the end of the line so the patterns can't run past it
+    def lex_line(self, text, start, end, linenum):
+        tokens = []
+        scan = SCAN_REGEX.match
+        match = TOKEN_REGEX.match
+        skip = WHITESPACE.match
+
+        # whitespace flag, if no content we don't add an eol
+        content = False
+        pos = start
+
+        # while text in a line
+        while pos < end:
+            # get the next token (and the whitespace before it), if there is none skip the whitespace and the character after it
+            mo = scan(text, pos, end)
+            if not mo:
+                pos = skip(text, pos, end).end() + 1
+                continue
+
+            # get type of token from that, the actual token value, and where it starts. identifiers get checked against the keywords
+            typ = mo.lastgroup
+            value = mo.group(typ)
+            tok_type = GROUP_TYPES[typ]
+            if tok_type is TokenType.IDENTIFIER:
+                tok_type = KEYWORDS.get(value, tok_type)
+            column = mo.start(typ) - start + 1
+            pos = mo.end()
+
+            # else followed by a single space and if is one else if token
+            if tok_type is TokenType.ELSE:
+                mo_tail = ELSE_IF_TAIL.match(text, pos, end)
+                if mo_tail:
+                    tok_type = TokenType.ELSE_IF
+                    value += mo_tail.group()
+                    pos = mo_tail.end()
+
+            # if comment, skip over it
+            if tok_type == TokenType.COMMENT:
+                continue
+
+            # if number
+            if tok_type == TokenType.NUMBER:
+                # if next character is a period check if there is another number after it
+                mo_next = match(text, pos, end)
+                if mo_next and mo_next.lastgroup == "PERIOD":
+                    mo_decimal = match(text, mo_next.end(), end)
+
+                    # if it is assume it's a decimal
+                    if mo_decimal and mo_decimal.lastgroup == "NUMBER":
+                        value += '.' + mo_decimal.group()
+                        tokens.append(Token(TokenType.DECIMAL, value, linenum, column))
+                        pos = mo_decimal.end()
                     else:
-                        # else just append none
-                        self.tokens.append(Token(tok_type, Token(TokenType.NONE, "none", linenum, linepos), linenum, linepos))
-                        continue
-                
-                # string literals
-                if tok_type == TokenType.STRING:
-                    if value[0] == value[-1]:
-                        value = value[1:-1]
-                    self.tokens.append(Token(tok_type, value, linenum, linepos))
-                    line = line[mo.end():]
-                    content = True
-                    continue
-                
-                # untermed string (which we errored out in the parser)
-                if tok_type == TokenType.UNTERMINATED_STRING:
-                    self.tokens.append(Token(tok_type, value, linenum, linepos))
-                    line = line[mo.end():]
+                        # else just append a number and a period. we don't enforce errors in the lexer
+                        tokens.append(Token(TokenType.NUMBER, value, linenum, column))
+                        tokens.append(Token(TokenType.PERIOD, ".", linenum, mo_next.start() - start + 1))
+                        pos = mo_next.end()
+                else:
+                    # if there isn't anything just append a number and continue
+                    tokens.append(Token(TokenType.NUMBER, value, linenum, column))
+                continue
+
+            # if static type definition
+            if tok_type in DECLARATION_TYPES:
+                # get token after that
+                pos = skip(text, pos, end).end()
+                mo_identifier = match(text, pos, end)
+
+                # if it's an identifier, get it's name, mark content as true, and continue
+                if mo_identifier and self.classify(mo_identifier) is TokenType.IDENTIFIER:
+                    name = mo_identifier.group()
+                    tokens.append(Token(tok_type, Token(TokenType.IDENTIFIER, name, linenum, pos - start + 1), linenum, column))
+                    pos = mo_identifier.end()
                     content = True
-                    continue
-                
-                # else just append it's type, value, line number and position
                 else:
-                    self.tokens.append(Token(tok_type, value, linenum, linepos))
-                    line = line[mo.end():]
+                    # else append none because we don't enforce shit here
+                    tokens.append(Token(tok_type, Token(TokenType.NONE, "none", linenum, column), linenum, column))
+                continue
+
+            # if token is return
+            if tok_type == TokenType.RETURN:
+                # get value after that token
+                pos = skip(text, pos, end).end()
+                mo_return_value = match(text, pos, end)
+                return_group = self.classify(mo_return_value).name if mo_return_value else None
+
+                # if it's a type return, get and append the value and mark content as true
+                if return_group in RETURN_TYPES:
+                    tokens.append(Token(tok_type, mo_return_value.group(), linenum, column))
+                    pos = mo_return_value.end()
                     content = True
-                    continue
 
-            # if there's content but we're at the end, eol. reset column position and add a line to count
-            if content:
-                self.tokens.append(Token(TokenType.EOL, "EOL", linenum, linepos))
-                self.line += 1
-                self.column = 1
+                # else if it's a literal, do the same but append the actual token and then the value, allowing us to use return nodes for 2 things
+                elif return_group in RETURN_LITERALS:
+                    return_value = Token(GROUP_TYPES[return_group], mo_return_value.group(), linenum, pos - start + 1)
+                    tokens.append(Token(tok_type, Token(TokenType.NONE, "none", linenum, column), linenum, column))
+                    tokens.append(return_value)
+                    pos = mo_return_value.end()
+                    content = True
+                else:
+                    # else just append none
+                    tokens.append(Token(tok_type, Token(TokenType.NONE, "none", linenum, column), linenum, column))
                 continue
-            
-            # at the end of lines add a number i guess
-            linenum += 1
 
-        # append an eof and return all tokens
-        self.tokens.append(Token(TokenType.EOF, "EOF", linenum, linepos))
-        return self.tokens
\ No newline at end of file
+            # string literals
+            if tok_type == TokenType.STRING:
+                if value[0] == value[-1]:
+                    value = value[1:-1]
+
+            # else just append it's type, value, line number and position (untermed strings get errored out in the parser)
+            tokens.append(Token(tok_type, value, linenum, column))
+            content = True
+
+        # if there's content but we're at the end, eol
+        if content:
+            tokens.append(Token(TokenType.EOL, "EOL", linenum, end - start + 1))
+
+        return tokens
@@ -1,9 +1,50 @@
 # astnodes.py
+# slots that get filled in after a node is built, and what they read as until then. line/column are where the node starts in the
+# source (0 if it was made up by the parser), kind/index are the binding the resolver gave a name, locals is a function's frame layout,
+# cache is the inline cache of a field access or method call site, checked is whether a declaration or array/vector literal still
+# has to check its type at runtime (the type checker clears it where it proves the value's type)
+UNSET = {"line": 0, "column": 0, "kind": None, "index": None, "locals": None, "binder": None, "cache": None, "checked": True}
+
+# every node is slotted, so no per-instance __dict__. _fields names the slots a node was built from (in order), which is
+# what children() walks
 class ASTNode:
-    pass
+    __slots__ = ("line", "column")
+    _fields = ()
+
+    # only runs when a normal lookup fails, so the UNSET slots don't have to be set by every constructor
+    def __getattr__(self, name):
+        if name in UNSET:
+            return UNSET[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    # the nodes directly under this one, in field order. lists, tuples and dicts (kwargs, catches, dict literal keys and values) get flattened
+    def children(self):
+        for name in self._fields:
+            value = getattr(self, name, None)
+            if isinstance(value, ASTNode):
+                yield value
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    if isinstance(item, ASTNode):
+                        yield item
+            elif isinstance(value, dict):
+                for key, item in value.items():
+                    if isinstance(key, ASTNode):
+                        yield key
+                    if isinstance(item, ASTNode):
+                        yield item
+
+# every node under (and including) node, parents before children. uses its own stack so deep trees don't hit the recursion limit
+def walk(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(node.children())))
 
 # main program node
 class Program(ASTNode):
+    __slots__ = _fields = ("statements",)
     def __init__(self):
         self.statements = []
 
@@ -12,6 +53,7 @@ class Program(ASTNode):
 
 # import node
 class Import(ASTNode):
+    __slots__ = _fields = ("module", "alias", "frm")
     def __init__(self, module, alias, frm=None):
         self.module = module
         self.alias = alias
@@ -21,6 +63,7 @@ class Import(ASTNode):
         return f'''Import({self.module}, {self.alias}, {self.frm})'''
     
 class Imports(ASTNode):
+    __slots__ = _fields = ("modules",)
     def __init__(self, modules):
         self.modules = modules
 
@@ -30,6 +73,8 @@ class Imports(ASTNode):
 # function/method nodes
 # lines 31-67
 class Function(ASTNode):
+    _fields = ("name", "parameters", "return_type", "body")
+    __slots__ = _fields + ("locals", "binder")      # names in each frame slot (filled in by the resolver), and how calls bind to them
     def __init__(self, name, parameters, return_type, body):
         self.name = name
         self.parameters = parameters
@@ -40,6 +85,7 @@ class Function(ASTNode):
         return f'''Function({self.name}, {self.parameters}, {self.return_type}, {self.body})'''
 
 class NativeFunction(ASTNode):
+    __slots__ = _fields = ("name", "parameters", "return_type", "body")
     def __init__(self, name, parameters, return_type, body):
         self.name = name
         self.parameters = parameters
@@ -50,6 +96,8 @@ class NativeFunction(ASTNode):
         return f'''NativeFunction({self.name}, {self.parameters}, {self.return_type}, {self.body})'''
 
 class FunctionCall(ASTNode):
+    _fields = ("name", "parameters", "kwargs")
+    __slots__ = _fields + ("kind", "index")      # binding of the called name, from the resolver
     def __init__(self, name, parameters, kwargs=None):
         self.name = name
         self.parameters = parameters
@@ -59,6 +107,7 @@ class FunctionCall(ASTNode):
         return f'''FunctionCall({self.name}, {self.parameters})'''
 
 class Parameter(ASTNode):
+    __slots__ = _fields = ("param_type", "name")
     def __init__(self, param_type, name):
         self.param_type = param_type
         self.name = name
@@ -67,6 +116,8 @@ class Parameter(ASTNode):
         return f'''Parameter({self.param_type}, {self.name})'''
 
 class MethodCall(ASTNode):
+    _fields = ("parent", "name", "parameters", "kwargs")
+    __slots__ = _fields + ("cache",)
     def __init__(self, parent, name, parameters, kwargs=None):
         self.parent = parent
         self.name = name
@@ -78,6 +129,8 @@ class MethodCall(ASTNode):
 
 # declare variable node
 class VariableDeclaration(ASTNode):
+    _fields = ("var_type", "name", "value")
+    __slots__ = _fields + ("kind", "index", "checked")      # binding of the declared/assigned name, from the resolver
     def __init__(self, var_type, name, value):
         self.var_type = var_type
         self.name = name
@@ -89,6 +142,7 @@ class VariableDeclaration(ASTNode):
 # operation nodes
 # lines 80-105
 class BinaryOperation(ASTNode):
+    __slots__ = _fields = ("left", "operator", "right")
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -97,7 +151,72 @@ class BinaryOperation(ASTNode):
     def __repr__(self):
         return f'BinaryOperation({self.left}, {self.operator}, {self.right})'
 
+# every binary operator gets a node class of its own (the parser picks it), so an engine can go straight to the code for that operator
+# by the node's type. they're still BinaryOperations with the operator in them, anything that doesn't care about the difference doesn't
+# have to
+class Add(BinaryOperation):
+    __slots__ = ()
+
+class Subtract(BinaryOperation):
+    __slots__ = ()
+
+class Multiply(BinaryOperation):
+    __slots__ = ()
+
+class Divide(BinaryOperation):
+    __slots__ = ()
+
+class Power(BinaryOperation):
+    __slots__ = ()
+
+class FloorDivide(BinaryOperation):
+    __slots__ = ()
+
+class Modulus(BinaryOperation):
+    __slots__ = ()
+
+class GreaterThan(BinaryOperation):
+    __slots__ = ()
+
+class LessThan(BinaryOperation):
+    __slots__ = ()
+
+class GreaterEqual(BinaryOperation):
+    __slots__ = ()
+
+class LessEqual(BinaryOperation):
+    __slots__ = ()
+
+class Equal(BinaryOperation):
+    __slots__ = ()
+
+class NotEqual(BinaryOperation):
+    __slots__ = ()
+
+# compound assignments (x += 1), the result gets written back to the variable on the left
+class CompoundAssignment(BinaryOperation):
+    __slots__ = ()
+
+class InPlaceAdd(CompoundAssignment):
+    __slots__ = ()
+
+class InPlaceSubtract(CompoundAssignment):
+    __slots__ = ()
+
+class InPlaceMultiply(CompoundAssignment):
+    __slots__ = ()
+
+class InPlaceDivide(CompoundAssignment):
+    __slots__ = ()
+
+class InPlaceFloorDivide(CompoundAssignment):
+    __slots__ = ()
+
+BINARY_OPERATIONS = (Add, Subtract, Multiply, Divide, Power, FloorDivide, Modulus, GreaterThan, LessThan, GreaterEqual, LessEqual, Equal, NotEqual)
+COMPOUND_ASSIGNMENTS = (InPlaceAdd, InPlaceSubtract, InPlaceMultiply, InPlaceDivide, InPlaceFloorDivide)
+
 class LogicalOperation(ASTNode):
+    __slots__ = _fields = ("left", "operator", "right")
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -106,7 +225,19 @@ class LogicalOperation(ASTNode):
     def __repr__(self):
         return f'LogicalOperation({self.left}, {self.operator}, {self.right})'
 
+# value if condition else other, only the side that's picked gets evaluated
+class ConditionalExpression(ASTNode):
+    __slots__ = _fields = ("condition", "if_value", "else_value")
+    def __init__(self, condition, if_value, else_value):
+        self.condition = condition
+        self.if_value = if_value
+        self.else_value = else_value
+
+    def __repr__(self):
+        return f'ConditionalExpression({self.condition}, {self.if_value}, {self.else_value})'
+
 class UnaryOperation(ASTNode):
+    __slots__ = _fields = ("operand", "operator")
     def __init__(self, operand, operator):
         self.operand = operand
         self.operator = operator
@@ -117,6 +248,7 @@ class UnaryOperation(ASTNode):
 # control flow
 # lines 98-131
 class IfStatement(ASTNode):
+    __slots__ = _fields = ("condition", "if_body", "else_body")
     def __init__(self, condition, if_body, else_body=None):
         self.condition = condition
         self.if_body = if_body
@@ -126,6 +258,7 @@ class IfStatement(ASTNode):
         return f'IfStatement({self.condition}, {self.if_body}, {self.else_body})'
     
 class ForLoop(ASTNode):
+    __slots__ = _fields = ("initializer", "condition", "increment", "body")
     def __init__(self, initializer, condition, increment, body):
         self.initializer = initializer
         self.condition = condition
@@ -136,6 +269,7 @@ class ForLoop(ASTNode):
         return f'ForLoop({self.initializer}, {self.condition}, {self.increment}, {self.body})'
 
 class WhileLoop(ASTNode):
+    __slots__ = _fields = ("condition", "body")
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -144,6 +278,7 @@ class WhileLoop(ASTNode):
         return f'WhileLoop({self.condition}, {self.body})'
 
 class DoWhileLoop(ASTNode):
+    __slots__ = _fields = ("body", "condition")
     def __init__(self, body, condition):
         self.body = body
         self.condition = condition
@@ -154,6 +289,8 @@ class DoWhileLoop(ASTNode):
 # literals
 # lines 135-217
 class Identifier(ASTNode):
+    _fields = ("name",)
+    __slots__ = _fields + ("kind", "index")      # binding, from the resolver
     def __init__(self, name):
         self.name = name
     
@@ -161,6 +298,7 @@ class Identifier(ASTNode):
         return f'Identifier({self.name})'
     
 class StringLiteral(ASTNode):
+    __slots__ = _fields = ("value",)
     def __init__(self, value):
         self.value = value
     
@@ -168,6 +306,7 @@ class StringLiteral(ASTNode):
         return f'StringLiteral({self.value})'
 
 class BooleanLiteral(ASTNode):
+    __slots__ = _fields = ("value",)
     def __init__(self, value):
         self.value = value
     
@@ -175,6 +314,7 @@ class BooleanLiteral(ASTNode):
         return f'BooleanLiteral({self.value})'
 
 class IntLiteral(ASTNode):
+    __slots__ = _fields = ("value",)
     def __init__(self, value):
         self.value = value
     
@@ -182,6 +322,7 @@ class IntLiteral(ASTNode):
         return f'IntLiteral({self.value})'
 
 class DecLiteral(ASTNode):
+    __slots__ = _fields = ("value",)
     def __init__(self, value):
         self.value = value
     
@@ -189,6 +330,7 @@ class DecLiteral(ASTNode):
         return f'DecLiteral({self.value})'
 
 class ListLiteral(ASTNode):
+    __slots__ = _fields = ("elements",)
     def __init__(self, elements):
         self.elements = elements
     
@@ -196,6 +338,8 @@ class ListLiteral(ASTNode):
         return f'ListLiteral({self.elements})'
 
 class ArrayLiteral(ASTNode):
+    _fields = ("type", "size", "elements")
+    __slots__ = _fields + ("checked",)
     def __init__(self, typ, size, elements):
         self.type = typ
         self.size = size
@@ -205,6 +349,8 @@ class ArrayLiteral(ASTNode):
         return f'ArrayLiteral({self.size}, {self.type}, {self.elements})'
     
 class VectorLiteral(ASTNode):
+    _fields = ("type", "elements")
+    __slots__ = _fields + ("checked",)
     def __init__(self, typ, elements):
         self.type = typ
         self.elements = elements
@@ -213,6 +359,7 @@ class VectorLiteral(ASTNode):
         return f'VectorLiteral({self.type}, {self.elements})'
     
 class RangeLiteral(ASTNode):
+    __slots__ = _fields = ("start", "stop", "increment")
     def __init__(self, start, stop, increment):
         self.start = start
         self.stop = stop
@@ -222,6 +369,8 @@ class RangeLiteral(ASTNode):
         return f'RangeLiteral({self.start}, {self.stop}, {self.increment})'
 
 class ClassLiteral(ASTNode):
+    _fields = ("name", "parent", "sub", "fields", "methods", "body")
+    __slots__ = _fields + ("layout", "table")      # field slots and methods, filled in when the class definition runs
     def __init__(self, name, parent, sub, fields, methods, body):
         self.name = name
         self.parent = parent
@@ -234,6 +383,7 @@ class ClassLiteral(ASTNode):
         return f'ClassLiteral({self.parent}, {self.sub}, {self.fields}, {self.methods}, {self.body}'
 
 class DictLiteral(ASTNode):
+    __slots__ = _fields = ("elements",)
     def __init__(self, elements={}):
         self.elements = elements
     
@@ -241,14 +391,25 @@ class DictLiteral(ASTNode):
         return f'DictLiteral({self.elements})'
 
 class NoneObject(ASTNode):
+    __slots__ = _fields = ("value",)
     def __init__(self):
         self.value = "None"
     
     def __repr__(self):
         return f'NoneObject({self.value})'
 
+# a literal (or an expression made of nothing but literals) already turned into its python value by the optimizer
+class Constant(ASTNode):
+    __slots__ = _fields = ("value",)
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f'Constant({self.value})'
+
 # index related nodes
-class IndexAccess:
+class IndexAccess(ASTNode):
+    __slots__ = _fields = ("container", "index")
     def __init__(self, container, index):
         self.container = container
         self.index = index
@@ -256,7 +417,8 @@ class IndexAccess:
     def __repr__(self):
         return f"IndexAccess({repr(self.container)}, {repr(self.index)})"
     
-class IndexAssignment:
+class IndexAssignment(ASTNode):
+    __slots__ = _fields = ("container", "index", "value")
     def __init__(self, container, index, value):
         self.container = container
         self.index = index
@@ -267,6 +429,8 @@ class IndexAssignment:
 
 # instancing related nodes
 class ClassInstantiation(ASTNode):
+    _fields = ("typ", "name", "arguments", "kwargs")
+    __slots__ = _fields + ("kind", "index")      # binding of the name the instance goes in, from the resolver
     def __init__(self, typ, name, arguments, kwargs=None):
         self.typ = typ
         self.name = name
@@ -274,9 +438,11 @@ class ClassInstantiation(ASTNode):
         self.kwargs = kwargs if kwargs is not None else {}
 
     def __repr__(self):
-        return f"ClassInstantiation({self.typ}, {self.name}, {self.arguments}, {self.kwarguments})"
+        return f"ClassInstantiation({self.typ}, {self.name}, {self.arguments}, {self.kwargs})"
 
 class FieldAccess(ASTNode):
+    _fields = ("parent", "field")
+    __slots__ = _fields + ("cache",)
     def __init__(self, parent, field):
         self.parent = parent
         self.field = field
@@ -285,6 +451,8 @@ class FieldAccess(ASTNode):
         return f'FieldAccess({self.parent}, {self.field})'
 
 class FieldAssignment(ASTNode):
+    _fields = ("parent", "field", "value")
+    __slots__ = _fields + ("cache",)
     def __init__(self, parent, field, value):
         self.parent = parent
         self.field = field
@@ -295,6 +463,7 @@ class FieldAssignment(ASTNode):
 
 # return nodes
 class ReturnStatement(ASTNode):
+    __slots__ = _fields = ("values",)
     def __init__(self, values):
         self.values = values
     
@@ -303,6 +472,7 @@ class ReturnStatement(ASTNode):
 
 # try catch etc nowhere to put it
 class TryStatement(ASTNode):
+    __slots__ = _fields = ("body", "catches")
     def __init__(self, body, catches):
         self.body = body
         self.catches = catches
@@ -311,6 +481,7 @@ class TryStatement(ASTNode):
         return f'TryStatement({self.body}, {self.catches})'
 
 class CatchStatement(ASTNode):
+    __slots__ = _fields = ("condition", "body")
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -319,6 +490,7 @@ class CatchStatement(ASTNode):
         return f'CatchStatement({self.condition}, {self.body})'
     
 class RaiseStatement(ASTNode):
+    __slots__ = _fields = ("error", "message")
     def __init__(self, error, message):
         self.error = error
         self.message = message
@@ -326,24 +498,30 @@ class RaiseStatement(ASTNode):
     def __repr__(self):
         return f'RaiseStatement({self.error}, {self.message})'
     
-# return exception for catching returns (and break cases)
+# what a return at the top level raises, there's no function there to hand the value to
 class ReturnException(Exception):
     def __init__(self, value):
         self.value = value
 
-class BreakException(Exception):
-    def __init__(self, value):
-        self.value = value
-
-# eof and break
+# eof, break and continue
 class Break(ASTNode):
+    __slots__ = _fields = ("value",)
     def __init__(self):
         self.value = "break"
     
     def __repr__(self):
         return f'Break({self.value})'
 
+class Continue(ASTNode):
+    __slots__ = _fields = ("value",)
+    def __init__(self):
+        self.value = "continue"
+
+    def __repr__(self):
+        return f'Continue({self.value})'
+
 class EndOfFile(ASTNode):
+    __slots__ = _fields = ("value",)
     def __init__(self):
         self.value = "EOF"
     
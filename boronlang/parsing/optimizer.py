@@ -0,0 +1,121 @@
+# constant folding pass, runs between the parser and the interpreter. literals get turned into Constant nodes holding their ready
+# python value, and operations on nothing but constants get worked out once here instead of every time they're evaluated
+import operator
+from decimal import Decimal, Inexact, Rounded, localcontext
+
+# tokens and nodes
+from lexer.lexer import TokenType
+from parsing.astnodes import ASTNode, Constant, IntLiteral, DecLiteral, StringLiteral, BooleanLiteral, NoneObject, BinaryOperation, UnaryOperation
+from parsing.astnodes import LogicalOperation, ConditionalExpression
+
+# disable or enable the pass
+global optimizeenabled
+optimizeenabled = True
+
+# literal node -> its python value, exactly what the interpreter would have made of it
+LITERALS = {
+    IntLiteral: lambda node: int(node.value),
+    DecLiteral: lambda node: Decimal(node.value),
+    StringLiteral: lambda node: str(node.value),
+    BooleanLiteral: lambda node: node.value.lower() == "true",
+    NoneObject: lambda node: None,
+}
+
+# binary operators that can be worked out ahead of time, each one the same python operation the interpreter runs.
+# compound assignments (+=, etc.) aren't here since they write to a variable
+FOLDABLE = {
+    TokenType.ADD: operator.add,
+    TokenType.SUBTRACT: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: operator.truediv,
+    TokenType.POWER: operator.pow,
+    TokenType.FLOOR_DIVIDE: operator.floordiv,
+    TokenType.MODULUS: operator.mod,
+    TokenType.GREATER_THAN: operator.gt,
+    TokenType.LESS_THAN: operator.lt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.EQUAL: operator.eq,
+    TokenType.NOT_EQUAL: operator.ne,
+}
+
+# same limits cpython's own folder uses, so 2 ** 100000 or "x" * 10 ** 9 don't get baked into the tree
+MAX_INT_BITS = 128
+MAX_STR_SIZE = 4096
+
+# the entry point, folds the whole program (in place, and hands it back)
+def optimize(program):
+    if not optimizeenabled:
+        return program
+    return fold(program)
+
+# folds everything under node first, then node itself. returns whatever should take node's place
+def fold(node):
+    literal = LITERALS.get(type(node))
+    if literal is not None:
+        return constant(literal(node), node)
+
+    for name in node._fields:
+        value = getattr(node, name, None)
+        if isinstance(value, ASTNode):
+            setattr(node, name, fold(value))
+        elif isinstance(value, list):
+            setattr(node, name, [fold(item) if isinstance(item, ASTNode) else item for item in value])
+        elif isinstance(value, dict):
+            # dict literals have nodes for keys too
+            setattr(node, name, {
+                (fold(key) if isinstance(key, ASTNode) else key): (fold(item) if isinstance(item, ASTNode) else item)
+                for key, item in value.items()
+            })
+
+    if isinstance(node, BinaryOperation):
+        return fold_binary(node)
+    if type(node) is LogicalOperation and isinstance(node.left, Constant):
+        return fold_logical(node)
+    if type(node) is ConditionalExpression and isinstance(node.condition, Constant):
+        return node.if_value if node.condition.value else node.else_value
+    if type(node) is UnaryOperation and node.operator is TokenType.NOT and isinstance(node.operand, Constant):
+        return constant(not node.operand.value, node)
+    return node
+
+# a constant left side is the answer when it settles things on its own (false and ..., true or ...), otherwise the right side is
+def fold_logical(node):
+    left = node.left.value
+    settled = not left if node.operator is TokenType.AND else bool(left)
+    return node.left if settled else node.right
+
+def fold_binary(node):
+    function = FOLDABLE.get(node.operator)
+    left, right = node.left, node.right
+    if function is None or not isinstance(left, Constant) or not isinstance(right, Constant):
+        return node
+    if too_big(node.operator, left.value, right.value):
+        return node
+
+    # anything that fails (1 / 0, "a" - 1, ...) stays as it is so it fails when the program runs, same as before.
+    # decimal results that would need rounding are left alone too, so they get rounded by whatever context is live at runtime
+    try:
+        with localcontext() as context:
+            context.traps[Inexact] = True
+            context.traps[Rounded] = True
+            value = function(left.value, right.value)
+    except (ArithmeticError, TypeError, ValueError):
+        return node
+    return constant(value, node)
+
+# whether folding would build something huge
+def too_big(operator, left, right):
+    if operator is TokenType.POWER and isinstance(left, int) and isinstance(right, int) and right > 0:
+        return left.bit_length() * right > MAX_INT_BITS
+    if operator is TokenType.MULTIPLY:
+        if isinstance(left, str) and isinstance(right, int):
+            return len(left) * right > MAX_STR_SIZE
+        if isinstance(right, str) and isinstance(left, int):
+            return len(right) * left > MAX_STR_SIZE
+    return False
+
+# a Constant sitting where node was
+def constant(value, node):
+    folded = Constant(value)
+    folded.line, folded.column = node.line, node.column
+    return folded
@@ -1,14 +1,16 @@
 # importing everything individually because i wanna know if its all used
 # lexer import
-from lexer.lexer import Token, TokenType
+from lexer.lexer import Token, TokenType, TokenStream
 # important nodes
 from parsing.astnodes import Program, Import, Imports, EndOfFile
 # class and function nodes
 from parsing.astnodes import Function, NativeFunction, FunctionCall, MethodCall, Parameter, ReturnStatement, FieldAccess, FieldAssignment, ClassInstantiation
 # operation nodes
-from parsing.astnodes import BinaryOperation, LogicalOperation, UnaryOperation, IndexAccess, IndexAssignment
+from parsing.astnodes import BinaryOperation, LogicalOperation, ConditionalExpression, UnaryOperation, IndexAccess, IndexAssignment
+from parsing.astnodes import Add, Subtract, Multiply, Divide, Power, FloorDivide, Modulus, GreaterThan, LessThan, GreaterEqual, LessEqual, Equal, NotEqual
+from parsing.astnodes import InPlaceAdd, InPlaceSubtract, InPlaceMultiply, InPlaceDivide, InPlaceFloorDivide
 # control flow nodes
-from parsing.astnodes import IfStatement, ForLoop, WhileLoop, DoWhileLoop, Break, TryStatement, CatchStatement, RaiseStatement
+from parsing.astnodes import IfStatement, ForLoop, WhileLoop, DoWhileLoop, Break, Continue, TryStatement, CatchStatement, RaiseStatement
 # variable nodes
 from parsing.astnodes import VariableDeclaration, Identifier, StringLiteral, BooleanLiteral, IntLiteral, DecLiteral, ListLiteral, ArrayLiteral, RangeLiteral, ClassLiteral, VectorLiteral, DictLiteral, NoneObject
 # scope
@@ -18,26 +20,138 @@ from parsing.scope import Scope
 global reprenabled 
 reprenabled = False
 
+# precedence and associativity of every binary operator, higher binds tighter. ** is the only right associative one (2 ** 3 ** 2 is 2 ** 9)
+PRECEDENCE = {
+    TokenType.OR: (2, "left"),
+    TokenType.AND: (3, "left"),
+    TokenType.EQUAL: (5, "left"),
+    TokenType.NOT_EQUAL: (5, "left"),
+    TokenType.GREATER_THAN: (5, "left"),
+    TokenType.LESS_THAN: (5, "left"),
+    TokenType.GREATER_EQUAL: (5, "left"),
+    TokenType.LESS_EQUAL: (5, "left"),
+    TokenType.ADD: (10, "left"),
+    TokenType.SUBTRACT: (10, "left"),
+    TokenType.MULTIPLY: (20, "left"),
+    TokenType.DIVIDE: (20, "left"),
+    TokenType.FLOOR_DIVIDE: (20, "left"),
+    TokenType.MODULUS: (20, "left"),
+    TokenType.POWER: (30, "right"),
+}
+
+# what the pratt loop actually reads: (left binding power, right binding power) per operator. a left associative operator parses its
+# right side one notch tighter so an equal operator after it stops and folds left, a right associative one doesn't
+BINDING_POWER = {
+    operator: (precedence, precedence + 1 if associativity == "left" else precedence)
+    for operator, (precedence, associativity) in PRECEDENCE.items()
+}
+
+# prefix operators (not) bind tighter than any binary operator
+PREFIX_POWER = 40
+
+# a if c else b binds looser than everything, its condition can hold an or and its else side can be another conditional
+CONDITIONAL_POWER = 1
+
+# the node each operator gets built as. and/or only evaluate their right side when the left one doesn't settle it
+OPERATION_NODES = {
+    TokenType.OR: LogicalOperation,
+    TokenType.AND: LogicalOperation,
+    TokenType.EQUAL: Equal,
+    TokenType.NOT_EQUAL: NotEqual,
+    TokenType.GREATER_THAN: GreaterThan,
+    TokenType.LESS_THAN: LessThan,
+    TokenType.GREATER_EQUAL: GreaterEqual,
+    TokenType.LESS_EQUAL: LessEqual,
+    TokenType.ADD: Add,
+    TokenType.SUBTRACT: Subtract,
+    TokenType.MULTIPLY: Multiply,
+    TokenType.DIVIDE: Divide,
+    TokenType.FLOOR_DIVIDE: FloorDivide,
+    TokenType.MODULUS: Modulus,
+    TokenType.POWER: Power,
+}
+
+# same for compound assignments, **= doesn't have one (nothing runs it) and stays a plain BinaryOperation
+COMPOUND_NODES = {
+    TokenType.INCREASE: InPlaceAdd,
+    TokenType.DECREASE: InPlaceSubtract,
+    TokenType.MULTEQ: InPlaceMultiply,
+    TokenType.DIVEQ: InPlaceDivide,
+    TokenType.FLOOREQ: InPlaceFloorDivide,
+}
+
 # the actual parser, also the guts of this shit
 class Parser:
-    # initialize it with the tokens from the lexer, start the position at 0, and the line at 1
-    # also initialize the scope
+    # initialize it with the tokens from the lexer (a list or Lexer.stream, both go through a lookahead buffer),
+    # start the position at 0, and the line at 1. also initialize the scope
     def __init__(self, tokens):
-        self.tokens = tokens
+        self.tokens = TokenStream(tokens)
         self.pos = 0
         self.line = 1
         self.scope = Scope()
+        # loops around what's being parsed (in the function it's in), break and continue need at least one
+        self.loops = 0
 
-    # gets the current token from the list of tokens
+        # big boy table that maps every statement to its function, built once instead of per statement
+        self.dispatch_table = {
+            TokenType.IMPORT: self.parse_import,
+            TokenType.INTEGER: self.parse_variable_declaration,
+            TokenType.BOOLEAN: self.parse_variable_declaration,
+            TokenType.STR: self.parse_variable_declaration,
+            TokenType.TUPLE: self.parse_variable_declaration,
+            TokenType.LIST: self.parse_variable_declaration,
+            TokenType.SET: self.parse_variable_declaration,
+            TokenType.DEC: self.parse_variable_declaration,
+            TokenType.AUTO: self.parse_variable_declaration,
+            TokenType.RANGE: self.parse_range_declaration,
+            TokenType.ARRAY: self.parse_array_declaration,
+            TokenType.VECTOR: self.parse_vector_declaration,
+            TokenType.DICT: self.parse_dictionary_declaration,
+            TokenType.CLASS: self.parse_class_declaration,
+            TokenType.GLOBAL: self.parse_global_declaration,
+            TokenType.IDENTIFIER: self.parse_identifier,
+            TokenType.FUNCTION: self.parse_function,
+            TokenType.IF: self.parse_if_statement,
+            TokenType.FOR: self.parse_for_loop,
+            TokenType.WHILE: self.parse_while_loop,
+            TokenType.DO: self.parse_do_while_loop,
+            TokenType.RETURN: self.parse_return_statement,
+            TokenType.NATIVE: self.parse_native_function,
+            TokenType.TRY: self.parse_try_statement,
+            TokenType.RAISE: self.parse_raise_statement,
+            TokenType.CATCH: self.parse_catch_statement,
+            TokenType.BREAK: lambda: self.parse_loop_control(Break),
+            TokenType.CONTINUE: lambda: self.parse_loop_control(Continue),
+            TokenType.EOF: lambda: EndOfFile()
+        }
+
+        # what can start an expression. every binary operator builds the same node, so the infix side is just BINDING_POWER
+        self.prefix_table = {
+            TokenType.NUMBER: self.parse_number,
+            TokenType.DECIMAL: self.parse_decimal,
+            TokenType.STRING: self.parse_string,
+            TokenType.TRUE: self.parse_boolean,
+            TokenType.FALSE: self.parse_boolean,
+            TokenType.IDENTIFIER: self.parse_identifier,
+            TokenType.LEFT_BRACKET: self.parse_list_literal,
+            TokenType.NOT: self.parse_not,
+            TokenType.LEFT_PAREN: self.parse_group,
+            TokenType.UNTERMINATED_STRING: self.parse_unterminated_string,
+            TokenType.NONE: self.parse_none,
+        }
+
+    # gets the current token
     def current_token(self):
-        return self.tokens[self.pos]
+        return self.tokens.current
+
+    # gets the current token's type
+    def current_type(self):
+        return self.tokens.kind()
 
-    # gets next token
+    # moves on to the next token
     def next_token(self):
         self.pos += 1
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-        return None
+        self.tokens.advance()
 
     # expects a specific token and if not throws a syntax error
     def expect(self, token_type):
@@ -47,100 +161,96 @@ class Parser:
         self.next_token()
         return token
     
+    # same as expect but doesn't hand the token back
+    def consume(self, token_type):
+        if self.current_type() != token_type:
+            token = self.current_token()
+            raise SyntaxError(f"Expected {token_type}, but found {token.type}. Specific token afflicted: {token}")
+        self.next_token()
+
     # peeks at the offset value index, gets token without consuming it
     def peek(self, offset=1):
-        if self.pos + offset < len(self.tokens):
-            return self.tokens[self.pos + offset]
-        return None
+        return self.tokens.peek(offset)
+
+    # peeks at just the type of the token offset places ahead, none past the end
+    def peek_type(self, offset=1):
+        return self.tokens.peek_type(offset)
     
     # passes all tokens until not eol
     def skipeols(self):
-        while self.current_token().type == TokenType.EOL:
+        while self.current_type() == TokenType.EOL:
             self.next_token()
 
     # the actual function that parses, recursively feeds tokens thru parse_statement
     def parse(self):
         if reprenabled == True: print("REPR: ")
         program = Program()
-        while self.current_token().type != TokenType.EOF:
+        program.line, program.column = 1, 1
+        while self.current_type() != TokenType.EOF:
             program.statements.append(self.parse_statement())
         if reprenabled == True: print()
         return program
 
     # the function that gets fed through a million times, maps everything to a dispatch (passing eols), and if not raises a syntax error
     def parse_statement(self):
-        token = self.current_token()
-        while token.type == TokenType.EOL:
+        while self.current_type() == TokenType.EOL:
             self.line += 1
-            token = self.next_token()
-
-        # big boy table that maps everything to each function
-        dispatch_table = {
-            TokenType.IMPORT: self.parse_import,
-            TokenType.INTEGER: self.parse_variable_declaration,
-            TokenType.BOOLEAN: self.parse_variable_declaration,
-            TokenType.STR: self.parse_variable_declaration,
-            TokenType.TUPLE: self.parse_variable_declaration,
-            TokenType.LIST: self.parse_variable_declaration,
-            TokenType.SET: self.parse_variable_declaration,
-            TokenType.DEC: self.parse_variable_declaration,
-            TokenType.AUTO: self.parse_variable_declaration,
-            TokenType.RANGE: self.parse_range_declaration,
-            TokenType.ARRAY: self.parse_array_declaration,
-            TokenType.VECTOR: self.parse_vector_declaration,
-            TokenType.DICT: self.parse_dictionary_declaration,
-            TokenType.CLASS: self.parse_class_declaration,
-            TokenType.GLOBAL: self.parse_global_declaration,
-            TokenType.IDENTIFIER: self.parse_identifier,
-            TokenType.FUNCTION: self.parse_function,
-            TokenType.IF: self.parse_if_statement,
-            TokenType.FOR: self.parse_for_loop,
-            TokenType.WHILE: self.parse_while_loop,
-            TokenType.DO: self.parse_do_while_loop,
-            TokenType.RETURN: self.parse_return_statement,
-            TokenType.NATIVE: self.parse_native_function,
-            TokenType.TRY: self.parse_try_statement,
-            TokenType.RAISE: self.parse_raise_statement,
-            TokenType.CATCH: self.parse_catch_statement,
-            TokenType.BREAK: lambda: Break(),
-            TokenType.EOF: lambda: EndOfFile()
-        }
-
-        if token.type in dispatch_table:
-            return dispatch_table[token.type]()
-        else:
-            raise SyntaxError(f"Unexpected token {token.type}")
+            self.next_token()
+        token_type = self.current_type()
+
+        handler = self.dispatch_table.get(token_type)
+        if handler is None:
+            raise SyntaxError(f"Unexpected token {token_type}")
+        line, column = self.tokens.position()
+        node = handler()
+        if node is not None:
+            node.line, node.column = line, column
+        return node
   
     
-    # parses blocks correctly, will in fact be using
-    def parse_block(self):
+    # parses blocks correctly, will in fact be using. loops is how many loops the block is inside of, when that changes
+    def parse_block(self, loops=None):
+        if loops is not None:
+            outer, self.loops = self.loops, loops
+            try:
+                return self.parse_block()
+            finally:
+                self.loops = outer
         self.skipeols()
-        self.expect(TokenType.LEFT_BRACE)
+        self.consume(TokenType.LEFT_BRACE)
         statements = []
         self.skipeols()
 
-        while self.current_token().type != TokenType.RIGHT_BRACE:
+        while self.current_type() != TokenType.RIGHT_BRACE:
             self.skipeols()
-            if self.current_token().type == TokenType.RIGHT_BRACE:
+            if self.current_type() == TokenType.RIGHT_BRACE:
                 break
             statements.append(self.parse_statement())
             
-        self.expect(TokenType.RIGHT_BRACE)
+        self.consume(TokenType.RIGHT_BRACE)
         return statements
 
+    # break and continue, only inside a loop
+    def parse_loop_control(self, node_type):
+        keyword = self.current_token().value
+        if not self.loops:
+            raise SyntaxError(f"'{keyword}' outside of a loop")
+        self.next_token()
+        return node_type()
+
     # you guessed it, parses variable declarations
     def parse_variable_declaration(self):
-        type_token = self.expect(self.current_token().type)
+        type_token = self.expect(self.current_type())
         var_type = type_token.type
         if not isinstance(type_token.value, Token) or type_token.value.type != TokenType.IDENTIFIER:
             raise SyntaxError(f"Expected an identifier after type declaration, but found {type_token.value}")
         
         name = type_token.value.value
-        if self.current_token().type in [TokenType.EOL, TokenType.SEMICOLON]:
+        if self.current_type() in [TokenType.EOL, TokenType.SEMICOLON]:
             value = None
             self.next_token()
         else: 
-            self.expect(TokenType.ASSIGN)
+            self.consume(TokenType.ASSIGN)
             value = self.parse_expression()
 
         if self.scope.is_declared(name):
@@ -161,13 +271,13 @@ class Parser:
 
         self.next_token()
         self.next_token()
-        self.expect(TokenType.LEFT_PAREN)
+        self.consume(TokenType.LEFT_PAREN)
         start = self.expect(TokenType.NUMBER).value
-        self.expect(TokenType.COMMA)
+        self.consume(TokenType.COMMA)
         stop = self.expect(TokenType.NUMBER).value
-        self.expect(TokenType.COMMA)
+        self.consume(TokenType.COMMA)
         increment = self.expect(TokenType.NUMBER).value
-        self.expect(TokenType.RIGHT_PAREN)
+        self.consume(TokenType.RIGHT_PAREN)
         self.scope.declare_variable(name, TokenType.RANGE)
 
         if reprenabled == True: print(repr(VariableDeclaration(TokenType.RANGE, name, RangeLiteral(IntLiteral(start), IntLiteral(stop), IntLiteral(increment)))))
@@ -182,22 +292,22 @@ class Parser:
             raise SyntaxError(f"Variable '{name}' already declared in this scope.")
 
         self.scope.declare_variable(name, TokenType.ARRAY)
-        arraytype = self.current_token().type
+        arraytype = self.current_type()
         self.next_token()
-        self.expect(TokenType.LEFT_BRACKET)
-        typ = self.expect(self.current_token().type).type
-        self.expect(TokenType.RIGHT_BRACKET)
-        self.expect(TokenType.LEFT_BRACKET)
+        self.consume(TokenType.LEFT_BRACKET)
+        typ = self.expect(self.current_type()).type
+        self.consume(TokenType.RIGHT_BRACKET)
+        self.consume(TokenType.LEFT_BRACKET)
         size = self.expect(TokenType.NUMBER).value
-        self.expect(TokenType.RIGHT_BRACKET)
-        self.expect(TokenType.ASSIGN)
-        self.expect(TokenType.LEFT_BRACKET)
-        while self.current_token().type != TokenType.RIGHT_BRACKET:
+        self.consume(TokenType.RIGHT_BRACKET)
+        self.consume(TokenType.ASSIGN)
+        self.consume(TokenType.LEFT_BRACKET)
+        while self.current_type() != TokenType.RIGHT_BRACKET:
             elements.append(self.parse_expression())
-            if self.current_token().type == TokenType.COMMA:
+            if self.current_type() == TokenType.COMMA:
                 self.next_token()
 
-        self.expect(TokenType.RIGHT_BRACKET)
+        self.consume(TokenType.RIGHT_BRACKET)
         if reprenabled == True: print(repr(VariableDeclaration(arraytype, Identifier(name), ArrayLiteral(typ, size, elements))))
         return VariableDeclaration(arraytype, Identifier(name), ArrayLiteral(typ, size, elements))
     
@@ -210,19 +320,19 @@ class Parser:
             raise SyntaxError(f"Variable '{name}' already declared in this scope.")
 
         self.scope.declare_variable(name, TokenType.VECTOR)
-        arraytype = self.current_token().type
+        arraytype = self.current_type()
         self.next_token()
-        self.expect(TokenType.LEFT_BRACKET)
-        typ = self.expect(self.current_token().type).type
-        self.expect(TokenType.RIGHT_BRACKET)
-        self.expect(TokenType.ASSIGN)
-        self.expect(TokenType.LEFT_BRACKET)
-        while self.current_token().type != TokenType.RIGHT_BRACKET:
+        self.consume(TokenType.LEFT_BRACKET)
+        typ = self.expect(self.current_type()).type
+        self.consume(TokenType.RIGHT_BRACKET)
+        self.consume(TokenType.ASSIGN)
+        self.consume(TokenType.LEFT_BRACKET)
+        while self.current_type() != TokenType.RIGHT_BRACKET:
             elements.append(self.parse_expression())
-            if self.current_token().type == TokenType.COMMA:
+            if self.current_type() == TokenType.COMMA:
                 self.next_token()
 
-        self.expect(TokenType.RIGHT_BRACKET)
+        self.consume(TokenType.RIGHT_BRACKET)
         if reprenabled == True: print(repr(VariableDeclaration(arraytype, Identifier(name), VectorLiteral(typ, elements))))
         return VariableDeclaration(arraytype, Identifier(name), VectorLiteral(typ, elements))
         
@@ -232,57 +342,58 @@ class Parser:
         cur = self.current_token()
         name = cur.value
         
-        next_token = self.peek()
+        next_type = self.peek_type()
         
-        if next_token:
-            if next_token.type in {
+        if next_type:
+            if next_type in {
                 TokenType.INCREASE, TokenType.DECREASE, TokenType.MULTEQ,
                 TokenType.DIVEQ, TokenType.POWEQ, TokenType.FLOOREQ,
             }:
                 # compound assignments (ex. +=, -=, /=, **=, //=)
                 self.next_token()
-                operator = next_token.type
+                operator = next_type
                 self.next_token()
                 new_value = self.parse_expression()
+                node_type = COMPOUND_NODES.get(operator, BinaryOperation)
                 if isinstance(new_value, Identifier):
-                    if reprenabled == True: print(repr(BinaryOperation(name, operator, Identifier(new_value))))
-                    return BinaryOperation(name, operator, Identifier(new_value))
+                    if reprenabled == True: print(repr(node_type(name, operator, Identifier(new_value))))
+                    return node_type(name, operator, Identifier(new_value))
 
-                if reprenabled == True: print(repr(BinaryOperation(Identifier(name), operator, new_value)))
-                return BinaryOperation(Identifier(name), operator, new_value)
+                if reprenabled == True: print(repr(node_type(Identifier(name), operator, new_value)))
+                return node_type(Identifier(name), operator, new_value)
             
             # array/list/vector accesses
-            elif next_token.type == TokenType.LEFT_BRACKET:
+            elif next_type == TokenType.LEFT_BRACKET:
                 self.next_token()
                 self.next_token()
                 index_expr = self.parse_expression()
-                self.expect(TokenType.RIGHT_BRACKET)
+                self.consume(TokenType.RIGHT_BRACKET)
 
                 # also check for assignments
-                if self.current_token().type == TokenType.ASSIGN:
+                if self.current_type() == TokenType.ASSIGN:
                     self.next_token()
                     assignment_value = self.parse_expression()
                     return IndexAssignment(Identifier(name), index_expr, assignment_value)
                 
-                elif self.current_token().type == TokenType.PERIOD:
+                elif self.current_type() == TokenType.PERIOD:
                     self.next_token()
                     property_or_method = self.current_token().value
                     self.next_token()
-                    if self.current_token().type == TokenType.LEFT_PAREN:
+                    if self.current_type() == TokenType.LEFT_PAREN:
                         return MethodCall(IndexAccess(Identifier(name), index_expr), property_or_method, [])
                     else:
                         raise SyntaxError(f"Expected '(' after method name '{property_or_method}'")
 
                 return IndexAccess(Identifier(name), index_expr)
             
-            elif next_token.type in [TokenType.INCREMENT, TokenType.DECREMENT]:
+            elif next_type in [TokenType.INCREMENT, TokenType.DECREMENT]:
                 self.next_token()
-                operator = next_token.type
+                operator = next_type
                 self.next_token()
                 if reprenabled == True: print(repr(UnaryOperation(Identifier(name), operator)))
                 return UnaryOperation(Identifier(name), operator)
             
-            elif next_token.type == TokenType.ASSIGN:
+            elif next_type == TokenType.ASSIGN:
                 self.next_token()  # consume the ASSIGN token
                 self.next_token()
 
@@ -295,7 +406,7 @@ class Parser:
                 if reprenabled == True: print(repr(VariableDeclaration(var_type, Identifier(name), right)))
                 return VariableDeclaration(var_type, Identifier(name), right)
             
-            elif next_token.type == TokenType.PERIOD:
+            elif next_type == TokenType.PERIOD:
                 # Instead of using the raw token, wrap it as an Identifier
                 parent = Identifier(self.current_token().value)
                 self.next_token()  # Consume the token for the parent
@@ -303,32 +414,31 @@ class Parser:
                 property_or_method = self.current_token().value
                 self.next_token()  # Consume the method/field name
 
-                if self.current_token().type == TokenType.LEFT_PAREN:
-                    self.expect(TokenType.LEFT_PAREN)
+                if self.current_type() == TokenType.LEFT_PAREN:
+                    self.consume(TokenType.LEFT_PAREN)
                     arguments = []
                     kwargs = {}
-                    while self.current_token().type != TokenType.RIGHT_PAREN:
+                    while self.current_type() != TokenType.RIGHT_PAREN:
                         # If an identifier is followed by an ASSIGN, treat it as a keyword argument.
-                        if self.current_token().type == TokenType.IDENTIFIER:
-                            next_token = self.peek()
-                            if next_token and next_token.type == TokenType.ASSIGN:
+                        if self.current_type() == TokenType.IDENTIFIER:
+                            if self.peek_type() == TokenType.ASSIGN:
                                 key = self.current_token().value
                                 self.next_token()  # consume the identifier
-                                self.expect(TokenType.ASSIGN)  # consume the '='
+                                self.consume(TokenType.ASSIGN)  # consume the '='
                                 value = self.parse_expression()
                                 kwargs[key] = value
                             else:
                                 arguments.append(self.parse_expression())
                         else:
                             arguments.append(self.parse_expression())
-                        if self.current_token().type == TokenType.COMMA:
+                        if self.current_type() == TokenType.COMMA:
                             self.next_token()
-                    self.expect(TokenType.RIGHT_PAREN)
+                    self.consume(TokenType.RIGHT_PAREN)
                     if reprenabled == True: 
                         print(repr(MethodCall(parent, property_or_method, arguments, kwargs)))
                     return MethodCall(parent, property_or_method, arguments, kwargs)
 
-                elif self.current_token().type == TokenType.ASSIGN:
+                elif self.current_type() == TokenType.ASSIGN:
                     self.next_token()
                     value = self.parse_expression()
                     if reprenabled == True: print(repr(FieldAssignment(parent, property_or_method, value)))
@@ -338,28 +448,27 @@ class Parser:
                     if reprenabled == True: print(repr(FieldAccess(parent, property_or_method)))
                     return FieldAccess(parent, property_or_method)
 
-            elif next_token.type == TokenType.IDENTIFIER:
+            elif next_type == TokenType.IDENTIFIER:
                 typ = self.expect(TokenType.IDENTIFIER)
                 name = self.expect(TokenType.IDENTIFIER)
-                self.expect(TokenType.ASSIGN)
+                self.consume(TokenType.ASSIGN)
 
                 # check if the instantiation uses the 'new' keyword.
-                if self.current_token().type == TokenType.NEW:
-                    self.expect(TokenType.NEW)
-                    self.expect(TokenType.IDENTIFIER)  # expect the class identifier after NEW
+                if self.current_type() == TokenType.NEW:
+                    self.consume(TokenType.NEW)
+                    self.consume(TokenType.IDENTIFIER)  # expect the class identifier after NEW
                     
-                    if self.current_token().type == TokenType.LEFT_PAREN:
+                    if self.current_type() == TokenType.LEFT_PAREN:
                         arguments = []
                         kwargs = {}
-                        self.expect(TokenType.LEFT_PAREN)
+                        self.consume(TokenType.LEFT_PAREN)
 
-                        while self.current_token().type != TokenType.RIGHT_PAREN:
-                            if self.current_token().type == TokenType.IDENTIFIER:
-                                next_token = self.peek()
-                                if next_token and next_token.type == TokenType.ASSIGN:
+                        while self.current_type() != TokenType.RIGHT_PAREN:
+                            if self.current_type() == TokenType.IDENTIFIER:
+                                if self.peek_type() == TokenType.ASSIGN:
                                     key = self.current_token().value
                                     self.next_token()
-                                    self.expect(TokenType.ASSIGN)
+                                    self.consume(TokenType.ASSIGN)
                                     value = self.parse_expression()
                                     kwargs[key] = value
                                 else:
@@ -367,21 +476,21 @@ class Parser:
                             else:
                                 arguments.append(self.parse_expression())
 
-                            if self.current_token().type == TokenType.COMMA:
+                            if self.current_type() == TokenType.COMMA:
                                 self.next_token()
                                 
-                        self.expect(TokenType.RIGHT_PAREN)
+                        self.consume(TokenType.RIGHT_PAREN)
                     return ClassInstantiation(typ, name, arguments, kwargs)
                 else:
                     # instead of using new, parse the expression normally (e.g., pattern.findall(...))
                     expr = self.parse_expression()
                     return ClassInstantiation(typ, name, [expr], {})
 
-            elif next_token.type == TokenType.LEFT_PAREN:
+            elif next_type == TokenType.LEFT_PAREN:
                 self.next_token()
                 return self.parse_function_call(name)
             
-            elif next_token.type == TokenType.LEFT_BRACKET:
+            elif next_type == TokenType.LEFT_BRACKET:
                 self.next_token()
                 # why is this here
       
@@ -392,18 +501,17 @@ class Parser:
     
 
     def parse_function_call(self, name):
-        self.expect(TokenType.LEFT_PAREN)
+        self.consume(TokenType.LEFT_PAREN)
         arguments = []
         kwargs = {}
         # Parse each argument until we reach the closing parenthesis
-        while self.current_token().type != TokenType.RIGHT_PAREN:
+        while self.current_type() != TokenType.RIGHT_PAREN:
             # Check if the argument is a keyword argument (identifier followed by ASSIGN)
-            if self.current_token().type == TokenType.IDENTIFIER:
-                next_token = self.peek()
-                if next_token and next_token.type == TokenType.ASSIGN:
+            if self.current_type() == TokenType.IDENTIFIER:
+                if self.peek_type() == TokenType.ASSIGN:
                     key = self.current_token().value  # the keyword name
                     self.next_token()  # consume the identifier
-                    self.expect(TokenType.ASSIGN)  # consume the '='
+                    self.consume(TokenType.ASSIGN)  # consume the '='
                     value = self.parse_expression()
                     kwargs[key] = value
                 else:
@@ -412,10 +520,10 @@ class Parser:
             else:
                 arguments.append(self.parse_expression())
             
-            if self.current_token().type == TokenType.COMMA:
+            if self.current_type() == TokenType.COMMA:
                 self.next_token()
                 
-        self.expect(TokenType.RIGHT_PAREN)
+        self.consume(TokenType.RIGHT_PAREN)
         return FunctionCall(name, arguments, kwargs)
 
 
@@ -423,11 +531,11 @@ class Parser:
         import_token = self.expect(TokenType.IMPORT)  # Expect IMPORT keyword
         imports = []
 
-        if self.current_token().type == TokenType.LEFT_BRACE:
+        if self.current_type() == TokenType.LEFT_BRACE:
             self.next_token()  # Consume `{`
 
-            while self.current_token().type != TokenType.RIGHT_BRACE:
-                if self.current_token().type != TokenType.IDENTIFIER:
+            while self.current_type() != TokenType.RIGHT_BRACE:
+                if self.current_type() != TokenType.IDENTIFIER:
                     raise SyntaxError(f"Invalid import statement: Expected an identifier, found {self.current_token()}")
 
                 module_name = self.current_token().value
@@ -435,7 +543,7 @@ class Parser:
 
                 self.next_token()  # Move to next token
 
-                if self.current_token().type == TokenType.AS:
+                if self.current_type() == TokenType.AS:
                     if self.current_token().value.type != TokenType.IDENTIFIER:
                         raise SyntaxError(f"Invalid alias: Expected an identifier after 'as', found {self.current_token()}")
 
@@ -444,10 +552,10 @@ class Parser:
 
                 imports.append(Import(module_name, alias))  # Store Import object
 
-                if self.current_token().type == TokenType.COMMA:
+                if self.current_type() == TokenType.COMMA:
                     self.next_token()  # Consume `,` and move to the next identifier
 
-            self.expect(TokenType.RIGHT_BRACE)  # Expect closing `}`
+            self.consume(TokenType.RIGHT_BRACE)  # Expect closing `}`
 
             # Declare all imports
             for imp in imports:
@@ -460,15 +568,15 @@ class Parser:
 
             return Imports(imports)  # Return list of Import nodes
         
-        elif self.current_token().type == TokenType.PERIOD:
+        elif self.current_type() == TokenType.PERIOD:
             self.next_token()
-            if self.current_token().type != TokenType.IDENTIFIER:
+            if self.current_type() != TokenType.IDENTIFIER:
                 raise SyntaxError(f"Invalid import statement: Expected an identifier after '.', found {self.current_token()}")
             
             class_name = self.current_token().value
             alias = class_name
 
-            if self.current_token().type == TokenType.AS:
+            if self.current_type() == TokenType.AS:
                 if self.current_token().value.type != TokenType.IDENTIFIER:
                     raise SyntaxError(f"Invalid alias: Expected an identifier after 'as', found {self.current_token()}")
 
@@ -482,7 +590,7 @@ class Parser:
             raise SyntaxError(f"Invalid import statement: Expected an identifier, found {import_token.value}")
 
         alias = import_token.value.value
-        if self.current_token().type == TokenType.AS:
+        if self.current_type() == TokenType.AS:
             if self.current_token().value.type != TokenType.IDENTIFIER:
                 raise SyntaxError(f"Invalid alias: Expected an identifier, found {self.current_token()}")
             alias = self.current_token().value.value
@@ -505,23 +613,23 @@ class Parser:
             raise SyntaxError(f"Variable '{name}' already declared in this scope.")
         
         self.scope.declare_variable(name, TokenType.DICT)
-        self.expect(TokenType.ASSIGN)
-        self.expect(TokenType.LEFT_BRACE)
+        self.consume(TokenType.ASSIGN)
+        self.consume(TokenType.LEFT_BRACE)
         elements = {}
         
-        while self.current_token().type != TokenType.RIGHT_BRACE:
-            if self.current_token().type == TokenType.EOL:
+        while self.current_type() != TokenType.RIGHT_BRACE:
+            if self.current_type() == TokenType.EOL:
                 self.next_token()
-            if self.current_token().type in [TokenType.NUMBER, TokenType.STRING]:
+            if self.current_type() in [TokenType.NUMBER, TokenType.STRING]:
                 key = self.parse_expression()
-                self.expect(TokenType.COLON)
+                self.consume(TokenType.COLON)
                 value = self.parse_expression()
                 elements[key] = value
 
-            if self.current_token().type == TokenType.COMMA:
+            if self.current_type() == TokenType.COMMA:
                 self.next_token()
 
-        self.expect(TokenType.RIGHT_BRACE)
+        self.consume(TokenType.RIGHT_BRACE)
         if reprenabled == True: print(repr(VariableDeclaration(TokenType.DICT, name, DictLiteral(elements))))
         return VariableDeclaration(TokenType.DICT, name, DictLiteral(elements))
 
@@ -538,31 +646,32 @@ class Parser:
         self.next_token()
 
         # check if next token is an extends token, and get the class inside that
-        if self.current_token().type == TokenType.EXTENDS:
+        if self.current_type() == TokenType.EXTENDS:
             extends.append(self.current_token().value)
             self.next_token()
 
         # expect opening brace
-        self.expect(TokenType.LEFT_BRACE)
+        self.consume(TokenType.LEFT_BRACE)
         
-        # enter a new scope for the class body.
+        # enter a new scope for the class body, which isn't inside any loop the class is
         self.scope.enter_scope()
+        outer_loops, self.loops = self.loops, 0
         
         # process class body until we hit RIGHT_BRACE.
-        while self.current_token().type != TokenType.RIGHT_BRACE:
+        while self.current_type() != TokenType.RIGHT_BRACE:
             self.skipeols()
-            if self.current_token().type == TokenType.RIGHT_BRACE:
+            if self.current_type() == TokenType.RIGHT_BRACE:
                 break
 
             # parse class members: fields, methods, inner classes, or statements.
-            if self.current_token().type in [TokenType.INTEGER, TokenType.BOOLEAN, TokenType.STR, 
+            if self.current_type() in [TokenType.INTEGER, TokenType.BOOLEAN, TokenType.STR, 
                                             TokenType.LIST, TokenType.VECTOR, TokenType.SET, TokenType.TUPLE]:
                 fields.append(self.parse_variable_declaration())
 
-            elif self.current_token().type == TokenType.FUNCTION:
+            elif self.current_type() == TokenType.FUNCTION:
                 methods.append(self.parse_function())
 
-            elif self.current_token().type == TokenType.CLASS:
+            elif self.current_type() == TokenType.CLASS:
                 child = self.parse_class_declaration()
                 children.append(child)
 
@@ -571,7 +680,8 @@ class Parser:
 
         # exit class scope.
         self.scope.exit_scope()
-        self.expect(TokenType.RIGHT_BRACE)
+        self.loops = outer_loops
+        self.consume(TokenType.RIGHT_BRACE)
         
         if reprenabled == True: print(repr(VariableDeclaration(TokenType.CLASS, name, 
             ClassLiteral(name, extends, children, fields, methods, body))))
@@ -588,31 +698,31 @@ class Parser:
         
         self.scope.declare_variable(name, TokenType.FUNCTION)
         self.scope.enter_scope()
-        self.expect(TokenType.LEFT_PAREN)
+        self.consume(TokenType.LEFT_PAREN)
         parameters = []
-        while self.current_token().type != TokenType.RIGHT_PAREN:
-            param_token = self.expect(self.current_token().type)
+        while self.current_type() != TokenType.RIGHT_PAREN:
+            param_token = self.expect(self.current_type())
             if not isinstance(param_token.value, Token) or param_token.value.type != TokenType.IDENTIFIER:
                 raise SyntaxError(f"Expected parameter with type and identifier, but found {param_token.value}")
             param_type = param_token.type
             param_name = param_token.value.value
             parameters.append(Parameter(param_type, param_name))
             self.scope.declare_variable(param_name, param_type)
-            if self.current_token().type == TokenType.COMMA:
+            if self.current_type() == TokenType.COMMA:
                 self.next_token()
                 
-        self.expect(TokenType.RIGHT_PAREN)
+        self.consume(TokenType.RIGHT_PAREN)
         return_type = self.expect(TokenType.RETURN).value
-        body = self.parse_block()  # use the block parser
+        body = self.parse_block(loops=0)  # use the block parser
         self.scope.exit_scope()
         return Function(name, parameters, return_type, body)
     
 
     # actually implement scope on this later, for right now just do this
     def parse_global_declaration(self):
-        self.expect(TokenType.GLOBAL)
+        self.consume(TokenType.GLOBAL)
 
-        if self.current_token().type in [TokenType.INTEGER, TokenType.BOOLEAN, TokenType.STR,
+        if self.current_type() in [TokenType.INTEGER, TokenType.BOOLEAN, TokenType.STR,
                                         TokenType.TUPLE, TokenType.LIST, TokenType.VECTOR, TokenType.SET, TokenType.DEC]:
             var_decl = self.parse_variable_declaration()
             return var_decl
@@ -620,106 +730,75 @@ class Parser:
             raise SyntaxError("Expected a type declaration after the 'global' keyword.")
 
 
-    def parse_expression(self):
-        # the big boy, parses almost every expression, pretty much as hot as the main function
-        # handles literals, identifiers, binary operations, and logical operations. so literally everything
-        def parse_primary():
-            # for the primary token, like a number, string, or identifier.
-            token = self.current_token()
-            if token.type == TokenType.NUMBER:
-                self.next_token()
-                return IntLiteral(token.value)
-            elif token.type == TokenType.DECIMAL:
-                self.next_token()
-                return DecLiteral(token.value)
-            elif token.type == TokenType.STRING:
-                self.next_token()
-                return StringLiteral(token.value)
-            elif token.type in [TokenType.TRUE, TokenType.FALSE]:
-                value = token.value
-                self.next_token()
-                return BooleanLiteral(value)
-            elif token.type == TokenType.IDENTIFIER:
-                return self.parse_identifier()
-            elif token.type == TokenType.LEFT_BRACKET:
-                return self.parse_list_literal()
-            elif token.type == TokenType.NOT:
-                operator = token.type
+    # the big boy, parses almost every expression, pretty much as hot as the main function. pratt style: parse whatever starts
+    # the expression off the prefix table, then keep folding in binary operators while they bind tighter than min_power
+    def parse_expression(self, min_power=0):
+        prefix = self.prefix_table.get(self.current_type())
+        if prefix is None:
+            raise SyntaxError(f"Unexpected token in expression: {self.current_type()}")
+        line, column = self.tokens.position()
+        left = prefix()
+        left.line, left.column = line, column
+
+        # a binary operation starts where its left operand does
+        while True:
+            operator = self.current_type()
+            if operator == TokenType.IF and min_power <= CONDITIONAL_POWER:
                 self.next_token()
-                operand = parse_primary()
-                return UnaryOperation(operand, operator)
-            elif token.type == TokenType.LEFT_PAREN:
-                self.next_token()
-                expr = self.parse_expression()
-                self.expect(TokenType.RIGHT_PAREN)
-                return expr
-            elif token.type == TokenType.UNTERMINATED_STRING:
-                raise SyntaxError(f"Unterminated string: {token.value}")
-            elif token.type == TokenType.NONE:
-                self.next_token()
-                return NoneObject()
-            else:
-                raise SyntaxError(f"Unexpected token in expression: {token.type}")
+                condition = self.parse_expression(CONDITIONAL_POWER + 1)
+                self.consume(TokenType.ELSE)
+                left = ConditionalExpression(condition, left, self.parse_expression(CONDITIONAL_POWER))
+                left.line, left.column = line, column
+                continue
+            power = BINDING_POWER.get(operator)
+            if power is None or power[0] < min_power:
+                return left
+            self.next_token()
+            left = OPERATION_NODES[operator](left, operator, self.parse_expression(power[1]))
+            left.line, left.column = line, column
 
+    # prefix handlers, each one starts on its token
+    def parse_number(self):
+        value = self.current_token().value
+        self.next_token()
+        return IntLiteral(value)
 
-        def parse_binary(left, precedence=0):
-            while True:
-                operator = self.current_token().type
-                if operator in [TokenType.EOL, TokenType.SEMICOLON, None]:
-                    return left
-
-                if operator in [TokenType.ADD, TokenType.SUBTRACT]:
-                    current_precedence = 10
-                elif operator in [TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.FLOOR_DIVIDE, TokenType.MODULUS]:
-                    current_precedence = 20
-                elif operator == TokenType.POWER:
-                    current_precedence = 30
-                elif operator in [TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.GREATER_THAN, TokenType.LESS_THAN, TokenType.GREATER_EQUAL, TokenType.LESS_EQUAL]:
-                    current_precedence = 5
-                elif operator == TokenType.AND:
-                    current_precedence = 3
-                elif operator == TokenType.OR:
-                    current_precedence = 2
-                else:
-                    break
+    def parse_decimal(self):
+        value = self.current_token().value
+        self.next_token()
+        return DecLiteral(value)
 
-                if current_precedence < precedence:
-                    return left
+    def parse_string(self):
+        value = self.current_token().value
+        self.next_token()
+        return StringLiteral(value)
 
-                self.next_token()
-                right = parse_primary()
-
-                while self.current_token().type not in [TokenType.EOL, TokenType.SEMICOLON, None]:
-                    next_operator = self.current_token().type
-                    if next_operator in [TokenType.ADD, TokenType.SUBTRACT]:
-                        next_precedence = 10
-                    elif next_operator in [TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.FLOOR_DIVIDE, TokenType.MODULUS]:
-                        next_precedence = 20
-                    elif next_operator == TokenType.POWER:
-                        next_precedence = 30
-                    elif next_operator in [TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.GREATER_THAN, TokenType.LESS_THAN, TokenType.LESS_THAN, TokenType.GREATER_EQUAL, TokenType.LESS_EQUAL]:
-                        next_precedence = 5
-                    elif next_operator == TokenType.AND:
-                        next_precedence = 3
-                    elif next_operator == TokenType.OR:
-                        next_precedence = 2
-                    else:
-                        break
+    def parse_boolean(self):
+        value = self.current_token().value
+        self.next_token()
+        return BooleanLiteral(value)
 
-                    if next_precedence > current_precedence:
-                        right = parse_binary(right, next_precedence)
-                    else:
-                        break
+    def parse_none(self):
+        self.next_token()
+        return NoneObject()
 
-                left = BinaryOperation(left, operator, right)
-            return left
+    def parse_not(self):
+        operator = self.current_type()
+        self.next_token()
+        return UnaryOperation(self.parse_expression(PREFIX_POWER), operator)
+
+    def parse_group(self):
+        self.next_token()
+        expr = self.parse_expression()
+        self.consume(TokenType.RIGHT_PAREN)
+        return expr
 
-        primary = parse_primary()
-        return parse_binary(primary, precedence=0)
+    def parse_unterminated_string(self):
+        raise SyntaxError(f"Unterminated string: {self.current_token().value}")
 
 
     def parse_if_statement(self):
-        self.expect(TokenType.IF)
+        self.consume(TokenType.IF)
         condition = self.parse_expression()
         if_body = self.parse_block()  # reuse parse_block for the if body
 
@@ -727,7 +806,7 @@ class Parser:
         last_else_if = None
         self.skipeols()
 
-        while self.current_token().type == TokenType.ELSE_IF:
+        while self.current_type() == TokenType.ELSE_IF:
             self.next_token()
             else_if_condition = self.parse_expression()
             else_if_body = self.parse_block()
@@ -741,7 +820,7 @@ class Parser:
         
         self.skipeols()
 
-        if self.current_token().type == TokenType.ELSE:
+        if self.current_type() == TokenType.ELSE:
             self.skipeols()
             self.next_token()
             final_else_body = self.parse_block()
@@ -754,7 +833,7 @@ class Parser:
 
 
     def parse_for_loop(self):
-        self.expect(TokenType.FOR)
+        self.consume(TokenType.FOR)
 
         """
         if self.peek().type == TokenType.IDENTIFIER:
@@ -763,18 +842,18 @@ class Parser:
             else:
                 raise SyntaxError(f"Variable '{self.peek().value}' not declared in this scope. Declare the variable to use it as a range.")
         """
-        self.expect(TokenType.LEFT_PAREN)
+        self.consume(TokenType.LEFT_PAREN)
         self.scope.enter_scope()
 
         initializer = self.parse_statement()
-        self.expect(TokenType.SEMICOLON)
+        self.consume(TokenType.SEMICOLON)
 
         condition = self.parse_expression()
-        self.expect(TokenType.SEMICOLON)
+        self.consume(TokenType.SEMICOLON)
 
         increment = self.parse_expression()
-        self.expect(TokenType.RIGHT_PAREN)
-        body = self.parse_block()
+        self.consume(TokenType.RIGHT_PAREN)
+        body = self.parse_block(loops=self.loops + 1)
 
         self.scope.exit_scope()
         if reprenabled == True: print(repr(ForLoop(initializer, condition, increment, body)))
@@ -782,50 +861,50 @@ class Parser:
 
 
     def parse_while_loop(self):
-        self.expect(TokenType.WHILE)
+        self.consume(TokenType.WHILE)
         condition = self.parse_expression()
-        body = self.parse_block()
+        body = self.parse_block(loops=self.loops + 1)
         if reprenabled == True: print(repr(WhileLoop(condition, body)))
         return WhileLoop(condition, body)
 
 
     def parse_do_while_loop(self):
-        self.expect(TokenType.DO)
-        body = self.parse_block()
-        self.expect(TokenType.WHILE)
-        self.expect(TokenType.LEFT_PAREN)
+        self.consume(TokenType.DO)
+        body = self.parse_block(loops=self.loops + 1)
+        self.consume(TokenType.WHILE)
+        self.consume(TokenType.LEFT_PAREN)
         condition = self.parse_expression()
-        self.expect(TokenType.RIGHT_PAREN)
+        self.consume(TokenType.RIGHT_PAREN)
         if reprenabled == True: print(repr(DoWhileLoop(body, condition)))
         return DoWhileLoop(body, condition)
 
 
     def parse_list_literal(self):
         elements = []
-        self.expect(TokenType.LEFT_BRACKET)
+        self.consume(TokenType.LEFT_BRACKET)
         
         # reused
-        while self.current_token().type != TokenType.RIGHT_BRACKET:
+        while self.current_type() != TokenType.RIGHT_BRACKET:
             elements.append(self.parse_expression())
-            if self.current_token().type == TokenType.COMMA:
+            if self.current_type() == TokenType.COMMA:
                 self.next_token()
 
-        self.expect(TokenType.RIGHT_BRACKET)
+        self.consume(TokenType.RIGHT_BRACKET)
         if reprenabled == True: print(repr(ListLiteral(elements)))
         return ListLiteral(elements)
 
 
     def parse_return_statement(self):
-        self.expect(TokenType.RETURN)
+        self.consume(TokenType.RETURN)
         values = []
-        if self.current_token().type not in (TokenType.SEMICOLON, TokenType.EOL):
+        if self.current_type() not in (TokenType.SEMICOLON, TokenType.EOL):
             while True:
                 values.append(self.parse_expression())
-                if self.current_token().type != TokenType.COMMA:
+                if self.current_type() != TokenType.COMMA:
                     break
-                self.expect(TokenType.COMMA)
+                self.consume(TokenType.COMMA)
         
-        if self.current_token().type in (TokenType.SEMICOLON, TokenType.EOL):
+        if self.current_type() in (TokenType.SEMICOLON, TokenType.EOL):
             self.next_token()
         
         if reprenabled == True: print(repr(ReturnStatement(values)))
@@ -833,41 +912,41 @@ class Parser:
     
 
     def parse_native_function(self):
-        self.expect(TokenType.NATIVE)
+        self.consume(TokenType.NATIVE)
         name = self.expect(TokenType.IDENTIFIER).value
 
         if self.scope.is_declared(name):
             raise SyntaxError(f"Function '{name}' already declared in this scope.")
         
         self.scope.declare_variable(name, TokenType.NATIVE)
-        self.expect(TokenType.LEFT_PAREN)
+        self.consume(TokenType.LEFT_PAREN)
 
         parameters = []
-        while self.current_token().type != TokenType.RIGHT_PAREN:
-            param_token = self.expect(self.current_token().type)
+        while self.current_type() != TokenType.RIGHT_PAREN:
+            param_token = self.expect(self.current_type())
             if not isinstance(param_token.value, Token) or param_token.value.type != TokenType.IDENTIFIER:
                 raise SyntaxError(f"Expected parameter with type and identifier, but found {param_token.value}")
             param_type = param_token.type
             param_name = param_token.value.value
             parameters.append(Parameter(param_type, param_name))
-            if self.current_token().type == TokenType.COMMA:
+            if self.current_type() == TokenType.COMMA:
                 self.next_token()
 
-        self.expect(TokenType.RIGHT_PAREN)
+        self.consume(TokenType.RIGHT_PAREN)
         return_type = self.expect(TokenType.RETURN).value
-        body = self.parse_block()
+        body = self.parse_block(loops=0)
         if reprenabled == True: print(repr(NativeFunction(name, parameters, return_type, body)))
         return NativeFunction(name, parameters, return_type, body)
     
     def parse_try_statement(self):
-        self.expect(TokenType.TRY)
+        self.consume(TokenType.TRY)
         try_body = self.parse_block()  # Parse the try block
 
         self.skipeols()
 
         catch_map = {}
-        while self.current_token().type == TokenType.CATCH:
-            self.expect(TokenType.CATCH)
+        while self.current_type() == TokenType.CATCH:
+            self.consume(TokenType.CATCH)
             catch_condition = self.parse_expression()
             catch_body = self.parse_block()
             name = catch_condition.name     # or however you extract the string
@@ -879,13 +958,13 @@ class Parser:
         
 
     def parse_raise_statement(self):
-        self.expect(TokenType.RAISE)
+        self.consume(TokenType.RAISE)
         tok = self.expect(TokenType.IDENTIFIER).value
         message = None
-        if self.current_token().type == TokenType.LEFT_PAREN:
-            self.expect(TokenType.LEFT_PAREN)
+        if self.current_type() == TokenType.LEFT_PAREN:
+            self.consume(TokenType.LEFT_PAREN)
             message = self.parse_expression().value
-            self.expect(TokenType.RIGHT_PAREN)
+            self.consume(TokenType.RIGHT_PAREN)
         return RaiseStatement(tok, message)
 
     def parse_catch_statement(self):
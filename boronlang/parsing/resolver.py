@@ -0,0 +1,212 @@
+# resolver pass, runs after the optimizer. works out what every name in the program points at (a slot in the current function's frame,
+# a global, a builtin or something out of a package) and writes that onto the node, so the interpreter can read locals out of a list by
+# index instead of hashing names into one big dict
+from enum import Enum
+
+# tokens, nodes, and the same scope bookkeeping the parser uses
+from lexer.lexer import Token, TokenType
+from parsing.astnodes import *
+from parsing.scope import Scope
+
+# builtin function names
+from interpreter.builtins import BUILTINS
+
+# what a name can be bound to
+class Binding(Enum):
+    LOCAL = "local"         # slot in the running function's frame
+    GLOBAL = "global"       # declared at the top level of the program
+    BUILTIN = "builtin"     # out of BUILTINS
+    PACKAGE = "package"     # an imported package, or a name only an imported package could have defined
+
+# the name a VariableDeclaration writes to (same rules the interpreter uses)
+def declared_name(node):
+    if isinstance(node.name, str):
+        return node.name
+    elif isinstance(node.name, Identifier):
+        return node.name.name
+    elif isinstance(node.name, Token):
+        return node.name.value
+    return None
+
+# the name a Function defines
+def function_name(function):
+    return function.name.value if hasattr(function.name, "value") else function.name
+
+# typed declarations (int x = 1, class, range, arrays/vectors) make a new variable, x = 1 only assigns to one that already exists
+def is_declaration(node):
+    return not isinstance(node.name, Identifier) or isinstance(node.value, (ArrayLiteral, VectorLiteral))
+
+# whether anything in statements could change one of names (declaring it, assigning, ++/--/!, +=, writing a string back, defining a function)
+def writes(statements, names):
+    for statement in statements:
+        for node in walk(statement):
+            if isinstance(node, VariableDeclaration) and declared_name(node) in names:
+                return True
+            if isinstance(node, ClassInstantiation) and node.name.value in names:
+                return True
+            if isinstance(node, Function) and function_name(node) in names:
+                return True
+            if isinstance(node, UnaryOperation) and isinstance(node.operand, Identifier) and node.operand.name in names:
+                return True
+            if isinstance(node, CompoundAssignment):
+                target = node.left.name if isinstance(node.left, Identifier) else node.left
+                if target in names:
+                    return True
+            if isinstance(node, IndexAssignment) and isinstance(node.container, Identifier) and node.container.name in names:
+                return True
+    return False
+
+# whether statements call into anything that could write a global: boron functions, methods, constructors
+def calls_out(statements):
+    for statement in statements:
+        for node in walk(statement):
+            if isinstance(node, FunctionCall) and node.kind is not Binding.BUILTIN:
+                return True
+            if isinstance(node, (MethodCall, ClassInstantiation)):
+                return True
+    return False
+
+class Resolver:
+    def __init__(self):
+        self.scope = Scope()        # declarations and their types, scoped like the parser does it
+        self.slots = None           # name -> slot index for the function being resolved, none at the top level
+        self.globals = set()        # everything declared outside of a function
+        self.packages = set()       # imported package names (and aliases)
+
+        self.dispatch = {
+            Function: self.resolve_function,
+            VariableDeclaration: self.resolve_variable_declaration,
+            Identifier: self.resolve_identifier,
+            FunctionCall: self.resolve_function_call,
+            ClassInstantiation: self.resolve_class_instantiation,
+            ClassLiteral: self.resolve_class_literal,
+            ForLoop: self.resolve_for_loop,
+            Import: self.resolve_import,
+        }
+
+    # the entry point, annotates the whole program in place and hands it back
+    def resolve(self, program):
+        self.collect_globals(program)
+        self.visit(program)
+        return program
+
+    def visit(self, node):
+        handler = self.dispatch.get(type(node))
+        if handler is not None:
+            handler(node)
+        else:
+            self.visit_children(node)
+
+    def visit_children(self, node):
+        for child in node.children():
+            self.visit(child)
+
+    # every name declared outside a function body, so a function can tell a global from a package member even if it's declared further down.
+    # a function defined inside another one (or a method) lands in the globals too once it runs, so it can shadow a builtin from in there
+    def collect_globals(self, program):
+        stack = [program]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Function):
+                self.globals.update(function_name(inner) for inner in walk(node) if isinstance(inner, Function))
+                continue
+            # fields and methods belong to the class, only its body runs out here
+            if isinstance(node, ClassLiteral):
+                self.globals.update(function_name(inner) for method in node.methods for inner in walk(method)
+                                    if isinstance(inner, Function) and inner is not method)
+                stack.extend(node.body)
+                continue
+            if isinstance(node, VariableDeclaration) and is_declaration(node):
+                self.globals.add(declared_name(node))
+            elif isinstance(node, ClassInstantiation):
+                self.globals.add(node.name.value)
+            stack.extend(node.children())
+
+    # what a name points at from where the resolver is right now
+    def lookup(self, name):
+        if self.slots is not None and name in self.slots:
+            return Binding.LOCAL, self.slots[name]
+        if name in self.packages:
+            return Binding.PACKAGE, None
+        if name in self.globals:
+            return Binding.GLOBAL, None
+        if name in BUILTINS:
+            return Binding.BUILTIN, None
+        # only an imported package could still define it (its names get copied into the globals when it's imported)
+        if self.packages:
+            return Binding.PACKAGE, None
+        return Binding.GLOBAL, None
+
+    # declares a name in the current scope, and gives it a frame slot if we're inside a function
+    def declare(self, name, var_type):
+        if name not in self.scope.scopes[-1]:
+            self.scope.declare_variable(name, var_type)
+        if self.slots is None:
+            return Binding.GLOBAL, None
+        if name not in self.slots:
+            self.slots[name] = len(self.slots)
+        return Binding.LOCAL, self.slots[name]
+
+    # functions (and methods) get their own frame. parameters take the first slots, in order, then every other local gets one as
+    # it's declared. there's no closure capture, a function only ever sees its own frame and the globals
+    def resolve_function(self, node):
+        outer = self.slots
+        self.slots = {}
+        self.scope.enter_scope()
+        for param in node.parameters:
+            self.declare(param.name, param.param_type)
+        for statement in node.body:
+            self.visit(statement)
+        node.locals = tuple(self.slots)
+        self.scope.exit_scope()
+        self.slots = outer
+
+    # value first, so int x = x + 1 reads whatever x was before this line
+    def resolve_variable_declaration(self, node):
+        if node.value is not None:
+            self.visit(node.value)
+        name = declared_name(node)
+        if not isinstance(name, str):
+            return
+        if is_declaration(node):
+            node.kind, node.index = self.declare(name, node.var_type)
+        else:
+            node.kind, node.index = self.lookup(name)
+        if isinstance(node.name, Identifier):
+            node.name.kind, node.name.index = node.kind, node.index
+
+    def resolve_identifier(self, node):
+        if isinstance(node.name, str):
+            node.kind, node.index = self.lookup(node.name)
+
+    def resolve_function_call(self, node):
+        if isinstance(node.name, str):
+            node.kind, node.index = self.lookup(node.name)
+        self.visit_children(node)
+
+    # Type name = new Type(...) declares name
+    def resolve_class_instantiation(self, node):
+        self.visit_children(node)
+        node.kind, node.index = self.declare(node.name.value, TokenType.CLASS)
+
+    # fields are only names (the interpreter never evaluates them), methods are functions, and the rest of the body runs where the class is
+    def resolve_class_literal(self, node):
+        for method in node.methods:
+            self.resolve_function(method)
+        for statement in node.sub + node.body:
+            self.visit(statement)
+
+    # the loop variable gets its own scope, like in the parser
+    def resolve_for_loop(self, node):
+        self.scope.enter_scope()
+        self.visit_children(node)
+        self.scope.exit_scope()
+
+    def resolve_import(self, node):
+        self.packages.add(node.module)
+        if node.alias:
+            self.packages.add(node.alias)
+
+# runs the pass over a whole program
+def resolve(program):
+    return Resolver().resolve(program)
@@ -0,0 +1,360 @@
+# type checking pass, runs after the resolver. works out which expressions can only ever be an int, dec, bool or str, and marks
+# every declaration (and array or vector literal) whose value is proven to already be its declared type, so the engines skip
+# enforce_type on it. anything it can't prove keeps its check, nothing fails here that wouldn't have failed at runtime.
+# it doesn't follow the order things run in: a variable's type is every value that's ever written to it put together (a
+# function's locals per function, globals by name), worked out again and again until none of them change
+from decimal import Decimal
+from rich import print
+
+from lexer.lexer import TokenType
+from parsing.astnodes import *
+from parsing.resolver import Binding, declared_name
+
+# builtin function names, they're globals until the program writes over them
+from interpreter.builtins import BUILTINS
+
+#! disable or enable the pass, and whether to print how many checks it got rid of in each program
+global typecheckenabled, statsenabled
+typecheckenabled = True
+statsenabled = False
+
+# the types are python types. None is nothing written yet (an expression that never gets a value), ANY is could be anything.
+# a type stands for its instances, so bool counts as an int like it does for enforce_type
+ANY = object
+
+# what a declaration's value has to be for enforce_type to hand it back untouched
+DECLARED = {
+    TokenType.INTEGER: int,
+    TokenType.DECIMAL: Decimal,
+    TokenType.BOOLEAN: bool,
+    TokenType.STR: str,
+}
+
+# what an array's elements have to be for enforce_type to let them through (the array keeps them as they are, so ints are fine in a dec one)
+ELEMENTS = {
+    TokenType.INTEGER: int,
+    TokenType.DECIMAL: (int, Decimal),
+    TokenType.BOOLEAN: bool,
+    TokenType.STR: str,
+}
+
+NAMES = {
+    TokenType.INTEGER: "int",
+    TokenType.DECIMAL: "dec",
+    TokenType.BOOLEAN: "bool",
+    TokenType.STR: "str",
+}
+
+LITERALS = {
+    IntLiteral: int,
+    DecLiteral: Decimal,
+    StringLiteral: str,
+    BooleanLiteral: bool,
+}
+
+COMPARISONS = (GreaterThan, LessThan, GreaterEqual, LessEqual, Equal, NotEqual)
+
+# compound assignments work out the same as the operator, //= divides like /= does in every engine
+IN_PLACE = {
+    InPlaceAdd: Add,
+    InPlaceSubtract: Subtract,
+    InPlaceMultiply: Multiply,
+    InPlaceDivide: Divide,
+    InPlaceFloorDivide: Divide,
+}
+
+# what the builtins hand back
+RETURNS = {
+    "inp": str,
+    "length": int,
+    "toInt": int,
+    "toStr": str,
+    "toDec": Decimal,
+    "toBool": bool,
+    "isinstance": bool,
+    "type": str,
+    "contains": bool,
+}
+
+# what str's builtin methods (interpreter/builtins.py's METHODS) hand back
+STR_METHODS = {
+    "length": int,
+    "find": int,
+    "rfind": int,
+    "index": int,
+    "count": int,
+    "join": str,
+    "replace": str,
+    "upper": str,
+    "lower": str,
+    "strip": str,
+    "lstrip": str,
+    "rstrip": str,
+    "startswith": bool,
+    "endswith": bool,
+}
+
+# the smallest type both fit in
+def join(a, b):
+    if a is None:
+        return b
+    if b is None or issubclass(b, a):
+        return a
+    if issubclass(a, b):
+        return b
+    return ANY
+
+def proven(typ, expected):
+    return typ is None or issubclass(typ, expected)
+
+# what operation (a BinaryOperation class) on left and right hands back, same as python does it
+def result(operation, left, right):
+    if left is None or right is None:
+        return None
+    if left is ANY or right is ANY:
+        return ANY
+    if operation in COMPARISONS:
+        return bool
+    if issubclass(left, (int, Decimal)) and issubclass(right, (int, Decimal)):
+        if Decimal in (left, right):
+            return Decimal
+        # ints divide to floats, and a negative power is one too
+        return ANY if operation in (Divide, Power) else int
+    if left is str and (operation is Add and right is str or operation is Modulus):
+        return str
+    if operation is Multiply and str in (left, right) and issubclass(left if right is str else right, int):
+        return str
+    return ANY
+
+class TypeChecker:
+    # trusted is whether the only python values the program can see are the builtin types' own. an import can hand it
+    # subclasses of them (enforce_type lets those through as they are) and write over its globals, and so can whatever
+    # imports a module
+    def __init__(self, trusted):
+        self.trusted = trusted
+        self.function = None        # the Function whose locals the walk is in, None at the top level
+        self.writes = []            # (variable, what the value written to it is), a variable is a global's name or (function, slot)
+        self.types = {}             # variable -> its type, once everything's settled
+        self.declarations = []      # (declaration or array/vector literal, the function it's in)
+
+        self.dispatch = {
+            Function: self.visit_function,
+            ClassLiteral: self.visit_class_literal,
+            VariableDeclaration: self.visit_variable_declaration,
+            ClassInstantiation: self.visit_class_instantiation,
+            UnaryOperation: self.visit_unary_operation,
+            ArrayLiteral: self.visit_array_literal,
+            VectorLiteral: self.visit_array_literal,
+        }
+        for operation in IN_PLACE:
+            self.dispatch[operation] = self.visit_compound_assignment
+
+    # collects every write, settles the variables' types, then marks what it can prove. hands back (checks, skipped, kept nodes)
+    def check(self, program):
+        # anything python put in the global scope before the program started
+        for name in list(BUILTINS) + ["args"]:
+            self.write(name, lambda: ANY)
+        self.visit(program)
+        self.settle()
+
+        checks, skipped, kept = 0, 0, []
+        for node, function in self.declarations:
+            expected = self.expected(node)
+            if expected is None:
+                continue
+            # enforce_type doesn't do anything for the other types, those checks go without counting
+            if expected is ANY:
+                node.checked = False
+                continue
+            checks += 1
+            if self.safe(node, function, expected):
+                node.checked = False
+                skipped += 1
+            else:
+                kept.append(node)
+        return checks, skipped, kept
+
+    def visit(self, node):
+        handler = self.dispatch.get(type(node))
+        if handler is not None:
+            handler(node)
+        else:
+            for child in node.children():
+                self.visit(child)
+
+    # the variable a name node writes to or reads from, None when it isn't one the checker follows
+    def variable(self, node, name, function):
+        if node.kind is Binding.LOCAL:
+            return (function, node.index)
+        if node.kind is Binding.GLOBAL and isinstance(name, str):
+            return name
+        return None
+
+    def write(self, variable, value):
+        if variable is not None:
+            self.writes.append((variable, value))
+
+    # over every write until no variable's type changes. types only ever get bigger and there aren't many, so it stops quickly
+    def settle(self):
+        for variable, _ in self.writes:
+            self.types[variable] = None
+        changed = True
+        while changed:
+            changed = False
+            for variable, value in self.writes:
+                typ = join(self.types[variable], value())
+                if typ is not self.types[variable]:
+                    self.types[variable] = typ
+                    changed = True
+
+    # a function goes in the globals wherever it's defined
+    def visit_function(self, node):
+        self.visit_body(node)
+        self.write(node.name.value, lambda: ANY)
+
+    # parameters are whatever the caller passed, the binder doesn't check them
+    def visit_body(self, function):
+        outer, self.function = self.function, function
+        for index in range(len(function.parameters)):
+            self.write((function, index), lambda: ANY)
+        for statement in function.body:
+            self.visit(statement)
+        self.function = outer
+
+    # fields never run, methods are functions of their own, the rest runs where the class is
+    def visit_class_literal(self, node):
+        for method in node.methods:
+            self.visit_body(method)
+        for statement in node.sub + node.body:
+            self.visit(statement)
+
+    def visit_variable_declaration(self, node):
+        for child in node.children():
+            self.visit(child)
+        function = self.function
+        self.write(self.variable(node, declared_name(node), function), lambda: self.declared(node, function))
+        self.declarations.append((node, function))
+
+    def visit_class_instantiation(self, node):
+        for child in node.children():
+            self.visit(child)
+        self.write(self.variable(node, node.name.value, self.function), lambda: ANY)
+
+    def visit_compound_assignment(self, node):
+        for child in node.children():
+            self.visit(child)
+        if isinstance(node.left, Identifier):
+            function = self.function
+            self.write(self.variable(node.left, node.left.name, function), lambda: self.type_of(node, function))
+
+    # !x writes a bool back, x++ and x-- write x plus or minus one
+    def visit_unary_operation(self, node):
+        for child in node.children():
+            self.visit(child)
+        if not isinstance(node.operand, Identifier):
+            return
+        function = self.function
+        variable = self.variable(node.operand, node.operand.name, function)
+        if node.operator == TokenType.NOT:
+            self.write(variable, lambda: bool)
+        elif node.operator in (TokenType.INCREMENT, TokenType.DECREMENT):
+            self.write(variable, lambda: result(Add, self.type_of(node.operand, function), int))
+
+    def visit_array_literal(self, node):
+        for child in node.children():
+            self.visit(child)
+        self.declarations.append((node, self.function))
+
+    # what a declaration leaves in its variable
+    def declared(self, node, function):
+        expected = DECLARED.get(node.var_type)
+        if node.value is None:
+            return expected or ANY
+        value = self.type_of(node.value, function)
+        if node.var_type == TokenType.AUTO or expected is not None and proven(value, expected):
+            return value
+        # a dec or bool that got checked is exactly that, an int or str could be a subclass python handed it
+        if expected in (Decimal, bool) or expected is not None and self.trusted:
+            return expected
+        return ANY
+
+    # the type a check needs, ANY when enforce_type does nothing for it and None when there's no check at all (auto)
+    def expected(self, node):
+        if isinstance(node, VariableDeclaration):
+            if node.var_type == TokenType.AUTO:
+                return None
+            return DECLARED.get(node.var_type, ANY)
+        return ELEMENTS.get(node.type, ANY)
+
+    def safe(self, node, function, expected):
+        if isinstance(node, VariableDeclaration):
+            # no value means the declared type's default, which is already the right type
+            return node.value is None or proven(self.type_of(node.value, function), expected)
+        return all(proven(self.type_of(element, function), expected) for element in node.elements)
+
+    # the type node's value always has, going by the types the variables have settled on so far
+    def type_of(self, node, function):
+        if isinstance(node, Constant):
+            return type(node.value) if type(node.value) in (int, bool, Decimal, str) else ANY
+        if type(node) in LITERALS:
+            return LITERALS[type(node)]
+        if isinstance(node, Identifier):
+            variable = self.variable(node, node.name, function)
+            if isinstance(variable, str) and not self.trusted:
+                return ANY
+            return self.types.get(variable, ANY) if variable is not None else ANY
+        if type(node) in IN_PLACE:
+            return result(IN_PLACE[type(node)], self.type_of(node.left, function), self.type_of(node.right, function))
+        if isinstance(node, BinaryOperation):
+            left, right = self.type_of(node.left, function), self.type_of(node.right, function)
+            if type(node) is not BinaryOperation:
+                return result(type(node), left, right)
+            if node.operator in (TokenType.INCREMENT, TokenType.DECREMENT):
+                return result(Add, left, int)
+            return ANY
+        # and/or hand back one of their sides, so does a conditional
+        if isinstance(node, LogicalOperation):
+            return join(self.type_of(node.left, function), self.type_of(node.right, function))
+        if isinstance(node, ConditionalExpression):
+            return join(self.type_of(node.if_value, function), self.type_of(node.else_value, function))
+        if isinstance(node, UnaryOperation):
+            if node.operator == TokenType.NOT:
+                return bool
+            operand = self.type_of(node.operand, function)
+            # x++ hands back what x was before
+            if isinstance(node.operand, Identifier):
+                return operand
+            return result(Add, operand, int) if node.operator in (TokenType.INCREMENT, TokenType.DECREMENT) else ANY
+        if isinstance(node, FunctionCall):
+            if node.kind is Binding.BUILTIN and self.trusted:
+                return RETURNS.get(node.name, ANY)
+            return ANY
+        if isinstance(node, MethodCall):
+            name = node.name.value if hasattr(node.name, "value") else node.name
+            if self.type_of(node.parent, function) is str:
+                return STR_METHODS.get(name, ANY)
+            return ANY
+        # a character of a string
+        if isinstance(node, IndexAccess):
+            return str if self.type_of(node.container, function) is str else ANY
+        return ANY
+
+def report(path, checks, skipped, kept, trusted):
+    print(f"\nType checks ({path}):")
+    for node in kept:
+        if isinstance(node, VariableDeclaration):
+            print(f"{node.line:>5}  {NAMES[node.var_type]} {declared_name(node)}  kept")
+        else:
+            print(f"{node.line:>5}  [{NAMES[node.type]}] elements  kept")
+    note = "" if trusted else " (globals aren't followed, something imports or is imported)"
+    print(f"{checks} checks, {skipped} proven safe and skipped, {checks - skipped} kept{note}")
+
+# runs the pass over a whole program. module is for a boron file being imported, whatever imports it can write its globals
+def typecheck(program, path="<program>", module=False):
+    if not typecheckenabled:
+        return program
+    trusted = not module and not any(isinstance(node, Import) for node in walk(program))
+    checks, skipped, kept = TypeChecker(trusted).check(program)
+    if statsenabled:
+        report(path, checks, skipped, kept, trusted)
+    return program
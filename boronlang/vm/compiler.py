@@ -0,0 +1,612 @@
+# lowers a resolved AST into VM code. statements that leave nothing behind (ifs, loops, definitions) are compiled as such, everything
+# else is an expression that leaves one value on the stack, popped again when nobody wants it. loops, ifs and breaks turn into jumps
+from decimal import Decimal
+
+from lexer.lexer import TokenType, Token
+from parsing.astnodes import *
+from parsing.resolver import Binding
+from vm.opcodes import *
+from interpreter.inlinecaches import InlineCache
+
+# binary operators with their own opcode
+BINARY_OPCODES = {
+    TokenType.ADD: ADD,
+    TokenType.SUBTRACT: SUBTRACT,
+    TokenType.MULTIPLY: MULTIPLY,
+    TokenType.DIVIDE: DIVIDE,
+    TokenType.POWER: POWER,
+    TokenType.FLOOR_DIVIDE: FLOOR_DIVIDE,
+    TokenType.MODULUS: MODULUS,
+    TokenType.LESS_THAN: LESS_THAN,
+    TokenType.GREATER_THAN: GREATER_THAN,
+    TokenType.LESS_EQUAL: LESS_EQUAL,
+    TokenType.GREATER_EQUAL: GREATER_EQUAL,
+    TokenType.EQUAL: EQUAL,
+    TokenType.NOT_EQUAL: NOT_EQUAL,
+}
+
+# compound assignments, the number is INPLACE's argument (//= has always divided, same as the tree walker)
+COMPOUND = {
+    TokenType.INCREASE: 0,
+    TokenType.DECREASE: 1,
+    TokenType.MULTEQ: 2,
+    TokenType.DIVEQ: 3,
+    TokenType.FLOOREQ: 3,
+}
+
+# what a declaration without a value starts out as
+DEFAULTS = {
+    TokenType.INTEGER: 0,
+    TokenType.DECIMAL: Decimal(0),
+    TokenType.BOOLEAN: False,
+    TokenType.STR: "",
+}
+
+# constants that are safe to share one table entry (a Decimal isn't, 1.0 and 1.00 print differently). the tuples are
+# call sites and such, made up of names, counts and types
+SHARED = (int, str, bool, type(None), tuple, TokenType)
+
+# one compiled body: the program, a function or a method
+class Code:
+    __slots__ = ("name", "instructions", "constants", "names", "lines", "localnames", "boundaries", "caches")
+
+    def __init__(self, name, localnames=()):
+        self.name = name
+        self.instructions = []      # opcode, argument, opcode, argument...
+        self.constants = []
+        self.names = []             # global names
+        self.lines = []             # source line of every instruction
+        self.localnames = localnames
+        self.boundaries = None      # where each top level statement starts, only for the program
+        self.caches = []            # inline caches of its field and method sites, they're in the constants too
+
+    def __repr__(self):
+        return f"Code({self.name}, {len(self.instructions) // 2} instructions)"
+
+# a loop being compiled, its breaks get patched to the end and its continues to the increment (or condition) once that's known
+class Loop:
+    __slots__ = ("breaks", "continues", "tries")
+
+    def __init__(self, tries):
+        self.breaks = []
+        self.continues = []
+        self.tries = tries          # how many try blocks were open when the loop started
+
+class Compiler:
+    def __init__(self, code, function=None):
+        self.code = code
+        self.function = function    # the Function being compiled, None for the program
+        self.constant_index = {}
+        self.name_index = {}
+        self.loops = []
+        self.tries = 0
+        self.line = 0
+
+        self.compilers = {
+            Program: self.compile_program,
+            VariableDeclaration: self.compile_variable_declaration,
+            BinaryOperation: self.compile_binary_operation,
+            LogicalOperation: self.compile_logical_operation,
+            ConditionalExpression: self.compile_conditional_expression,
+            UnaryOperation: self.compile_unary_operation,
+            IfStatement: self.compile_if_statement,
+            ForLoop: self.compile_for_loop,
+            WhileLoop: self.compile_while_loop,
+            DoWhileLoop: self.compile_while_loop,
+            Function: self.compile_function,
+            FunctionCall: self.compile_function_call,
+            ReturnStatement: self.compile_return_statement,
+            Identifier: self.compile_identifier,
+            IntLiteral: lambda node, keep: self.compile_literal(node, keep, int),
+            DecLiteral: lambda node, keep: self.compile_literal(node, keep, Decimal),
+            StringLiteral: lambda node, keep: self.compile_literal(node, keep, str),
+            BooleanLiteral: lambda node, keep: self.compile_literal(node, keep, lambda value: value.lower() == "true"),
+            ListLiteral: self.compile_list_literal,
+            ArrayLiteral: self.compile_array_literal,
+            VectorLiteral: self.compile_array_literal,
+            DictLiteral: self.compile_dict_literal,
+            RangeLiteral: self.compile_range_literal,
+            ClassLiteral: self.compile_class_literal,
+            ClassInstantiation: self.compile_class_instantiation,
+            FieldAssignment: self.compile_field_assignment,
+            FieldAccess: self.compile_field_access,
+            MethodCall: self.compile_method_call,
+            IndexAccess: self.compile_index_access,
+            IndexAssignment: self.compile_index_assignment,
+            TryStatement: self.compile_try_statement,
+            Break: self.compile_break,
+            Continue: self.compile_continue,
+            NoneObject: self.compile_none,
+            EndOfFile: self.compile_none,
+            Constant: self.compile_constant,
+        }
+        for operation in BINARY_OPERATIONS + COMPOUND_ASSIGNMENTS:
+            self.compilers[operation] = self.compile_binary_operation
+
+    # emitting
+    def emit(self, opcode, argument=0):
+        self.code.instructions += (opcode, argument)
+        self.code.lines.append(self.line)
+        return len(self.code.instructions) - 2
+
+    # where the next instruction goes
+    def here(self):
+        return len(self.code.instructions)
+
+    def patch(self, at, target):
+        self.code.instructions[at + 1] = target
+
+    def constant(self, value):
+        if type(value) not in SHARED:
+            self.code.constants.append(value)
+            return len(self.code.constants) - 1
+        key = (type(value), value)
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.code.constants)
+            self.code.constants.append(value)
+        return self.constant_index[key]
+
+    def inline_cache(self, site, name, direct=True):
+        cache = InlineCache(site, name, self.line, direct)
+        self.code.caches.append(cache)
+        return cache
+
+    def name(self, name):
+        if name not in self.name_index:
+            self.name_index[name] = len(self.code.names)
+            self.code.names.append(name)
+        return self.name_index[name]
+
+    # compiling. keep says whether the node's value is wanted on the stack afterwards
+    def compile(self, node, keep=True):
+        if getattr(node, "line", 0):
+            self.line = node.line
+        compiler = self.compilers.get(type(node))
+        if compiler is None:
+            self.compile_fallback(node, keep)
+        else:
+            compiler(node, keep)
+
+    def compile_block(self, statements):
+        for statement in statements:
+            self.compile(statement, keep=False)
+
+    # the tree walker runs it (imports, raise, anything it can't evaluate either)
+    def compile_fallback(self, node, keep):
+        self.emit(EVAL, self.constant(node))
+        if not keep:
+            self.emit(POP_TOP)
+
+    def keep_none(self, keep):
+        if keep:
+            self.emit(LOAD_CONST, self.constant(None))
+
+    def compile_program(self, node, keep):
+        self.code.boundaries = []
+        for statement in node.statements:
+            self.code.boundaries.append(self.here())
+            self.compile(statement, keep=False)
+        self.keep_none(keep)
+
+    # function body. a self call returned by the last statement rebinds the frame and jumps back to the top instead of recursing
+    def compile_function_body(self, function):
+        statements = function.body
+        last = statements[-1] if statements else None
+        if isinstance(last, ReturnStatement) and last.values and isinstance(last.values[0], FunctionCall):
+            call = last.values[0]
+            called_name = call.name if isinstance(call.name, str) else getattr(call.name, "value", None)
+            func_def_name = function.name.value if hasattr(function.name, "value") else function.name
+            if called_name == func_def_name:
+                self.compile_block(statements[:-1])
+                self.line = last.line or self.line
+                kwnames = self.compile_arguments(call)
+                self.emit(TAIL_CALL, self.constant((len(call.parameters), kwnames, function)))
+                return
+
+        self.compile_block(statements)
+        self.emit(LOAD_CONST, self.constant(None))
+        self.emit(RETURN_VALUE)
+
+    # method body, hands back the last statement's value when it doesn't return
+    def compile_method_body(self, method):
+        if not method.body:
+            self.emit(LOAD_CONST, self.constant(None))
+        else:
+            self.compile_block(method.body[:-1])
+            self.compile(method.body[-1], keep=True)
+        self.emit(RETURN_VALUE)
+
+    def compile_none(self, node, keep):
+        self.keep_none(keep)
+
+    def compile_constant(self, node, keep):
+        if keep:
+            self.emit(LOAD_CONST, self.constant(node.value))
+
+    # literals get converted now, if that fails (it shouldn't) it fails when it runs like before
+    def compile_literal(self, node, keep, convert):
+        try:
+            value = convert(node.value)
+        except Exception:
+            return self.compile_fallback(node, keep)
+        if keep:
+            self.emit(LOAD_CONST, self.constant(value))
+
+    def compile_identifier(self, node, keep):
+        if node.kind is Binding.LOCAL:
+            self.emit(LOAD_LOCAL, node.index)
+        else:
+            self.emit(LOAD_GLOBAL, self.name(node.name))
+        # still loaded when unused, an undefined name is an error either way
+        if not keep:
+            self.emit(POP_TOP)
+
+    # writes the top of the stack to wherever node's binding says
+    def store(self, node, name):
+        if node.kind is Binding.LOCAL:
+            self.emit(STORE_LOCAL, node.index)
+        else:
+            self.emit(STORE_GLOBAL, self.name(name))
+
+    def compile_list_literal(self, node, keep):
+        for element in node.elements:
+            self.compile(element)
+        self.emit(BUILD_LIST, len(node.elements))
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_array_literal(self, node, keep):
+        for element in node.elements:
+            self.compile(element)
+        self.emit(BUILD_LIST, len(node.elements))
+        # elements the type checker proved don't get checked, a vector that only had those has nothing left to check
+        size = node.size if isinstance(node, ArrayLiteral) else None
+        if node.checked or size is not None:
+            self.emit(CHECK_ARRAY, self.constant((node.type if node.checked else None, size)))
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_dict_literal(self, node, keep):
+        for key, value in node.elements.items():
+            self.compile(key)
+            self.compile(value)
+        self.emit(BUILD_DICT, len(node.elements))
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_range_literal(self, node, keep):
+        self.compile(node.start)
+        self.compile(node.stop)
+        self.compile(node.increment)
+        self.emit(BUILD_RANGE)
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_variable_declaration(self, node, keep):
+        if isinstance(node.name, str):
+            var_name = node.name
+        elif hasattr(node.name, 'name'):
+            var_name = node.name.name
+        elif hasattr(node.name, 'value'):
+            var_name = node.name.value
+        else:
+            return self.compile_fallback(node, keep)
+
+        if node.value:
+            self.compile(node.value)
+        else:
+            self.emit(LOAD_CONST, self.constant(DEFAULTS.get(node.var_type)))
+        if node.checked and node.var_type != TokenType.AUTO:
+            self.emit(ENFORCE, self.constant(node.var_type))
+        if keep:
+            self.emit(DUP_TOP)
+        self.store(node, var_name)
+
+    def compile_binary_operation(self, node, keep):
+        operator = node.operator
+
+        # +=, -=, etc. on anything but a plain variable goes through the tree walker
+        if operator in COMPOUND and not isinstance(node.left, Identifier):
+            return self.compile_fallback(node, keep)
+
+        self.compile(node.left)
+        self.compile(node.right)
+        if operator in BINARY_OPCODES:
+            self.emit(BINARY_OPCODES[operator])
+        elif operator in COMPOUND:
+            self.emit(INPLACE, COMPOUND[operator])
+            if keep:
+                self.emit(DUP_TOP)
+            self.store(node.left, node.left.name)
+            return
+        # x++ and x-- in binary position, the right side still runs
+        elif operator in (TokenType.INCREMENT, TokenType.DECREMENT):
+            self.emit(POP_TOP)
+            self.emit(LOAD_CONST, self.constant(1))
+            self.emit(ADD if operator == TokenType.INCREMENT else SUBTRACT)
+        else:
+            self.emit(FAIL, self.constant((NotImplementedError, f"Binary operator {operator} not implemented.")))
+        if not keep:
+            self.emit(POP_TOP)
+
+    # the left side is the result when it decides things, otherwise it's popped and the right side runs
+    def compile_logical_operation(self, node, keep):
+        self.compile(node.left)
+        to_end = self.emit(JUMP_IF_FALSE_OR_POP if node.operator == TokenType.AND else JUMP_IF_TRUE_OR_POP)
+        self.compile(node.right)
+        self.patch(to_end, self.here())
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_conditional_expression(self, node, keep):
+        self.compile(node.condition)
+        to_else = self.emit(POP_JUMP_IF_FALSE)
+        self.compile(node.if_value, keep)
+        to_end = self.emit(JUMP)
+        self.patch(to_else, self.here())
+        self.compile(node.else_value, keep)
+        self.patch(to_end, self.here())
+
+    def compile_unary_operation(self, node, keep):
+        operator, target = node.operator, node.operand
+        is_variable = isinstance(target, Identifier)
+        self.compile(target)
+
+        if operator == TokenType.NOT:
+            if not is_variable:
+                self.emit(NOT)
+            else:
+                # !x on a variable flips it in place
+                self.emit(NOT_VARIABLE, self.constant(target.name))
+                if keep:
+                    self.emit(DUP_TOP)
+                self.store(target, target.name)
+                return
+
+        elif operator in (TokenType.INCREMENT, TokenType.DECREMENT):
+            step = ADD if operator == TokenType.INCREMENT else SUBTRACT
+            if is_variable:
+                # x++ leaves the old value behind
+                if keep:
+                    self.emit(DUP_TOP)
+                self.emit(LOAD_CONST, self.constant(1))
+                self.emit(step)
+                self.store(target, target.name)
+                return
+            self.emit(LOAD_CONST, self.constant(1))
+            self.emit(step)
+
+        else:
+            self.emit(FAIL, self.constant((NotImplementedError, f"Unary operator {operator} not implemented.")))
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_if_statement(self, node, keep):
+        self.compile(node.condition)
+        to_else = self.emit(POP_JUMP_IF_FALSE)
+        self.compile_block(node.if_body)
+
+        if node.else_body:
+            to_end = self.emit(JUMP)
+            self.patch(to_else, self.here())
+            if isinstance(node.else_body, IfStatement):
+                self.compile_if_statement(node.else_body, keep=False)
+            else:
+                self.compile_block(node.else_body)
+            self.patch(to_end, self.here())
+        else:
+            self.patch(to_else, self.here())
+        self.keep_none(keep)
+
+    # the condition sits at the bottom so every iteration takes one jump
+    def compile_for_loop(self, node, keep):
+        self.compile(node.initializer, keep=False)
+        to_condition = self.emit(JUMP)
+        body = self.here()
+        self.compile_loop_body(node.body, node.increment)
+        self.patch(to_condition, self.here())
+        self.compile(node.condition)
+        self.emit(POP_JUMP_IF_TRUE, body)
+        self.finish_loop()
+        self.keep_none(keep)
+
+    # both kinds of while run the body before checking, same as the tree walker
+    def compile_while_loop(self, node, keep):
+        body = self.here()
+        self.compile_loop_body(node.body)
+        self.compile(node.condition)
+        self.emit(POP_JUMP_IF_TRUE, body)
+        self.finish_loop()
+        self.keep_none(keep)
+
+    def compile_loop_body(self, statements, increment=None):
+        loop = Loop(self.tries)
+        self.loops.append(loop)
+        self.compile_block(statements)
+        for at in loop.continues:
+            self.patch(at, self.here())
+        if increment is not None:
+            self.compile(increment, keep=False)
+
+    def finish_loop(self):
+        loop = self.loops.pop()
+        for at in loop.breaks:
+            self.patch(at, self.here())
+
+    # break and continue close any try blocks they jump out of (the parser makes sure there's a loop to jump to)
+    def compile_break(self, node, keep):
+        self.loops[-1].breaks.append(self.jump_out_of_loop())
+
+    def compile_continue(self, node, keep):
+        self.loops[-1].continues.append(self.jump_out_of_loop())
+
+    def jump_out_of_loop(self):
+        for _ in range(self.tries - self.loops[-1].tries):
+            self.emit(POP_TRY)
+        return self.emit(JUMP)
+
+    def compile_return_statement(self, node, keep):
+        if node.values:
+            self.compile(node.values[0])
+        else:
+            self.emit(LOAD_CONST, self.constant(None))
+        self.emit(RETURN_VALUE if self.function is not None else RAISE_RETURN)
+
+    # the value stored is the Function node itself, its code gets compiled the first time it's called
+    def compile_function(self, node, keep):
+        self.emit(LOAD_CONST, self.constant(node))
+        self.emit(STORE_GLOBAL, self.name(node.name.value))
+        self.keep_none(keep)
+
+    # pushes positional then keyword arguments, returns the keyword names
+    def compile_arguments(self, node, parameters=None):
+        for argument in (node.parameters if parameters is None else parameters):
+            self.compile(argument)
+        kwargs = node.kwargs if hasattr(node, 'kwargs') else {}
+        for value in kwargs.values():
+            self.compile(value)
+        return tuple(kwargs)
+
+    def compile_function_call(self, node, keep):
+        slot = node.index if node.kind is Binding.LOCAL else -1
+        self.emit(LOAD_FUNCTION, self.constant((node.name, slot)))
+        kwnames = self.compile_arguments(node)
+        self.emit(CALL_FUNCTION, self.constant((len(node.parameters), kwnames)))
+        if not keep:
+            self.emit(POP_TOP)
+
+    # the env gets built each time the definition runs, methods are compiled the first time they're called
+    def compile_class_literal(self, node, keep):
+        if node.parent:
+            self.compile(node.parent)
+        self.emit(CLASS_SETUP, self.constant((node, bool(node.parent))))
+        self.compile_block(node.body)
+        if keep:
+            self.emit(LOAD_CONST, self.constant(node))
+
+    def compile_class_instantiation(self, node, keep):
+        typ = node.typ.value
+        self.emit(LOAD_CLASS, self.constant(typ))
+        kwnames = self.compile_arguments(node, node.arguments)
+        self.emit(NEW, self.constant((typ, len(node.arguments), kwnames)))
+        if keep:
+            self.emit(DUP_TOP)
+        self.store(node, node.name.value)
+
+    def compile_field_assignment(self, node, keep):
+        if isinstance(node.parent, Token):
+            return self.compile_fallback(node, keep)
+        self.compile(node.parent)
+        self.compile(node.value)
+        field_name = node.field.value if hasattr(node.field, "value") else node.field
+        self.emit(SET_FIELD, self.constant(self.inline_cache("set field", field_name)))
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_field_access(self, node, keep):
+        self.compile(node.parent)
+        field_name = node.field.name if hasattr(node.field, 'name') else node.field
+        self.emit(GET_FIELD, self.constant(self.inline_cache("field", field_name)))
+        if not keep:
+            self.emit(POP_TOP)
+
+    # .length() on lists, strings and dicts never runs the arguments, LOAD_METHOD jumps over them
+    def compile_method_call(self, node, keep):
+        method_name = node.name.value if hasattr(node.name, "value") else node.name
+        if hasattr(node.parent, "value"):
+            package_name = node.parent.value
+        elif hasattr(node.parent, "name"):
+            package_name = node.parent.name
+        else:
+            package_name = None
+        parent_is_local = getattr(node.parent, "kind", None) is Binding.LOCAL
+
+        self.compile(node.parent)
+        method = [method_name, package_name, parent_is_local, 0, self.inline_cache("method", method_name, isinstance(node.parent, Identifier))]
+        self.emit(LOAD_METHOD, self.constant(method))
+        kwnames = self.compile_arguments(node)
+        self.emit(CALL_METHOD, self.constant((len(node.parameters), kwnames)))
+        method[3] = self.here()
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_index_access(self, node, keep):
+        self.compile(node.container)
+        self.compile(node.index)
+        self.emit(INDEX)
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_index_assignment(self, node, keep):
+        self.compile(node.container)
+        self.compile(node.index)
+        self.compile(node.value)
+        # strings are immutable, so assigning into one writes a new string back to the variable
+        target = None
+        if isinstance(node.container, Identifier):
+            target = (node.container.index if node.container.kind is Binding.LOCAL else -1, node.container.name)
+        self.emit(STORE_INDEX, self.constant(target))
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_try_statement(self, node, keep):
+        setup = self.emit(SETUP_TRY)
+        self.tries += 1
+        self.compile_block(node.body)
+        self.tries -= 1
+        self.emit(POP_TRY)
+        ends = [self.emit(JUMP)]
+
+        self.patch(setup, self.here())
+        catches = {}
+        self.emit(DISPATCH_CATCH, self.constant(catches))
+        for name, catch in node.catches.items():
+            catches[name] = self.here()
+            self.compile_block(catch.body)
+            ends.append(self.emit(JUMP))
+        for at in ends:
+            self.patch(at, self.here())
+        self.keep_none(keep)
+
+# superinstructions for the common sequences, longest first. only the first opcode gets replaced, so every pattern is checked
+# against the opcodes as they were compiled
+SEQUENCES = (
+    ((LOAD_LOCAL, LOAD_LOCAL, INDEX), LOAD_LOCAL_INDEX),
+    ((LOAD_LOCAL, LOAD_LOCAL), LOAD_LOCAL_LOCAL),
+    ((LOAD_LOCAL, LOAD_CONST), LOAD_LOCAL_CONST),
+)
+
+def fuse(code):
+    instructions = code.instructions
+    opcodes = instructions[::2]
+    for i, op in enumerate(opcodes):
+        if op in COMPARE_OPCODES and i + 1 < len(opcodes) and opcodes[i + 1] in (POP_JUMP_IF_FALSE, POP_JUMP_IF_TRUE):
+            instructions[2 * i] = COMPARE_JUMP_IF_FALSE if opcodes[i + 1] == POP_JUMP_IF_FALSE else COMPARE_JUMP_IF_TRUE
+            instructions[2 * i + 1] = COMPARE_OPCODES.index(op)
+            continue
+        for sequence, fused in SEQUENCES:
+            if tuple(opcodes[i:i + len(sequence)]) == sequence:
+                instructions[2 * i] = fused
+                break
+
+# the program as one code object
+def compile_program(program):
+    code = Code("<program>")
+    compiler = Compiler(code)
+    compiler.compile(program, keep=False)
+    compiler.emit(LOAD_CONST, compiler.constant(None))
+    compiler.emit(RETURN_VALUE)
+    fuse(code)
+    return code
+
+# a function or method body, its frame layout comes from the resolver
+def compile_function(function, method=False):
+    name = function.name.value if hasattr(function.name, "value") else function.name
+    code = Code(name, function.locals or ())
+    compiler = Compiler(code, function)
+    if method:
+        compiler.compile_method_body(function)
+    else:
+        compiler.compile_function_body(function)
+    fuse(code)
+    return code
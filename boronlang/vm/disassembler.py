@@ -0,0 +1,64 @@
+# human readable listings of VM code, one instruction per line:
+#   line  offset  OPNAME  argument  (what the argument points at)
+# jump targets are marked with >>
+from enum import Enum
+
+from parsing.astnodes import ASTNode, Function, ClassLiteral, walk
+from vm.opcodes import *
+from vm.compiler import compile_program, compile_function
+
+# keeps constants short, nodes would otherwise print their whole subtree
+def describe(value):
+    if isinstance(value, Function):
+        return f"<function {value.name.value if hasattr(value.name, 'value') else value.name}>"
+    if isinstance(value, ASTNode):
+        return f"<{type(value).__name__}>"
+    if isinstance(value, tuple):
+        return "(" + ", ".join(describe(item) for item in value) + ("," if len(value) == 1 else "") + ")"
+    if isinstance(value, type):
+        return value.__name__
+    if isinstance(value, Enum):
+        return value.name
+    text = repr(value)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+def disassemble(code):
+    instructions = code.instructions
+    targets = {instructions[pc + 1] for pc in range(0, len(instructions), 2) if instructions[pc] in HAS_JUMP}
+    targets.update(pc for const in code.constants if isinstance(const, dict) for pc in const.values())
+
+    lines = [f"code {code.name}: {len(instructions) // 2} instructions, {len(code.constants)} constants, {len(code.names)} names, {len(code.localnames)} locals"]
+    previous_line = None
+    for pc in range(0, len(instructions), 2):
+        op, arg = instructions[pc], instructions[pc + 1]
+        line = code.lines[pc // 2]
+        source = f"{line:>5}" if line != previous_line else "     "
+        previous_line = line
+        marker = ">>" if pc in targets else "  "
+
+        if op in HAS_CONST:
+            detail = f"({describe(code.constants[arg])})"
+        elif op in HAS_NAME:
+            detail = f"({code.names[arg]})"
+        elif op in HAS_LOCAL:
+            detail = f"({code.localnames[arg]})" if arg < len(code.localnames) else ""
+        elif op in HAS_JUMP:
+            detail = f"(to {arg})"
+        elif op in (COMPARE_JUMP_IF_FALSE, COMPARE_JUMP_IF_TRUE):
+            detail = f"({OPNAMES[COMPARE_OPCODES[arg]]})"
+        else:
+            detail = ""
+        lines.append(f"{source} {marker}{pc:>6}  {OPNAMES.get(op, op):<22}{arg:>5}  {detail}".rstrip())
+    return "\n".join(lines)
+
+# the program and every function and method in it
+def disassemble_program(program):
+    listings = [disassemble(compile_program(program))]
+    methods = set()
+    for node in walk(program):
+        if isinstance(node, ClassLiteral):
+            methods.update(node.methods)
+    for node in walk(program):
+        if isinstance(node, Function):
+            listings.append(disassemble(compile_function(node, method=node in methods)))
+    return "\n\n".join(listings)
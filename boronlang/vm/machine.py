@@ -0,0 +1,498 @@
+# stack VM for compiled boron code. pc walks the flat instruction list, loops and ifs are jumps, and the hot instructions sit at the top
+# of the elif chain (vm/compiler.py's fuse() puts superinstructions over the common sequences). boron calls don't recurse in python: the
+# caller is put aside on a list and the same loop carries on in the callee, so how deep boron code can recurse only depends on memory,
+# and any call whose value is returned straight away replaces its caller instead of stacking on it. global scope, imports, type
+# enforcement and raise come from the tree walker
+from bisect import bisect_right
+from types import MethodType
+from operator import iadd, isub, imul, itruediv, lt, gt, le, ge, eq, ne
+from rich import print
+
+from parsing.astnodes import *
+from interpreter.interpreter import Interpreter, UNBOUND, binder_of
+from interpreter.instances import Instance, lay_out
+from interpreter.inlinecaches import Target
+from vm.opcodes import *
+from vm.compiler import compile_program, compile_function
+
+# INPLACE's argument picks one of these
+INPLACE_OPERATORS = (iadd, isub, imul, itruediv)
+
+# COMPARE_JUMP_IF_FALSE and COMPARE_JUMP_IF_TRUE's argument picks one of these, same order as COMPARE_OPCODES
+COMPARE_OPERATORS = (lt, gt, le, ge, eq, ne)
+
+def not_defined(name):
+    return ValueError(f"'{name}' is not defined or has not been imported. Did you forget to import a library or create a class?")
+
+class VirtualMachine(Interpreter):
+    def __init__(self, filepath: str, args=[]):
+        super().__init__(filepath, args)
+
+        # compiled functions and methods, keyed by their Function node
+        self.codes = {}
+
+        # runs EVAL's nodes, sharing this global scope
+        self.walker = Interpreter(filepath, args)
+        self.walker.global_scope = self.global_scope
+
+    # programs (imported .b files too) get compiled and run, a lone node just gets walked
+    def evaluate(self, node):
+        if isinstance(node, Program):
+            return self.evaluate_program(node)
+        return self.walker.evaluate(node)
+
+    def evaluate_program(self, program):
+        code = compile_program(program)
+        self.caches.extend(code.caches)
+        self.execute(code, None)
+
+    def code_of(self, function, method=False):
+        code = self.codes.get(function)
+        if code is None:
+            code = self.codes[function] = compile_function(function, method)
+            self.caches.extend(code.caches)
+        return code
+
+    def call_function(self, function, args, kwargs):
+        frame = (function.binder or binder_of(function)).bind(args, kwargs)
+        return self.execute(self.code_of(function), frame)
+
+    # a method's frame has self in slot 0, the arguments after it
+    @staticmethod
+    def method_frame(method, instance, args, kwargs):
+        frame = (method.binder or binder_of(method, method=True)).bind(args, kwargs)
+        frame[0] = instance
+        return frame
+
+    def create_callback(self, func_node):
+        def callback():
+            func_name = func_node.name.value if hasattr(func_node.name, "value") else func_node.name
+            function = self.global_scope.get(func_name)
+            if function is None:
+                raise NameError(f"Function '{func_name}' is not defined.")
+            if not hasattr(function, "parameters"):
+                function()
+            else:
+                self.call_function(function, [], {})
+        return callback
+
+    # pops the arguments of a call off the stack, positional then keyword
+    @staticmethod
+    def pop_arguments(stack, count, kwnames):
+        kwargs = {}
+        if kwnames:
+            kwargs = dict(zip(kwnames, stack[-len(kwnames):]))
+            del stack[-len(kwnames):]
+        if count:
+            args = stack[-count:]
+            del stack[-count:]
+        else:
+            args = []
+        return args, kwargs
+
+    def execute(self, code, frame):
+        instructions, constants, names = code.instructions, code.constants, code.names
+        global_scope = self.global_scope
+        stack = []
+        push, pop = stack.append, stack.pop
+        handlers = []   # (handler, stack depth) for every open try block
+        pc = 0
+        # every boron call that hasn't returned yet, as (code, frame, stack, handlers, pc, discard) of the code that made it. discard
+        # is whether the running code's value gets thrown away when it returns (__init__, the caller keeps the instance instead)
+        callers = []
+        discard = False
+
+        while True:
+            try:
+                while True:
+                    op = instructions[pc]
+                    arg = instructions[pc + 1]
+                    pc += 2
+
+                    if op == LOAD_LOCAL:
+                        value = frame[arg]
+                        if value is UNBOUND:
+                            raise not_defined(code.localnames[arg])
+                        push(value)
+                    elif op == LOAD_LOCAL_LOCAL:
+                        value = frame[arg]
+                        if value is UNBOUND:
+                            raise not_defined(code.localnames[arg])
+                        slot = instructions[pc + 1]
+                        other = frame[slot]
+                        if other is UNBOUND:
+                            raise not_defined(code.localnames[slot])
+                        push(value)
+                        push(other)
+                        pc += 2
+                    elif op == LOAD_LOCAL_CONST:
+                        value = frame[arg]
+                        if value is UNBOUND:
+                            raise not_defined(code.localnames[arg])
+                        push(value)
+                        push(constants[instructions[pc + 1]])
+                        pc += 2
+                    elif op == LOAD_CONST:
+                        push(constants[arg])
+                    elif op == STORE_LOCAL:
+                        frame[arg] = pop()
+                    elif op == LOAD_GLOBAL:
+                        value = global_scope.get(names[arg], UNBOUND)
+                        if value is UNBOUND:
+                            raise not_defined(names[arg])
+                        push(value)
+                    elif op == STORE_GLOBAL:
+                        global_scope[names[arg]] = pop()
+                    elif op == COMPARE_JUMP_IF_FALSE:
+                        right = pop()
+                        if COMPARE_OPERATORS[arg](pop(), right):
+                            pc += 2
+                        else:
+                            pc = instructions[pc + 1]
+                    elif op == COMPARE_JUMP_IF_TRUE:
+                        right = pop()
+                        if COMPARE_OPERATORS[arg](pop(), right):
+                            pc = instructions[pc + 1]
+                        else:
+                            pc += 2
+                    elif op == LOAD_LOCAL_INDEX:
+                        container = frame[arg]
+                        if container is UNBOUND:
+                            raise not_defined(code.localnames[arg])
+                        slot = instructions[pc + 1]
+                        index = frame[slot]
+                        if index is UNBOUND:
+                            raise not_defined(code.localnames[slot])
+                        if not isinstance(container, (list, str, dict)):
+                            raise TypeError("Index access is only supported on lists or arrays.")
+                        try:
+                            push(container[index])
+                        except IndexError:
+                            raise IndexError("Index out of range.")
+                        pc += 4
+                    elif op == POP_JUMP_IF_FALSE:
+                        if not pop():
+                            pc = arg
+                    elif op == POP_JUMP_IF_TRUE:
+                        if pop():
+                            pc = arg
+                    elif op == JUMP:
+                        pc = arg
+                    elif op == ADD:
+                        right = pop()
+                        stack[-1] = stack[-1] + right
+                    elif op == INDEX:
+                        index = pop()
+                        container = stack[-1]
+                        if not isinstance(container, (list, str, dict)):
+                            raise TypeError("Index access is only supported on lists or arrays.")
+                        try:
+                            stack[-1] = container[index]
+                        except IndexError:
+                            raise IndexError("Index out of range.")
+                    elif op == SUBTRACT:
+                        right = pop()
+                        stack[-1] = stack[-1] - right
+                    elif op == LOAD_METHOD:
+                        # an instance of the class the site has seen first, whose method is already known (a boron class always
+                        # comes down to Target.METHOD). anything else goes through load_method
+                        cache = constants[arg][4]
+                        receiver = stack[-1]
+                        if type(receiver) is Instance and receiver.cls is cache.key:
+                            cache.hits += 1
+                            push(cache.value[1])
+                        # .length() replaces the object with its length, and there's nothing left to call
+                        elif self.load_method(stack, constants[arg]):
+                            pc = constants[arg][3]
+                    elif op == CALL_METHOD:
+                        count, kwnames = constants[arg]
+                        args, kwargs = self.pop_arguments(stack, count, kwnames)
+                        method = pop()
+                        parent_obj = stack[-1]
+                        if isinstance(parent_obj, Instance):
+                            args, kwargs = self.wrap_callbacks(args, kwargs)
+                            callee = (self.code_of(method, method=True), self.method_frame(method, parent_obj, args, kwargs), False)
+                            break
+                        else:
+                            stack[-1] = method(*args, **kwargs)
+                    elif op == GET_FIELD:
+                        instance = stack[-1]
+                        if not isinstance(instance, Instance):
+                            raise TypeError("Field access target is not a valid instance.")
+                        cache = constants[arg]
+                        if instance.cls is cache.key:
+                            cache.hits += 1
+                            stack[-1] = instance.values[cache.value]
+                        else:
+                            stack[-1] = cache.get(instance)
+                    elif op == STORE_INDEX:
+                        value = pop()
+                        index = pop()
+                        container = stack[-1]
+                        if not isinstance(container, (list, str, dict)):
+                            raise TypeError("Index access is only supported on lists or arrays.")
+                        try:
+                            if isinstance(container, (list, dict)):
+                                container[index] = value
+                                stack[-1] = value
+                            else:
+                                # strings are immutable, the new one goes back into the variable
+                                container = container[:index] + value + container[index + 1:]
+                                if constants[arg] is not None:
+                                    slot, name = constants[arg]
+                                    if slot >= 0: frame[slot] = container
+                                    else: global_scope[name] = container
+                                stack[-1] = container
+                        except IndexError:
+                            raise IndexError("Index out of range.")
+                    elif op == MULTIPLY:
+                        right = pop()
+                        stack[-1] = stack[-1] * right
+                    elif op == MODULUS:
+                        right = pop()
+                        stack[-1] = stack[-1] % right
+                    elif op == POP_TOP:
+                        pop()
+                    elif op == LOAD_FUNCTION:
+                        name, slot = constants[arg]
+                        if slot >= 0 and frame[slot] is not UNBOUND:
+                            push(frame[slot])
+                        elif name in global_scope:
+                            push(global_scope[name])
+                        else:
+                            raise NameError(f"Function '{name}' is not defined.")
+                    elif op == CALL_FUNCTION:
+                        count, kwnames = constants[arg]
+                        args, kwargs = self.pop_arguments(stack, count, kwnames)
+                        args, kwargs = self.wrap_callbacks(args, kwargs)
+                        function = stack[-1]
+                        # native python functions get args and kwargs as is
+                        if not hasattr(function, "parameters"):
+                            stack[-1] = function(*args, **kwargs)
+                        else:
+                            callee = (self.code_of(function), (function.binder or binder_of(function)).bind(args, kwargs), False)
+                            break
+                    elif op == RETURN_VALUE:
+                        value = pop()
+                        if not callers:
+                            return value
+                        # back to the caller, its value goes where the function (or bound object) sat
+                        dropped = discard
+                        code, frame, stack, handlers, pc, discard = callers.pop()
+                        instructions, constants, names = code.instructions, code.constants, code.names
+                        push, pop = stack.append, stack.pop
+                        if not dropped:
+                            stack[-1] = value
+                    elif op == LESS_THAN:
+                        right = pop()
+                        stack[-1] = stack[-1] < right
+                    elif op == LESS_EQUAL:
+                        right = pop()
+                        stack[-1] = stack[-1] <= right
+                    elif op == EQUAL:
+                        right = pop()
+                        stack[-1] = stack[-1] == right
+                    elif op == GREATER_THAN:
+                        right = pop()
+                        stack[-1] = stack[-1] > right
+                    elif op == GREATER_EQUAL:
+                        right = pop()
+                        stack[-1] = stack[-1] >= right
+                    elif op == NOT_EQUAL:
+                        right = pop()
+                        stack[-1] = stack[-1] != right
+                    elif op == SET_FIELD:
+                        value = pop()
+                        instance = stack[-1]
+                        if not isinstance(instance, Instance):
+                            raise TypeError("Field assignment target is not a valid instance.")
+                        cache = constants[arg]
+                        if instance.cls is cache.key:
+                            cache.hits += 1
+                            instance.values[cache.value] = value
+                        else:
+                            cache.set(instance, value)
+                        stack[-1] = value
+                    elif op == DUP_TOP:
+                        push(stack[-1])
+                    elif op == INPLACE:
+                        right = pop()
+                        stack[-1] = INPLACE_OPERATORS[arg](stack[-1], right)
+                    elif op == DIVIDE:
+                        right = pop()
+                        stack[-1] = stack[-1] / right
+                    elif op == FLOOR_DIVIDE:
+                        right = pop()
+                        stack[-1] = stack[-1] // right
+                    elif op == POWER:
+                        right = pop()
+                        stack[-1] = stack[-1] ** right
+                    elif op == JUMP_IF_FALSE_OR_POP:
+                        if stack[-1]:
+                            pop()
+                        else:
+                            pc = arg
+                    elif op == JUMP_IF_TRUE_OR_POP:
+                        if stack[-1]:
+                            pc = arg
+                        else:
+                            pop()
+                    elif op == NOT:
+                        stack[-1] = not stack[-1]
+                    elif op == NOT_VARIABLE:
+                        if not isinstance(stack[-1], bool):
+                            raise TypeError(f"'{constants[arg]}' is not a boolean and cannot be negated.")
+                        stack[-1] = not stack[-1]
+                    elif op == ENFORCE:
+                        stack[-1] = self.enforce_type(constants[arg], stack[-1])
+                    elif op == TAIL_CALL:
+                        # rebind parameters in the frame, the rest of the locals start over unset
+                        count, kwnames, function = constants[arg]
+                        args, kwargs = self.pop_arguments(stack, count, kwnames)
+                        frame[:] = (function.binder or binder_of(function)).bind(args, kwargs, strict=False)
+                        del stack[:]
+                        handlers.clear()
+                        pc = 0
+                    elif op == BUILD_LIST:
+                        if arg:
+                            values = stack[-arg:]
+                            del stack[-arg:]
+                        else:
+                            values = []
+                        push(values)
+                    elif op == BUILD_DICT:
+                        items = stack[-2 * arg:] if arg else []
+                        if arg:
+                            del stack[-2 * arg:]
+                        push({items[i]: items[i + 1] for i in range(0, len(items), 2)})
+                    elif op == BUILD_RANGE:
+                        increment = pop()
+                        stop = pop()
+                        stack[-1] = range(stack[-1], stop, increment)
+                    elif op == CHECK_ARRAY:
+                        element_type, size = constants[arg]
+                        values = stack[-1]
+                        if size is not None and len(values) > int(size):
+                            raise ValueError(f"Array size mismatch: expected {size}, got {len(values)}")
+                        if element_type is not None:
+                            for value in values:
+                                self.enforce_type(element_type, value)
+                    elif op == LOAD_CLASS:
+                        if constants[arg] not in global_scope:
+                            raise NameError(f"Class '{constants[arg]}' not defined.")
+                        push(global_scope[constants[arg]])
+                    elif op == NEW:
+                        _, count, kwnames = constants[arg]
+                        args, kwargs = self.pop_arguments(stack, count, kwnames)
+                        args, kwargs = self.wrap_callbacks(args, kwargs)
+                        class_literal = stack[-1]
+                        # native python classes get args and kwargs as is
+                        if isinstance(class_literal, type):
+                            stack[-1] = class_literal(*args, **kwargs)
+                        else:
+                            stack[-1] = instance = Instance(class_literal, args, kwargs)
+                            if '__init__' in class_literal.table:
+                                init = class_literal.table['__init__']
+                                callee = (self.code_of(init, method=True), self.method_frame(init, instance, args, kwargs), True)
+                                break
+                    elif op == CLASS_SETUP:
+                        node, has_parent = constants[arg]
+                        lay_out(node, pop() if has_parent else None)
+                    elif op == SETUP_TRY:
+                        handlers.append((arg, len(stack)))
+                    elif op == POP_TRY:
+                        handlers.pop()
+                    elif op == DISPATCH_CATCH:
+                        error = pop()
+                        name = type(error).__name__
+                        if name not in constants[arg]:
+                            raise error
+                        pc = constants[arg][name]
+                    elif op == RAISE_RETURN:
+                        raise ReturnException(pop())
+                    elif op == FAIL:
+                        error, message = constants[arg]
+                        raise error(message)
+                    elif op == EVAL:
+                        # the tree walker reads locals out of its frame
+                        self.walker.frame = frame
+                        push(self.walker.evaluate(constants[arg]))
+                    else:
+                        raise RuntimeError(f"Unknown opcode {op} at {pc - 2} in {code.name}")
+
+            # the innermost open try block gets it, in this code or the closest caller that has one
+            except Exception as error:
+                while not handlers:
+                    if not callers:
+                        raise
+                    code, frame, stack, handlers, pc, discard = callers.pop()
+                instructions, constants, names = code.instructions, code.constants, code.names
+                push, pop = stack.append, stack.pop
+                pc, depth = handlers.pop()
+                del stack[depth:]
+                push(error)
+                continue
+
+            # like the tree walker, ctrl+c skips the top level statement that was running
+            except KeyboardInterrupt:
+                if callers:
+                    code, frame, stack, handlers, pc, discard = callers[0]
+                    callers.clear()
+                    instructions, constants, names = code.instructions, code.constants, code.names
+                    push, pop = stack.append, stack.pop
+                if code.boundaries is None:
+                    raise
+                print("[red]KeyboardInterrupt[/red]")
+                following = bisect_right(code.boundaries, pc - 2)
+                if following == len(code.boundaries):
+                    return None
+                pc = code.boundaries[following]
+                del stack[:]
+                handlers.clear()
+                continue
+
+            # only a call gets here. the callee starts on a stack of its own while this code waits in callers, unless the call's
+            # value is returned right away with no try open around it: then nothing is left to come back to, and the callee takes
+            # this code's place (a tail call, so mutual recursion and returns from inside an if don't pile up either)
+            callee_code, callee_frame, dropping = callee
+            if dropping or handlers or instructions[pc] != RETURN_VALUE:
+                callers.append((code, frame, stack, handlers, pc, discard))
+                discard = dropping
+            code, frame = callee_code, callee_frame
+            instructions, constants, names = code.instructions, code.constants, code.names
+            stack = []
+            push, pop = stack.append, stack.pop
+            handlers = []
+            pc = 0
+
+    # pushes the method over the object on top of the stack. for .length() the object is replaced by its length and it returns True
+    def load_method(self, stack, method):
+        method_name, package_name, parent_is_local, _, cache = method
+        parent_obj = stack[-1]
+        target, found = cache.method(parent_obj)
+
+        if target is Target.LENGTH:
+            stack[-1] = len(parent_obj)
+            return True
+
+        if target is Target.METHOD:
+            stack.append(found)
+            return False
+
+        # CALL_METHOD calls whatever's pushed with just the arguments, so the builtin method still gets bound
+        if target is Target.NATIVE:
+            stack.append(MethodType(found, parent_obj))
+            return False
+
+        if package_name is None:
+            raise ValueError(f"Invalid package identifier in MethodCall.")
+        try:
+            # a local (say a widget made inside a function) isn't in the global scope, but we already have it
+            package_obj = parent_obj if parent_is_local else self.global_scope[package_name]
+        except KeyError:
+            raise KeyError(f"Package: {package_name} not found in global scope")
+        method_func = getattr(package_obj, method_name, None)
+        if method_func is None:
+            raise AttributeError(f"Package '{package_name}' does not have a method '{method_name}'.")
+        stack.append(method_func)
+        return False
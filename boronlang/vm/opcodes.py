@@ -0,0 +1,91 @@
+# instruction set for the boron VM. code is a flat list of words, every instruction is an opcode followed by one argument
+# (0 when it doesn't take one). arguments are slot numbers, jump targets, or indexes into the code's constant and name tables
+
+# loads and stores
+LOAD_CONST = 0          # push constants[arg]
+LOAD_LOCAL = 1          # push frame[arg], error if it hasn't been declared yet
+LOAD_GLOBAL = 2         # push global names[arg], error if it isn't there
+STORE_LOCAL = 3         # pop into frame[arg]
+STORE_GLOBAL = 4        # pop into global names[arg]
+POP_TOP = 5
+DUP_TOP = 6
+
+# binary operators, pop right then left and push the result
+ADD = 10
+SUBTRACT = 11
+MULTIPLY = 12
+DIVIDE = 13
+POWER = 14
+FLOOR_DIVIDE = 15
+MODULUS = 16
+LESS_THAN = 17
+GREATER_THAN = 18
+LESS_EQUAL = 19
+GREATER_EQUAL = 20
+EQUAL = 21
+NOT_EQUAL = 22
+INPLACE = 25            # compound assignment, arg picks the in place operator out of INPLACE_OPERATORS
+
+# unary operators
+NOT = 30
+NOT_VARIABLE = 31       # !x on a variable, constants[arg] is its name (only booleans can be flipped)
+
+# jumps, arg is the target
+JUMP = 40
+POP_JUMP_IF_FALSE = 41
+POP_JUMP_IF_TRUE = 42
+JUMP_IF_FALSE_OR_POP = 43   # and: a false left side stays as the result and the right side is skipped
+JUMP_IF_TRUE_OR_POP = 44    # or: same for a true left side
+
+# calls
+LOAD_FUNCTION = 50      # constants[arg] is (name, slot or -1), pushes the function or raises NameError
+CALL_FUNCTION = 51      # constants[arg] is (argument count, keyword names), the function sits under the arguments
+TAIL_CALL = 52          # constants[arg] is (argument count, keyword names, the Function), rebinds the frame and restarts
+RETURN_VALUE = 53
+RAISE_RETURN = 54       # return outside a function, raises ReturnException like the tree walker
+
+# classes and containers
+LOAD_CLASS = 60         # constants[arg] is the class name
+NEW = 61                # constants[arg] is (class name, argument count, keyword names), the class sits under the arguments
+CLASS_SETUP = 62        # constants[arg] is (ClassLiteral node, has a parent), lays the class out
+GET_FIELD = 63          # constants[arg] is the site's InlineCache (which has the field name)
+SET_FIELD = 64          # constants[arg] is the site's InlineCache, pops value and instance, pushes the value
+LOAD_METHOD = 65        # constants[arg] is [method, package name, parent is local, target to skip to for .length(), InlineCache]
+CALL_METHOD = 66        # constants[arg] is (argument count, keyword names), object and method sit under the arguments
+INDEX = 67
+STORE_INDEX = 68        # constants[arg] is (slot or -1, name) for writing a changed string back, or None
+BUILD_LIST = 69         # arg is the element count
+BUILD_DICT = 70         # arg is the pair count
+BUILD_RANGE = 71
+CHECK_ARRAY = 72        # constants[arg] is (element type or None when the type checker proved them, size or None)
+ENFORCE = 73            # constants[arg] is the declared type
+
+# exceptions
+SETUP_TRY = 80          # arg is the handler, the exception gets pushed when it's jumped to
+POP_TRY = 81
+DISPATCH_CATCH = 82     # constants[arg] maps exception names to catch bodies, anything else gets raised again
+FAIL = 83               # constants[arg] is (exception type, message)
+
+# anything without its own instructions, constants[arg] is the node and it goes through the tree walker
+EVAL = 90
+
+# superinstructions, vm/compiler.py's fuse() puts them over the first instruction of a common sequence. the rest of the sequence
+# stays where it was (so a jump into the middle of it still works), the fused one reads its arguments from there and skips past it
+LOAD_LOCAL_LOCAL = 100      # LOAD_LOCAL, LOAD_LOCAL
+LOAD_LOCAL_CONST = 101      # LOAD_LOCAL, LOAD_CONST
+LOAD_LOCAL_INDEX = 102      # LOAD_LOCAL, LOAD_LOCAL, INDEX
+COMPARE_JUMP_IF_FALSE = 103 # a comparison then POP_JUMP_IF_FALSE, arg is where the comparison is in COMPARE_OPCODES
+COMPARE_JUMP_IF_TRUE = 104  # same with POP_JUMP_IF_TRUE
+
+# opcode number -> name, for the disassembler
+OPNAMES = {value: name for name, value in list(globals().items()) if name.isupper() and isinstance(value, int)}
+
+# opcodes whose argument is an index into the constant table
+HAS_CONST = {LOAD_CONST, NOT_VARIABLE, LOAD_FUNCTION, CALL_FUNCTION, TAIL_CALL, LOAD_CLASS, NEW, CLASS_SETUP, GET_FIELD, SET_FIELD,
+             LOAD_METHOD, CALL_METHOD, STORE_INDEX, CHECK_ARRAY, ENFORCE, DISPATCH_CATCH, FAIL, EVAL}
+HAS_NAME = {LOAD_GLOBAL, STORE_GLOBAL}
+HAS_LOCAL = {LOAD_LOCAL, STORE_LOCAL, LOAD_LOCAL_LOCAL, LOAD_LOCAL_CONST, LOAD_LOCAL_INDEX}
+HAS_JUMP = {JUMP, POP_JUMP_IF_FALSE, POP_JUMP_IF_TRUE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP, SETUP_TRY}
+
+# the comparisons COMPARE_JUMP_IF_FALSE and COMPARE_JUMP_IF_TRUE can stand for, vm/machine.py has their operators in this order
+COMPARE_OPCODES = (LESS_THAN, GREATER_THAN, LESS_EQUAL, GREATER_EQUAL, EQUAL, NOT_EQUAL)